@@ -0,0 +1,5 @@
+"""Benchmarks.
+
+Standalone performance checks for the export scripts. Run them as modules,
+for example ``python -m benchmarks.bench_slug_memory``.
+"""
@@ -0,0 +1,118 @@
+"""Scan throughput and page-cache footprint for each I/O policy.
+
+Writes a synthetic transcript of ``--size`` bytes (or reuses ``--transcript``)
+and a ``--working-set`` file that stands in for other processes' hot data.
+For each policy the working set is read into the cache, the transcript is
+scanned cold, and the benchmark reports the scan throughput, how much of
+the transcript the scan left cached and how much of the working set is
+still cached afterwards (measured with mincore(2), Linux only). To see
+eviction, pick sizes that together exceed the free memory:
+
+    python -m benchmarks.bench_io_policy --size 4G --working-set 2G
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import mmap
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_sharded_scan import _parse_size, _write_transcript
+from scripts import io_policy
+from scripts.transcript_scan import scan_transcript
+
+
+def _resident_fraction(path: Path) -> float | None:
+    """Fraction of ``path``'s pages in the page cache; None if unknown."""
+    libc_name = ctypes.util.find_library("c")
+    size = os.path.getsize(path)
+    if libc_name is None or size == 0:
+        return None
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    pages = (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+    vec = (ctypes.c_ubyte * pages)()
+    with open(path, "rb") as f:
+        # A private mapping exposes a writable buffer to take the address of.
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) as mm:
+            buf = ctypes.c_char.from_buffer(mm)
+            try:
+                result = libc.mincore(
+                    ctypes.c_void_p(ctypes.addressof(buf)),
+                    ctypes.c_size_t(size),
+                    vec,
+                )
+            finally:
+                del buf
+    if result != 0:
+        return None
+    return sum(byte & 1 for byte in vec) / pages
+
+
+def _evict(path: Path) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _warm(path: Path) -> None:
+    with open(path, "rb") as f:
+        while f.read(1 << 20):
+            pass
+
+
+def _fraction(value: float | None) -> str:
+    return "n/a" if value is None else f"{value * 100:5.1f}%"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=_parse_size, default=_parse_size("256M"))
+    parser.add_argument("--working-set", type=_parse_size, default=_parse_size("128M"))
+    parser.add_argument("--transcript", type=Path)
+    parser.add_argument(
+        "--policies", nargs="+", choices=io_policy.POLICIES, default=["off", "drop"]
+    )
+    args = parser.parse_args(argv)
+    if not hasattr(os, "posix_fadvise"):
+        print("posix_fadvise is not available on this platform")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.transcript
+        if path is None:
+            path = Path(tmp) / "transcript.jsonl"
+            _write_transcript(path, args.size)
+        working_set = Path(tmp) / "working-set.bin"
+        block = os.urandom(1 << 20)
+        with open(working_set, "wb") as f:
+            for _ in range(max(1, args.working_set >> 20)):
+                f.write(block)
+        size = os.path.getsize(path)
+        print(
+            f"transcript: {size / 1e9:.2f} GB, "
+            f"working set: {os.path.getsize(working_set) / 1e9:.2f} GB"
+        )
+        print(f"{'policy':>8}  {'MB/s':>8}  {'transcript':>10}  {'working set':>11}")
+
+        for policy in args.policies:
+            _evict(path)
+            _warm(working_set)
+            found: dict[str, None] = {}
+            os.environ[io_policy.IO_POLICY_ENV] = policy
+            start = time.perf_counter()
+            scan_transcript(path, found.setdefault)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{policy:>8}  {size / elapsed / 1e6:8.1f}  "
+                f"{_fraction(_resident_fraction(path)):>10}  "
+                f"{_fraction(_resident_fraction(working_set)):>11}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,80 @@
+"""Throughput of each transcript reader, and what the autotuner picks.
+
+Writes synthetic transcripts of each ``--sizes`` value (or reuses
+``--transcript``), times every strategy in ``scan_strategy.READERS`` on
+each, checks they find the same slugs, and then lets ``scan_adaptive`` run
+``--rounds`` scans against a private state directory to show which reader
+it settles on. Run it on the file system whose transcripts matter, e.g.
+
+    python -m benchmarks.bench_scan_strategy --sizes 4M 64M 1G --dir /mnt/nfs
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.bench_sharded_scan import _parse_size, _write_transcript
+from scripts import scan_strategy
+from scripts.plan_state import STATE_DIR_ENV
+
+
+def _time_reader(name: str, path: Path) -> tuple[float, list[str]]:
+    found: dict[str, None] = {}
+    start = time.perf_counter()
+    scan_strategy.READERS[name](path, found.setdefault)
+    return time.perf_counter() - start, list(found)
+
+
+def _bench(path: Path, rounds: int) -> bool:
+    size = os.path.getsize(path)
+    print(f"transcript: {size / 1e6:.1f} MB on {scan_strategy.filesystem_type(path)}")
+    expected = None
+    for name in scan_strategy.STRATEGIES:
+        elapsed, slugs = _time_reader(name, path)
+        print(f"{name:>10}: {elapsed:7.3f} s  {size / elapsed / 1e6:8.1f} MB/s")
+        if expected is None:
+            expected = slugs
+        elif slugs != expected:
+            print(f"{name} found different slugs")
+            return False
+
+    picks: Counter[str] = Counter()
+    with tempfile.TemporaryDirectory() as state:
+        os.environ[STATE_DIR_ENV] = state
+        for _ in range(rounds):
+            fstype = scan_strategy.filesystem_type(path)
+            picks[scan_strategy.choose(fstype, scan_strategy.size_class(size))] += 1
+            scan_strategy.scan_adaptive(path, lambda slug: None, size=size)
+        os.environ.pop(STATE_DIR_ENV)
+    print(f"{'auto':>10}: " + ", ".join(f"{n} x{c}" for n, c in picks.most_common()))
+    return True
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=_parse_size, nargs="+", default=[_parse_size("64M")]
+    )
+    parser.add_argument("--transcript", type=Path)
+    parser.add_argument("--dir", type=Path, help="where to write the transcripts")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.transcript is not None:
+        return 0 if _bench(args.transcript, args.rounds) else 1
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for size in args.sizes:
+            path = Path(tmp) / f"transcript-{size}.jsonl"
+            _write_transcript(path, size)
+            if not _bench(path, args.rounds):
+                return 1
+            path.unlink()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
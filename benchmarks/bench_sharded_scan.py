@@ -0,0 +1,86 @@
+"""Throughput benchmark for scanning one large transcript on several cores.
+
+Writes a synthetic transcript of ``--size`` bytes (or reuses ``--transcript``)
+and times the serial line scanner against the sharded scanner for each
+``--jobs`` value. The reference configuration is an 8-core box with a 4 GB
+transcript:
+
+    python -m benchmarks.bench_sharded_scan --size 4G --jobs 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from scripts import sharded_scan
+from scripts.transcript_scan import scan_transcript
+
+_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def _parse_size(text: str) -> int:
+    unit = _UNITS.get(text[-1:].upper())
+    return int(float(text[:-1]) * unit) if unit else int(text)
+
+
+def _write_transcript(path: Path, size: int) -> None:
+    filler = json.dumps({"type": "assistant", "message": {"text": "x" * 900}})
+    block = []
+    for i in range(1000):
+        if i % 50 == 0:
+            block.append(json.dumps({"type": "user", "slug": f"plan-{i // 50}"}))
+        else:
+            block.append(filler)
+    data = ("\n".join(block) + "\n").encode()
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            f.write(data)
+            written += len(data)
+
+
+def _time_scan(path: Path, jobs: int | None) -> tuple[float, int]:
+    found: dict[str, None] = {}
+    start = time.perf_counter()
+    if jobs is None:
+        scan_transcript(path, found.setdefault)
+    else:
+        sharded_scan.scan_sharded(path, found.setdefault, 0, jobs)
+    return time.perf_counter() - start, len(found)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=_parse_size, default=_parse_size("256M"))
+    parser.add_argument("--transcript", type=Path)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.transcript
+        if path is None:
+            path = Path(tmp) / "transcript.jsonl"
+            _write_transcript(path, args.size)
+        size = os.path.getsize(path)
+        print(f"transcript: {size / 1e9:.2f} GB, {os.cpu_count()} CPUs")
+
+        elapsed, count = _time_scan(path, None)
+        print(f"{'serial':>10}: {elapsed:7.2f} s  {size / elapsed / 1e6:8.1f} MB/s")
+        for jobs in args.jobs:
+            elapsed, sharded_count = _time_scan(path, jobs)
+            print(
+                f"{f'{jobs} jobs':>10}: {elapsed:7.2f} s  "
+                f"{size / elapsed / 1e6:8.1f} MB/s"
+            )
+            if sharded_count != count:
+                print(f"slug count mismatch: {sharded_count} != {count}")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,145 @@
+"""Memory benchmark for the scan -> resolve path of the project exporters.
+
+Writes a synthetic transcript directory holding ``--references`` slug
+references spread over ``--files`` transcripts, then measures peak traced
+allocations with ``tracemalloc`` for the shared-collection implementation
+and for the original per-transcript-set implementation, whose line-by-line
+scanner is kept here as the baseline. The slug cache and scan tuning the
+current implementation writes go to a temporary state directory.
+
+    python -m benchmarks.bench_slug_memory --references 1000000
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from scripts.export_project_plans import collect_slugs, resolve_plan_files
+from scripts.plan_state import STATE_DIR_ENV
+
+
+def _legacy_find_slugs(transcript_path: Path) -> set[str]:
+    """The original scanner: every line through json.loads."""
+    slugs: set[str] = set()
+    try:
+        with open(transcript_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                    if "slug" in obj:
+                        slugs.add(obj["slug"])
+                except json.JSONDecodeError:
+                    continue
+    except OSError as e:
+        print(f"Error reading transcript: {e}", file=sys.stderr)
+    return slugs
+
+
+def _legacy_scan_and_resolve(
+    transcript_dir: Path, plans_dir: Path
+) -> list[tuple[str, Path]]:
+    """Previous implementation: one set per transcript plus eager Paths."""
+    all_slugs: set[str] = set()
+    for jsonl_file in transcript_dir.glob("*.jsonl"):
+        if jsonl_file.name.startswith("agent"):
+            continue
+        all_slugs.update(_legacy_find_slugs(jsonl_file))
+
+    valid_files: list[tuple[str, Path]] = []
+    for slug in sorted(all_slugs):
+        source_file = plans_dir / f"{slug}.md"
+        if source_file.exists():
+            valid_files.append((slug, source_file))
+    return valid_files
+
+
+def _current_scan_and_resolve(
+    transcript_dir: Path, plans_dir: Path
+) -> list[tuple[str, Path]]:
+    return resolve_plan_files(collect_slugs(transcript_dir), plans_dir)
+
+
+def _write_corpus(
+    root: Path, references: int, files: int, distinct: int, plans: int
+) -> tuple[Path, Path]:
+    transcript_dir = root / "transcripts"
+    plans_dir = root / "plans"
+    transcript_dir.mkdir()
+    plans_dir.mkdir()
+
+    per_file = max(1, references // files)
+    written = 0
+    for file_index in range(files):
+        count = min(per_file, references - written)
+        if count <= 0:
+            break
+        with open(transcript_dir / f"{file_index:05d}.jsonl", "w") as f:
+            for i in range(count):
+                slug = f"slug-{(written + i) % distinct:06d}"
+                f.write(json.dumps({"type": "user", "slug": slug}) + "\n")
+        written += count
+
+    for i in range(min(plans, distinct)):
+        (plans_dir / f"slug-{i:06d}.md").write_text("plan", encoding="utf-8")
+    return transcript_dir, plans_dir
+
+
+def _measure(
+    fn: Callable[[Path, Path], list[tuple[str, Path]]],
+    transcript_dir: Path,
+    plans_dir: Path,
+) -> tuple[int, float, int]:
+    # Missing-plan warnings would dominate the output, so discard them.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        tracemalloc.start()
+        start = time.perf_counter()
+        resolved = fn(transcript_dir, plans_dir)
+        elapsed = time.perf_counter() - start
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak, elapsed, len(resolved)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--references", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=20_000)
+    parser.add_argument("--plans", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ[STATE_DIR_ENV] = str(Path(tmp) / "state")
+        transcript_dir, plans_dir = _write_corpus(
+            Path(tmp), args.references, args.files, args.distinct, args.plans
+        )
+        size = sum(e.stat().st_size for e in os.scandir(transcript_dir))
+        print(
+            f"{args.references} slug references, {args.distinct} distinct, "
+            f"{args.files} transcripts ({size / 1e6:.1f} MB), {args.plans} plans"
+        )
+        for label, fn in (
+            ("legacy", _legacy_scan_and_resolve),
+            ("shared", _current_scan_and_resolve),
+        ):
+            peak, elapsed, resolved = _measure(fn, transcript_dir, plans_dir)
+            print(
+                f"{label:>7}: peak {peak / 1e6:8.2f} MB  "
+                f"time {elapsed:6.2f} s  resolved {resolved}"
+            )
+        os.environ.pop(STATE_DIR_ENV)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
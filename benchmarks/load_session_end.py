@@ -0,0 +1,197 @@
+"""Load test for many SessionEnd hooks finishing at the same time.
+
+Starts ``--sessions`` concurrent ``export_plan.py`` subprocesses against one
+shared plans directory and project root. ``--collision-rate`` controls the
+fraction of sessions that export the same plan, and ``--large-fraction`` the
+share of sessions with a large transcript. Reports latency percentiles and
+throughput, then checks the project for corrupted or stray files.
+
+    python -m benchmarks.load_session_end --sessions 50 --collision-rate 0.5
+
+Exits non-zero if any hook failed or any corruption was found.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+EXPORT_PLAN = PROJECT_ROOT / "scripts" / "export_plan.py"
+SHARED_SLUG = "shared-plan"
+
+
+@dataclass
+class LoadReport:
+    sessions: int
+    wall_time: float
+    latencies: list[float]
+    failures: list[str] = field(default_factory=list)
+    corruptions: list[str] = field(default_factory=list)
+
+    def percentile(self, pct: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[pct - 1]
+
+    @property
+    def throughput(self) -> float:
+        return self.sessions / self.wall_time if self.wall_time else 0.0
+
+    def format(self) -> str:
+        return "\n".join(
+            [
+                f"sessions:    {self.sessions}",
+                f"wall time:   {self.wall_time:.3f} s",
+                f"throughput:  {self.throughput:.1f} sessions/s",
+                f"latency p50: {self.percentile(50) * 1000:.1f} ms",
+                f"latency p95: {self.percentile(95) * 1000:.1f} ms",
+                f"latency p99: {self.percentile(99) * 1000:.1f} ms",
+                f"failures:    {len(self.failures)}",
+                f"corruptions: {len(self.corruptions)}",
+                *(f"  {problem}" for problem in self.failures + self.corruptions),
+            ]
+        )
+
+
+def _plan_content(slug: str, size: int) -> str:
+    line = f"- step for {slug}\n"
+    return f"# Plan {slug}\n" + line * max(1, size // len(line))
+
+
+def _write_transcript(path: Path, slug: str, lines: int) -> None:
+    filler = json.dumps({"type": "assistant", "message": "x" * 200})
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(lines):
+            f.write(filler + "\n")
+        f.write(json.dumps({"type": "user", "slug": slug}) + "\n")
+
+
+def run_load(
+    root: Path,
+    *,
+    sessions: int,
+    collision_rate: float = 0.5,
+    large_fraction: float = 0.1,
+    small_lines: int = 10,
+    large_lines: int = 20_000,
+    plan_size: int = 64 * 1024,
+    seed: int = 0,
+) -> LoadReport:
+    """Run ``sessions`` concurrent SessionEnd hooks under ``root``."""
+    rng = random.Random(seed)
+    home_dir = root / "home"
+    plans_dir = home_dir / ".claude" / "plans"
+    project_dir = root / "project"
+    transcript_dir = root / "transcripts"
+    for directory in (plans_dir, project_dir, transcript_dir):
+        directory.mkdir(parents=True)
+
+    expected: dict[str, str] = {}
+    inputs: list[str] = []
+    for i in range(sessions):
+        slug = SHARED_SLUG if rng.random() < collision_rate else f"plan-{i:04d}"
+        if slug not in expected:
+            expected[slug] = _plan_content(slug, plan_size)
+            (plans_dir / f"{slug}.md").write_text(expected[slug], encoding="utf-8")
+        lines = large_lines if rng.random() < large_fraction else small_lines
+        transcript = transcript_dir / f"session-{i:04d}.jsonl"
+        _write_transcript(transcript, slug, lines)
+        inputs.append(json.dumps({"transcript_path": str(transcript)}))
+
+    env = {**os.environ, "HOME": str(home_dir)}
+    env.pop("PLAN_EXPORT_STATE_DIR", None)
+    barrier = threading.Barrier(sessions + 1)
+    latencies: list[float] = []
+    failures: list[str] = []
+    lock = threading.Lock()
+
+    def worker(index: int, payload: str) -> None:
+        barrier.wait()
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, str(EXPORT_PLAN)],
+            input=payload,
+            capture_output=True,
+            text=True,
+            cwd=project_dir,
+            env=env,
+        )
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if result.returncode != 0:
+                failures.append(
+                    f"session {index} exited {result.returncode}: "
+                    f"{result.stderr.strip()}"
+                )
+
+    threads = [
+        threading.Thread(target=worker, args=(i, payload))
+        for i, payload in enumerate(inputs)
+    ]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall_time = time.perf_counter() - wall_start
+
+    report = LoadReport(sessions, wall_time, sorted(latencies), failures)
+    report.corruptions.extend(check_project(project_dir, expected))
+    return report
+
+
+def check_project(project_dir: Path, expected: dict[str, str]) -> list[str]:
+    """Compare exported plans with their sources and look for stray files."""
+    problems = []
+    for slug, content in expected.items():
+        dest = project_dir / f"plan-{slug}.md"
+        if not dest.exists():
+            problems.append(f"missing {dest.name}")
+        elif dest.read_text(encoding="utf-8") != content:
+            problems.append(f"corrupted {dest.name}")
+    expected_names = {f"plan-{slug}.md" for slug in expected}
+    for path in project_dir.rglob("*"):
+        if path.is_file() and path.name not in expected_names:
+            problems.append(f"stray file {path.relative_to(project_dir)}")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--collision-rate", type=float, default=0.5)
+    parser.add_argument("--large-fraction", type=float, default=0.1)
+    parser.add_argument("--small-lines", type=int, default=10)
+    parser.add_argument("--large-lines", type=int, default=20_000)
+    parser.add_argument("--plan-size", type=int, default=64 * 1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run_load(
+            Path(tmp),
+            sessions=args.sessions,
+            collision_rate=args.collision_rate,
+            large_fraction=args.large_fraction,
+            small_lines=args.small_lines,
+            large_lines=args.large_lines,
+            plan_size=args.plan_size,
+            seed=args.seed,
+        )
+    print(report.format())
+    return 1 if report.failures or report.corruptions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,174 @@
+"""Checkpoint file that lets an interrupted project export resume.
+
+The checkpoint records which transcripts were fully scanned (and up to which
+byte offset), the slugs found so far and the slugs already copied. It is
+rewritten atomically and fsync'ed at most every CHECKPOINT_INTERVAL seconds,
+and removed once an export completes.
+
+An export that runs out of time before its Deadline leaves the checkpoint
+behind marked as deferred, and the next export picks it up without needing
+--resume.
+"""
+
+import contextlib
+import os
+import signal
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from types import FrameType
+
+try:
+    # When executed as a script from within scripts/
+    from plan_state import read_json, state_dir, state_key, write_json_atomic
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.export_checkpoint
+    from scripts.plan_state import read_json, state_dir, state_key, write_json_atomic
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_INTERVAL = 1.0
+DEADLINE_ENV = "PLAN_EXPORT_DEADLINE"
+# Share of the time budget kept back from scanning for copying what was found.
+SCAN_RESERVE = 0.2
+
+
+class Deadline:
+    """Time budget for an export; stages check it and wind down when it is up.
+
+    ``hit`` records whether any check found the budget exhausted, i.e. some
+    work was left for a later run.
+    """
+
+    def __init__(self, seconds: float | None = None) -> None:
+        self.budget = seconds
+        self.at = None if seconds is None else time.monotonic() + seconds
+        self.hit = False
+
+    @classmethod
+    def resolve(cls, seconds: float | None) -> "Deadline":
+        """A deadline from a --deadline value, else from PLAN_EXPORT_DEADLINE."""
+        if seconds is None:
+            raw = os.environ.get(DEADLINE_ENV)
+            if raw:
+                try:
+                    seconds = float(raw)
+                except ValueError:
+                    print(f"Invalid {DEADLINE_ENV}, ignoring it", file=sys.stderr)
+        return cls(seconds if seconds and seconds > 0 else None)
+
+    def expired(self, reserve: float = 0.0) -> bool:
+        """Whether no more than ``reserve`` of the budget is left."""
+        if self.at is None or self.budget is None:
+            return False
+        if time.monotonic() < self.at - reserve * self.budget:
+            return False
+        self.hit = True
+        return True
+
+    def scan_expired(self) -> bool:
+        """Whether scanning should stop to leave time for copying."""
+        return self.expired(SCAN_RESERVE)
+
+
+class ExportInterrupted(Exception):
+    """Raised when a termination signal arrives during an export."""
+
+    def __init__(self, signum: int) -> None:
+        super().__init__(signal.Signals(signum).name)
+        self.signum = signum
+
+
+@contextlib.contextmanager
+def signals_interrupt_export() -> Iterator[None]:
+    """Turn SIGTERM into ExportInterrupted so the caller can save progress.
+
+    Signal handlers can only be installed from the main thread; elsewhere this
+    is a no-op.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _handler(signum: int, _frame: FrameType | None) -> None:
+        raise ExportInterrupted(signum)
+
+    previous = signal.signal(signal.SIGTERM, _handler)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+class ExportCheckpoint:
+    """Progress of one project export, keyed by exporter, source and destination."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.scanned: dict[str, int] = {}
+        self.slugs: set[str] = set()
+        self.copied: set[str] = set()
+        self.deferred = False
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    @classmethod
+    def for_export(
+        cls, exporter: str, transcript_dir: Path, dest_root: Path
+    ) -> "ExportCheckpoint":
+        key = state_key(
+            exporter, str(transcript_dir.resolve()), str(dest_root.resolve())
+        )
+        return cls(state_dir() / "checkpoints" / f"{key}.json")
+
+    def load(self) -> bool:
+        """Load a previous checkpoint; return False if there is none to resume."""
+        data = read_json(self.path)
+        if not isinstance(data, dict) or data.get("version") != CHECKPOINT_VERSION:
+            return False
+        try:
+            scanned = {
+                str(name): int(offset) for name, offset in data["scanned"].items()
+            }
+            slugs = {sys.intern(str(slug)) for slug in data["slugs"]}
+            copied = {str(slug) for slug in data["copied"]}
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return False
+        self.scanned, self.slugs, self.copied = scanned, slugs, copied
+        self.deferred = data.get("deferred") is True
+        return True
+
+    def mark_scanned(self, name: str, offset: int) -> None:
+        self.scanned[name] = offset
+        self._dirty = True
+        self.maybe_flush()
+
+    def mark_copied(self, slug: str) -> None:
+        self.copied.add(slug)
+        self._dirty = True
+        self.maybe_flush()
+
+    def maybe_flush(self) -> None:
+        if self._dirty and time.monotonic() - self._last_flush >= CHECKPOINT_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        """Durably write the checkpoint; failures only cost resumability."""
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "scanned": self.scanned,
+            "slugs": sorted(self.slugs),
+            "copied": sorted(self.copied),
+            "deferred": self.deferred,
+        }
+        try:
+            write_json_atomic(self.path, data, fsync=True)
+        except OSError as e:
+            print(f"Error writing checkpoint: {e}", file=sys.stderr)
+            return
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
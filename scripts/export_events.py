@@ -0,0 +1,64 @@
+"""Progress reporting for the exporters, as human text or NDJSON events.
+
+In text mode each event prints the exporter's usual message. In JSON mode
+each event is written to stdout as one JSON object per line as soon as it
+happens, e.g. ``{"event": "copied", "slug": ..., "dest": ...}``, followed by
+a final ``summary`` event with counts and per-stage timings. Diagnostics
+that are not about a particular plan keep going to stderr in both modes.
+When stdout carries data (an archive), everything is written to stderr.
+"""
+
+import contextlib
+import json
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from typing import TextIO
+
+
+class ExportReporter:
+    def __init__(self, json_mode: bool = False, *, to_stderr: bool = False) -> None:
+        self.json_mode = json_mode
+        self.to_stderr = to_stderr
+        self.counts: Counter[str] = Counter()
+        self.timings: dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time one stage of the export (scan, resolve, copy, ...)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    def emit(
+        self, event: str, text: str | None, *, error: bool = False, **fields: object
+    ) -> None:
+        """Report one plan-level event; ``text`` is the human-readable form."""
+        self.counts[event] += 1
+        if self.json_mode:
+            record = {"event": event, **fields}
+            print(json.dumps(record, default=str), file=self._out(), flush=True)
+        elif text is not None:
+            print(text, file=sys.stderr if error else self._out())
+
+    def summary(self, text: str | None, **fields: object) -> None:
+        """Finish the report with totals and timings."""
+        if self.json_mode:
+            timings = {**self.timings, "total": time.perf_counter() - self._started}
+            record = {
+                "event": "summary",
+                **fields,
+                "counts": dict(self.counts),
+                "timings": {name: round(t, 6) for name, t in timings.items()},
+            }
+            print(json.dumps(record, default=str), file=self._out(), flush=True)
+        elif text is not None:
+            print(text, file=self._out())
+
+    def _out(self) -> TextIO:
+        return sys.stderr if self.to_stderr else sys.stdout
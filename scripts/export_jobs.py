@@ -0,0 +1,223 @@
+"""Background SessionEnd exports and their per-project result log.
+
+A detached export is recorded as pending under the state directory before
+the hook returns, runs in a double-forked worker, and on completion appends
+its outcome as one JSON line to the project's log and drops its pending
+record. The log is rotated once it grows past LOG_MAX_BYTES, keeping
+LOG_BACKUPS older files.
+
+An export that ran out of time is recorded as deferred in the same pending
+directory. The next SessionEnd hook in the project claims deferred records
+(by renaming them, so only one hook runs each) and exports them first.
+"""
+
+import contextlib
+import fcntl
+import json
+import os
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+try:
+    # When executed as a script from within scripts/
+    from plan_state import read_json, state_dir, state_key, write_json_atomic
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.export_jobs
+    from scripts.plan_state import read_json, state_dir, state_key, write_json_atomic
+
+ASYNC_ENV = "PLAN_EXPORT_ASYNC"
+LOG_MAX_BYTES = 256 * 1024
+LOG_BACKUPS = 3
+
+
+class ExportJobs:
+    """Pending and finished background exports for one project."""
+
+    def __init__(self, project_dir: Path) -> None:
+        key = state_key(str(project_dir.resolve()))
+        self.root = state_dir() / "jobs" / key
+        self.pending_dir = self.root / "pending"
+        self.log_path = self.root / "export.log"
+
+    def start(self, transcript_path: str) -> str:
+        """Record a new pending export and return its id."""
+        return self._record(transcript_path, pid=os.getpid())
+
+    def defer(
+        self,
+        transcript_path: str,
+        dest_dirs: list[Path],
+        link: str = "reflink",
+        all_plans: bool = False,
+    ) -> str:
+        """Record an export to be run by the next hook; return its id."""
+        return self._record(
+            transcript_path,
+            pid=None,
+            deferred=True,
+            dest_dirs=[str(dest_dir) for dest_dir in dest_dirs],
+            link=link,
+            all_plans=all_plans,
+        )
+
+    def _record(self, transcript_path: str, **fields: object) -> str:
+        job_id = f"{time.time_ns():x}-{os.getpid()}"
+        write_json_atomic(
+            self.pending_dir / f"{job_id}.json",
+            {
+                "id": job_id,
+                "transcript_path": transcript_path,
+                "started": time.time(),
+                **fields,
+            },
+        )
+        return job_id
+
+    def claim_deferred(self) -> dict[str, Any] | None:
+        """Take over the oldest deferred export, or return None if there is none.
+
+        The record is renamed before use, so concurrent callers never claim
+        the same export.
+        """
+        for record in self.pending():
+            if record["state"] != "deferred":
+                continue
+            path = self.pending_dir / f"{record['id']}.json"
+            claim = path.with_suffix(".claimed")
+            try:
+                os.rename(path, claim)
+            except OSError:
+                continue
+            del record["state"]
+            record.update(pid=os.getpid(), deferred=False)
+            with contextlib.suppress(OSError):
+                write_json_atomic(claim, record)
+            return record
+        return None
+
+    def set_pid(self, job_id: str, pid: int) -> None:
+        path = self.pending_dir / f"{job_id}.json"
+        record = read_json(path)
+        if isinstance(record, dict):
+            record["pid"] = pid
+            write_json_atomic(path, record)
+
+    def discard(self, job_id: str) -> None:
+        (self.pending_dir / f"{job_id}.json").unlink(missing_ok=True)
+        (self.pending_dir / f"{job_id}.claimed").unlink(missing_ok=True)
+
+    def finish(self, job_id: str, result: dict[str, Any]) -> None:
+        """Log the outcome of ``job_id`` and drop its pending record."""
+        record = {"id": job_id, "finished": time.time(), **result}
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / "export.lock", "a") as lock:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                self._rotate(len(line))
+                with open(self.log_path, "a", encoding="utf-8") as log:
+                    log.write(line)
+        except OSError as e:
+            print(f"Error writing export log: {e}", file=sys.stderr)
+        self.discard(job_id)
+
+    def _rotate(self, incoming: int) -> None:
+        try:
+            size = self.log_path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size + incoming <= LOG_MAX_BYTES:
+            return
+        for index in range(LOG_BACKUPS - 1, 0, -1):
+            older = self.log_path.with_name(f"export.log.{index}")
+            if older.exists():
+                os.replace(older, self.log_path.with_name(f"export.log.{index + 1}"))
+        os.replace(self.log_path, self.log_path.with_name("export.log.1"))
+
+    def pending(self) -> list[dict[str, Any]]:
+        """Pending exports, oldest first.
+
+        Each is marked ``deferred``, ``running`` or ``lost`` (its worker is
+        gone without logging a result).
+        """
+        try:
+            paths = sorted(self.pending_dir.glob("*.json"))
+            paths += sorted(self.pending_dir.glob("*.claimed"))
+        except OSError:
+            return []
+        jobs = []
+        for path in paths:
+            record = read_json(path)
+            if not isinstance(record, dict) or "id" not in record:
+                continue
+            if record.get("deferred") is True:
+                record["state"] = "deferred"
+            elif _alive(record.get("pid")):
+                record["state"] = "running"
+            else:
+                record["state"] = "lost"
+            jobs.append(record)
+        jobs.sort(key=lambda record: str(record["id"]))
+        return jobs
+
+    def finished(self, limit: int = 10) -> list[dict[str, Any]]:
+        """The last ``limit`` logged results, newest last."""
+        try:
+            with open(self.log_path, encoding="utf-8") as log:
+                lines = log.readlines()[-limit:]
+        except OSError:
+            return []
+        results = []
+        for line in lines:
+            with contextlib.suppress(ValueError):
+                results.append(json.loads(line))
+        return results
+
+
+def _alive(pid: object) -> bool:
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def detach(job: Callable[[], None]) -> bool:
+    """Run ``job`` in a double-forked worker detached from this process.
+
+    Returns True in the calling process once the worker is on its own, and
+    False if forking is not possible. The worker starts a new session, has
+    its standard streams pointed at /dev/null so the hook's pipes close, and
+    never returns.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        pid = os.fork()
+    except (AttributeError, OSError):
+        return False
+    if pid > 0:
+        # The intermediate child exits straight after forking the worker.
+        os.waitpid(pid, 0)
+        return True
+
+    status = 0
+    try:
+        os.setsid()
+        if os.fork() > 0:
+            os._exit(0)
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        job()
+    except BaseException:
+        status = 1
+    finally:
+        os._exit(status)
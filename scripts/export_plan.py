@@ -4,24 +4,128 @@ Copy plan markdown file from ~/.claude/plans/ to project root on session end.
 
 Reads session info from stdin (JSON), parses the transcript JSONL to find
 the plan slug, then copies the corresponding plan file.
+
+The scan result is stored in the transcript directory's slug cache, so the
+project exporters do not have to rescan this transcript afterwards. Set
+PLAN_EXPORT_JOBS to scan a large transcript with several processes
+(0 means one per CPU), and PLAN_EXPORT_SCAN_STRATEGY to fix the reader
+instead of letting measured throughput pick it. With --json, progress is
+written to stdout as NDJSON events instead of text.
+
+With --detach (or PLAN_EXPORT_ASYNC=1) the input is validated and the
+export handed to a detached background worker, so the hook returns at once.
+The worker's outcome goes to a rotating per-project log; ``export_plan.py
+status`` lists pending and recently finished exports for the current
+project. PLAN_EXPORT_IO_IDLE=1 puts the worker in the idle I/O class.
+
+With --deadline (or PLAN_EXPORT_DEADLINE), a scan that runs out of time is
+deferred: the next SessionEnd hook in the project exports it first.
+
+With --all-plans (or PLAN_EXPORT_ALL_PLANS=1) every plan the session
+produced is exported from the same scan, laid out like the project
+exporter does: in the project root for one plan, in plans/ for several.
+
+With PLAN_EXPORT_SPOOL=1 the hook queues its export in a shared spool and
+one elected leader exports everything queued in batches: the plans
+directory is listed once per batch and a plan wanted by several sessions
+of a project is copied once.
 """
 
+import argparse
+import contextlib
+import io
 import json
-import shutil
+import os
 import sys
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+try:
+    # When executed as a script from within scripts/
+    from export_checkpoint import Deadline
+    from export_events import ExportReporter
+    from export_jobs import ASYNC_ENV, ExportJobs, detach
+    from export_spool import SPOOL_ENV, SPOOL_SETTLE, ExportSpool
+    from io_policy import use_idle_io
+    from plan_copy import LINK_MODES, copy_plan_to_all
+    from plan_destinations import WORKTREES_ENV, project_roots
+    from plan_listing import list_plan_names
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.export_plan
+    from scripts.export_checkpoint import Deadline
+    from scripts.export_events import ExportReporter
+    from scripts.export_jobs import ASYNC_ENV, ExportJobs, detach
+    from scripts.export_spool import SPOOL_ENV, SPOOL_SETTLE, ExportSpool
+    from scripts.io_policy import use_idle_io
+    from scripts.plan_copy import LINK_MODES, copy_plan_to_all
+    from scripts.plan_destinations import WORKTREES_ENV, project_roots
+    from scripts.plan_listing import list_plan_names
+
+if TYPE_CHECKING:
+    from scripts.slug_cache import SlugCache
+
+JOBS_ENV = "PLAN_EXPORT_JOBS"
+ALL_PLANS_ENV = "PLAN_EXPORT_ALL_PLANS"
+
+# (slug, source file, its mtime_ns, the destinations it was copied to)
+CopiedPlan = tuple[str, Path, int, list[Path]]
 
 
 def find_slug_in_transcript(
-    transcript_path: Path, *, retries: int = 5, delay: float = 0.05
+    transcript_path: Path,
+    *,
+    retries: int = 5,
+    delay: float = 0.05,
+    cache: "SlugCache | None" = None,
+    jobs: int = 1,
+    deadline: Deadline | None = None,
 ) -> str | None:
     """Scan transcript JSONL for the first object containing a 'slug' field.
 
     Retries to handle concurrent writes that may temporarily produce malformed lines.
+    With a ``cache``, the whole transcript is scanned (only past the cached
+    offset) and its slugs are recorded for later exports. Scanning and
+    retrying stop once ``deadline`` is reached.
     """
+    slugs = find_session_slugs(
+        transcript_path,
+        retries=retries,
+        delay=delay,
+        cache=cache,
+        jobs=jobs,
+        deadline=deadline,
+        first_only=True,
+    )
+    return slugs[0] if slugs else None
+
+
+def find_session_slugs(
+    transcript_path: Path,
+    *,
+    retries: int = 5,
+    delay: float = 0.05,
+    cache: "SlugCache | None" = None,
+    jobs: int = 1,
+    deadline: Deadline | None = None,
+    first_only: bool = False,
+) -> list[str]:
+    """The distinct slugs of a transcript, in order of first appearance.
 
-    def _scan_once() -> str | None:
+    Everything is collected in one pass over the transcript; without a
+    ``cache`` and with ``first_only``, the pass ends at the first slug.
+    Retries, caching and ``deadline`` work as in find_slug_in_transcript.
+    """
+    if deadline is None:
+        deadline = Deadline()
+
+    def _scan_once() -> list[str]:
+        if cache is not None:
+            cached: list[str] = cache.scan(
+                transcript_path, jobs=jobs, stop=deadline.expired
+            )
+            return cached
+        slugs: dict[str, None] = {}
         try:
             with open(transcript_path, encoding="utf-8") as f:
                 for line in f:
@@ -33,67 +137,624 @@ def find_slug_in_transcript(
                         if isinstance(obj, dict):
                             slug = obj.get("slug")
                             if isinstance(slug, str):
-                                return slug
+                                slugs.setdefault(slug)
+                                if first_only:
+                                    break
                     except json.JSONDecodeError:
                         continue
         except FileNotFoundError:
             print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
-            return None
+            return []
         except OSError as e:
             print(f"Error reading transcript: {e}", file=sys.stderr)
-            return None
-        return None
+            return []
+        return list(slugs)
 
     for attempt in range(max(1, retries)):
-        slug = _scan_once()
-        if slug:
-            return slug
+        slugs = _scan_once()
+        if slugs:
+            return slugs
         if attempt < retries - 1:
+            if deadline.expired():
+                break
             time.sleep(delay)
-    return None
+    return []
 
 
-def main() -> int:
-    # Read JSON from stdin
+def _slug_cache(transcript_dir: Path) -> "SlugCache":
+    """The slug cache of ``transcript_dir``.
+
+    The scanners are imported here, not at the top, so a hook that hands its
+    export to a worker or a spool leader does not load them before it
+    returns.
+    """
     try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
-        print(f"Invalid JSON input: {e}", file=sys.stderr)
-        return 1
+        from slug_cache import SlugCache as Cache
+    except ModuleNotFoundError:  # pragma: no cover
+        from scripts.slug_cache import SlugCache as Cache
+    cache: SlugCache = Cache.for_directory(transcript_dir)
+    return cache
 
-    transcript_path = input_data.get("transcript_path")
-    if not transcript_path:
-        print("No transcript_path in input", file=sys.stderr)
+
+def session_dest_dirs(roots: list[Path], plan_count: int) -> list[Path]:
+    """Where a session's plans go: the roots, or their plans/ for 2+ plans.
+
+    The same rule as the project exporter, so exporting every plan of a
+    session lays them out as export_project_plans.py would.
+    """
+    return [root / "plans" if plan_count > 1 else root for root in roots]
+
+
+def _run_job(
+    background: ExportJobs,
+    job_id: str,
+    transcript_path: str,
+    roots: list[Path],
+    link: str,
+    all_plans: bool = False,
+) -> None:
+    """Body of a detached export: run deferred exports, then this one."""
+    background.set_pid(job_id, os.getpid())
+    use_idle_io()
+    export_deferred(background, Deadline())
+    _run_logged(background, job_id, transcript_path, Deadline(), roots, link, all_plans)
+
+
+def export_deferred(background: ExportJobs, deadline: Deadline) -> None:
+    """Run exports deferred by earlier hooks, while time allows."""
+    while not deadline.expired():
+        record = background.claim_deferred()
+        if record is None:
+            return
+        _run_logged(
+            background,
+            record["id"],
+            record["transcript_path"],
+            deadline,
+            [Path(d) for d in record.get("dest_dirs") or [Path.cwd()]],
+            record.get("link", "reflink"),
+            bool(record.get("all_plans")),
+        )
+
+
+def _run_logged(
+    background: ExportJobs,
+    job_id: str,
+    transcript_path: str,
+    deadline: Deadline,
+    roots: list[Path],
+    link: str,
+    all_plans: bool = False,
+) -> None:
+    """Run one export with its output captured into the project's log."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            exit_code = export_session(
+                Path(transcript_path),
+                ExportReporter(),
+                deadline,
+                roots,
+                link,
+                all_plans,
+            )
+        except Exception:
+            import traceback
+
+            traceback.print_exc()
+            exit_code = 1
+    background.finish(
+        job_id,
+        {
+            "transcript_path": transcript_path,
+            "exit_code": exit_code,
+            "output": output.getvalue().splitlines(),
+        },
+    )
+
+
+def show_status(background: ExportJobs, json_mode: bool = False) -> int:
+    """Print the pending and recently finished exports of a project."""
+    pending = background.pending()
+    finished = background.finished()
+    if json_mode:
+        for record in pending:
+            print(json.dumps({"event": "pending", **record}, default=str))
+        for record in finished:
+            print(json.dumps({"event": "finished", **record}, default=str))
+        return 0
+
+    if not pending and not finished:
+        print("No background exports")
+        return 0
+    for record in pending:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["started"]))
+        print(f"pending  {record['id']}  {record['state']}  since {started}")
+    for record in finished:
+        done = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["finished"]))
+        outcome = "ok" if record.get("exit_code") == 0 else "failed"
+        last = record.get("output") or [""]
+        print(f"finished {record['id']}  {outcome}  {done}  {last[-1]}")
+    return 0
+
+
+def _scan_jobs() -> int:
+    try:
+        return int(os.environ.get(JOBS_ENV, "1"))
+    except ValueError:
+        print(f"Invalid {JOBS_ENV}, scanning serially", file=sys.stderr)
         return 1
 
-    # Find slug in transcript
-    slug = find_slug_in_transcript(Path(transcript_path))
-    if not slug:
+
+def drain_spool(
+    spool: ExportSpool, reporter: ExportReporter, deadline: Deadline
+) -> int:
+    """Export queued jobs if this process wins the leader election.
+
+    Returns at once when another process leads; it exports the jobs queued
+    here. Jobs the deadline leaves unexported stay queued for the next
+    leader.
+    """
+    exit_code = 0
+    exported = 0
+    while spool.queued() and not deadline.hit:
+        with spool.lead() as leader:
+            if not leader:
+                print("Export queued for the running spool leader", file=sys.stderr)
+                break
+            # Let the rest of a burst arrive before the first batch.
+            time.sleep(SPOOL_SETTLE)
+            while not deadline.expired():
+                jobs = spool.take()
+                if not jobs:
+                    break
+                done, copied, code = export_batch(
+                    [record for _, record in jobs], reporter, deadline
+                )
+                spool.done([path for path, _ in jobs[:done]])
+                exported += copied
+                exit_code = max(exit_code, code)
+    if deadline.hit and spool.queued():
+        print("Deadline reached; the next leader exports the rest", file=sys.stderr)
+    reporter.summary(
+        None, exported=exported, deferred=deadline.hit, exit_code=exit_code
+    )
+    return exit_code
+
+
+def export_batch(
+    records: list[dict[str, Any]],
+    reporter: ExportReporter,
+    deadline: Deadline,
+    *,
+    retries: int = 5,
+    delay: float = 0.05,
+) -> tuple[int, int, int]:
+    """Export several sessions' plans together.
+
+    Every transcript is scanned once per round, and only transcripts without
+    a slug yet are retried, so a batch sleeps at most ``retries - 1`` times.
+    The plans directory is listed once, and each plan is read once however
+    many sessions and destinations want it. Returns how many leading records
+    were handled (the rest were cut off by ``deadline``), the number of plans
+    exported and the exit code.
+    """
+    jobs = _scan_jobs()
+    caches: dict[Path, SlugCache] = {}
+    slugs: dict[int, list[str]] = {}
+    waiting = list(range(len(records)))
+    with reporter.stage("scan"):
+        for attempt in range(max(1, retries)):
+            still_waiting = []
+            for index in waiting:
+                transcript = Path(records[index]["transcript_path"])
+                cache = caches.get(transcript.parent)
+                if cache is None:
+                    cache = _slug_cache(transcript.parent)
+                    caches[transcript.parent] = cache
+                found = find_session_slugs(
+                    transcript, retries=1, cache=cache, jobs=jobs, deadline=deadline
+                )
+                all_plans = bool(records[index].get("all_plans"))
+                if found and not (all_plans and deadline.hit):
+                    slugs[index] = found if all_plans else found[:1]
+                elif deadline.hit:
+                    break
+                else:
+                    still_waiting.append(index)
+            else:
+                waiting = still_waiting
+                if waiting and attempt < retries - 1 and not deadline.expired():
+                    time.sleep(delay)
+                    continue
+            break
+        for cache in caches.values():
+            cache.save()
+
+    handled = len(records)
+    if deadline.hit:
+        # Keep the records from the first one left unresolved onwards; if
+        # every record found its slug before the deadline, all are handled.
+        handled = min(
+            (i for i in range(len(records)) if i not in slugs), default=len(records)
+        )
+    for index in range(handled):
+        if index not in slugs:
+            print(
+                f"No slug found in transcript: {records[index]['transcript_path']}",
+                file=sys.stderr,
+            )
+
+    plans_dir = Path.home() / ".claude" / "plans"
+    with reporter.stage("resolve"):
+        listed = list_plan_names(plans_dir)
+    copies: dict[str, tuple[str, dict[Path, None]]] = {}
+    folders: dict[Path, None] = {}
+    for index in range(handled):
+        present = []
+        for slug in slugs.get(index, []):
+            source_file = plans_dir / f"{slug}.md"
+            if source_file.name in listed:
+                present.append(slug)
+                continue
+            reporter.emit(
+                "missing",
+                f"Plan file not found: {source_file}",
+                error=True,
+                slug=slug,
+                source=source_file,
+            )
+        roots = [Path(dest_dir) for dest_dir in records[index]["dest_dirs"]]
+        dest_dirs = session_dest_dirs(roots, len(present))
+        if len(present) > 1:
+            folders.update(dict.fromkeys(dest_dirs))
+        for slug in present:
+            link, dests = copies.setdefault(
+                slug, (records[index].get("link", "reflink"), {})
+            )
+            for dest_dir in dest_dirs:
+                dests.setdefault(dest_dir / f"plan-{slug}.md")
+
+    exported = 0
+    exit_code = 0
+    written: list[Path] = []
+    copied: list[CopiedPlan] = []
+    with reporter.stage("copy"):
+        for folder in folders:
+            try:
+                folder.mkdir(exist_ok=True)
+            except OSError as e:
+                print(f"Error creating {folder}: {e}", file=sys.stderr)
+                exit_code = 1
+        for slug, (link, dests) in copies.items():
+            source_file = plans_dir / f"{slug}.md"
+            try:
+                st = source_file.stat()
+                results = copy_plan_to_all(source_file, list(dests), st, link)
+            except OSError as e:
+                reporter.emit(
+                    "error",
+                    f"Error copying file: {e}",
+                    error=True,
+                    slug=slug,
+                    source=source_file,
+                    message=str(e),
+                )
+                exit_code = 1
+                continue
+            _report_copies(reporter, slug, source_file, list(dests), results)
+            if any(result != "up-to-date" for result in results):
+                copied.append((slug, source_file, st.st_mtime_ns, list(dests)))
+            written += dests
+            exported += len(dests)
+        _record_exports(written)
+    _record_copies(copied)
+    return handled, exported, exit_code
+
+
+def _record_exports(dest_files: list[Path]) -> None:
+    """``plan_reconcile.record_exports``, loaded once there is something to copy."""
+    try:
+        from plan_reconcile import record_exports
+    except ModuleNotFoundError:  # pragma: no cover
+        from scripts.plan_reconcile import record_exports
+    record_exports(dest_files)
+
+
+def _record_copies(copied: list[CopiedPlan]) -> None:
+    """Index the plans that changed and record their revisions.
+
+    plan_index, and sqlite3 with it, is only loaded when some plan changed,
+    so a SessionEnd with nothing new to copy never pays for it.
+    """
+    if not copied:
+        return
+    try:
+        from plan_index import exporter_index, record_plan
+    except ModuleNotFoundError:  # pragma: no cover
+        from scripts.plan_index import exporter_index, record_plan
+    with exporter_index() as index:
+        for slug, source_file, mtime_ns, dests in copied:
+            record_plan(index, slug, source_file, mtime_ns, dests)
+
+
+def _report_copies(
+    reporter: ExportReporter,
+    slug: str,
+    source_file: Path,
+    dests: list[Path],
+    results: list[str],
+) -> None:
+    for dest_file, result in zip(dests, results, strict=True):
+        if result == "up-to-date":
+            reporter.emit(
+                "skipped",
+                f"Plan already up to date: {dest_file}",
+                slug=slug,
+                dest=dest_file,
+                reason="up-to-date",
+            )
+        else:
+            reporter.emit(
+                "copied",
+                f"Copied plan to {dest_file}"
+                + ("" if result == "copied" else f" ({result})"),
+                slug=slug,
+                source=source_file,
+                dest=dest_file,
+                method=result,
+            )
+
+
+def export_session(
+    transcript: Path,
+    reporter: ExportReporter,
+    deadline: Deadline | None = None,
+    roots: list[Path] | None = None,
+    link: str = "reflink",
+    all_plans: bool = False,
+) -> int:
+    """Export the plan of the session whose transcript is ``transcript``.
+
+    The plan goes into each of ``roots`` (the current directory by
+    default), read once and shared between them as ``link`` says. With
+    ``all_plans``, every plan the session produced is exported from the
+    same scan, into ``plans/`` under each root when there are several.
+
+    If ``deadline`` cuts the scan short before a slug is found (or, with
+    ``all_plans``, at all), the export is deferred to the project's next
+    SessionEnd hook; the slug cache keeps the offset reached, so that hook
+    continues the scan from there.
+    """
+    if deadline is None:
+        deadline = Deadline()
+    if roots is None:
+        roots = [Path.cwd()]
+    # Find slugs in transcript
+    cache = _slug_cache(transcript.parent)
+    jobs = _scan_jobs()
+    with reporter.stage("scan"):
+        slugs = find_session_slugs(
+            transcript, cache=cache, jobs=jobs, deadline=deadline
+        )
+        cache.save()
+    if not all_plans:
+        slugs = slugs[:1]
+    if deadline.hit and (all_plans or not slugs):
+        try:
+            job_id = ExportJobs(Path.cwd()).defer(
+                str(transcript), roots, link, all_plans
+            )
+        except OSError as e:
+            print(f"Could not defer export: {e}", file=sys.stderr)
+        else:
+            print(f"Deadline reached; export deferred as {job_id}", file=sys.stderr)
+        reporter.summary(None, exported=0, deferred=True, exit_code=0)
+        return 0
+    if not slugs:
         print("No slug found in transcript", file=sys.stderr)
+        reporter.summary(None, exported=0, exit_code=0)
         return 0
 
-    # Build source and destination paths
+    # Build source paths, leaving out plans that no longer exist
     plans_dir = Path.home() / ".claude" / "plans"
-    source_file = plans_dir / f"{slug}.md"
-    dest_file = Path.cwd() / f"plan-{slug}.md"
-
-    if not source_file.exists():
-        print(f"Plan file not found: {source_file}", file=sys.stderr)
+    sources = []
+    for slug in slugs:
+        source_file = plans_dir / f"{slug}.md"
+        if source_file.exists():
+            sources.append((slug, source_file))
+            continue
+        reporter.emit(
+            "missing",
+            f"Plan file not found: {source_file}",
+            error=True,
+            slug=slug,
+            source=source_file,
+        )
+    if not sources:
+        reporter.summary(None, exported=0, exit_code=0)
         return 0
 
-    # Copy the file
+    dest_dirs = session_dest_dirs(roots, len(sources))
+    if len(sources) > 1:
+        try:
+            for dest_dir in dest_dirs:
+                dest_dir.mkdir(exist_ok=True)
+        except OSError as e:
+            print(f"Error creating plans folder: {e}", file=sys.stderr)
+            reporter.summary(None, exported=0, exit_code=1)
+            return 1
+
+    # Copy the files, unless a concurrent session already did
+    exit_code = 0
+    copied: list[CopiedPlan] = []
+    for slug, source_file in sources:
+        dest_files = [dest_dir / f"plan-{slug}.md" for dest_dir in dest_dirs]
+        exit_code = max(
+            exit_code,
+            _export_plan(reporter, copied, slug, source_file, dest_files, link),
+        )
+    _record_copies(copied)
+
+    exported = reporter.counts["copied"] + reporter.counts["skipped"]
+    reporter.summary(None, exported=exported, exit_code=exit_code)
+    return exit_code
+
+
+def _export_plan(
+    reporter: ExportReporter,
+    copied: list[CopiedPlan],
+    slug: str,
+    source_file: Path,
+    dest_files: list[Path],
+    link: str,
+) -> int:
+    """Copy one plan to ``dest_files``; return the exit code it warrants.
+
+    The plan is added to ``copied`` if any destination changed.
+    """
     try:
-        shutil.copy2(source_file, dest_file)
-        print(f"Copied plan to {dest_file}")
+        with reporter.stage("copy"):
+            st = source_file.stat()
+            results = copy_plan_to_all(source_file, dest_files, st, link)
+            _record_exports(dest_files)
+        _report_copies(reporter, slug, source_file, dest_files, results)
+        if any(result != "up-to-date" for result in results):
+            copied.append((slug, source_file, st.st_mtime_ns, dest_files))
     except FileNotFoundError:
-        print(f"Error copying file: {source_file} not found", file=sys.stderr)
-        return 0
+        reporter.emit(
+            "error",
+            f"Error copying file: {source_file} not found",
+            error=True,
+            slug=slug,
+            source=source_file,
+            message="source not found",
+        )
     except OSError as e:
-        print(f"Error copying file: {e}", file=sys.stderr)
+        reporter.emit(
+            "error",
+            f"Error copying file: {e}",
+            error=True,
+            slug=slug,
+            source=source_file,
+            message=str(e),
+        )
         return 1
-
     return 0
 
 
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export this session's plan.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["status"],
+        help="show pending and finished background exports for this project",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="write one JSON event per line instead of text",
+    )
+    parser.add_argument(
+        "--detach",
+        action="store_true",
+        help="run the export in a detached background worker",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="stop scanning after SECONDS and defer the export to the next "
+        "SessionEnd (default: $PLAN_EXPORT_DEADLINE)",
+    )
+    parser.add_argument(
+        "--dest",
+        action="append",
+        metavar="DIR",
+        help="also export into DIR, e.g. another worktree; repeatable",
+    )
+    parser.add_argument(
+        "--worktrees",
+        action="store_true",
+        help="also export into every worktree of the current git repository "
+        f"(default: ${WORKTREES_ENV})",
+    )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="reflink",
+        help="how the copies after the first share its data; falls back to "
+        "copying where the file system cannot (default: reflink)",
+    )
+    parser.add_argument(
+        "--all-plans",
+        action="store_true",
+        help="export every plan the session produced, into plans/ when there "
+        f"are several (default: ${ALL_PLANS_ENV})",
+    )
+    args = parser.parse_args(argv or [])
+    if args.command == "status":
+        return show_status(ExportJobs(Path.cwd()), args.json)
+
+    # Read JSON from stdin
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError as e:
+        print(f"Invalid JSON input: {e}", file=sys.stderr)
+        return 1
+
+    transcript_path = input_data.get("transcript_path")
+    if not transcript_path:
+        print("No transcript_path in input", file=sys.stderr)
+        return 1
+
+    roots = project_roots(Path.cwd(), args.dest, args.worktrees)
+    all_plans = args.all_plans or os.environ.get(ALL_PLANS_ENV, "") not in ("", "0")
+    for root in roots:
+        if not root.is_dir():
+            print(f"Destination is not a directory: {root}", file=sys.stderr)
+            return 1
+
+    if os.environ.get(SPOOL_ENV, "") not in ("", "0"):
+        spool = ExportSpool()
+        try:
+            spool.submit(transcript_path, roots, args.link, all_plans)
+        except OSError as e:
+            print(f"Could not queue export: {e}", file=sys.stderr)
+        else:
+            return drain_spool(
+                spool, ExportReporter(args.json), Deadline.resolve(args.deadline)
+            )
+
+    if args.detach or os.environ.get(ASYNC_ENV, "") not in ("", "0"):
+        background = ExportJobs(Path.cwd())
+        try:
+            job_id = background.start(transcript_path)
+        except OSError as e:
+            print(f"Could not record background export: {e}", file=sys.stderr)
+        else:
+            if detach(
+                lambda: _run_job(
+                    background, job_id, transcript_path, roots, args.link, all_plans
+                )
+            ):
+                print(f"Export {job_id} running in background", file=sys.stderr)
+                return 0
+            background.discard(job_id)
+            print("Could not detach, exporting in the foreground", file=sys.stderr)
+
+    deadline = Deadline.resolve(args.deadline)
+    export_deferred(ExportJobs(Path.cwd()), deadline)
+    return export_session(
+        Path(transcript_path),
+        ExportReporter(args.json),
+        deadline,
+        roots,
+        args.link,
+        all_plans,
+    )
+
+
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(main(sys.argv[1:]))
@@ -2,40 +2,378 @@
 """
 Export all plan markdown files from ~/.claude/plans/ to project root.
 
-Scans all transcript JSONL files in TRANSCRIPT_DIR (excluding agent-* files),
-extracts plan slugs, and copies the corresponding plan files.
+Scans all transcript JSONL files in TRANSCRIPT_DIR (excluding agent-* files,
+or as selected with --include/--exclude), extracts plan slugs, and copies
+the corresponding plan files.
+
+Progress is checkpointed while the export runs; if it is interrupted, rerun
+with --resume to skip transcripts and plans that were already handled.
+With --dry-run, transcripts are scanned and plans resolved as usual, but
+only the planned copies and their sizes are reported. With --archive, the
+plans are streamed into one tar or zip archive instead of separate files.
+With --deadline (or PLAN_EXPORT_DEADLINE), an export that runs short of
+time copies what it has resolved, leaves its checkpoint as a deferral record
+and exits cleanly; the next export continues from it. With --dest and
+--worktrees, plans are also written to other checkouts: each plan is read
+once and the other copies are reflinked (or hard-linked) to the first.
+With --reconcile, exports whose plan was deleted or renamed, or that a
+newer export replaced under another name, are removed once the copies are
+done; --reconcile --dry-run previews the copies and removals together.
+Transcripts are read by whichever reader has measured fastest for their
+size and file system (see scan_strategy.py); --scan-strategy fixes one.
 """
 
-import json
+import argparse
 import os
-import shutil
+import re
 import sys
+import tarfile
+import zipfile
+from collections.abc import Sequence
+from fnmatch import fnmatchcase
 from pathlib import Path
+from typing import Protocol
 
+try:
+    # When executed as a script from within scripts/
+    from export_checkpoint import (
+        DEADLINE_ENV,
+        Deadline,
+        ExportCheckpoint,
+        ExportInterrupted,
+        signals_interrupt_export,
+    )
+    from export_events import ExportReporter
+    from plan_archive import STDOUT, PlanArchive, archive_format
+    from plan_copy import LINK_MODES, copy_plan_to_all, planned_action
+    from plan_destinations import WORKTREES_ENV, project_roots
+    from plan_index import exporter_index, record_plan
+    from plan_listing import list_plan_names
+    from plan_naming import PLAIN_NAME, case_insensitive, plain_names
+    from plan_reconcile import (
+        StaleExport,
+        record_exports,
+        remove_export,
+        scan_destinations,
+        scanned_action,
+    )
+    from scan_strategy import SCAN_STRATEGY_ENV, STRATEGIES, scan_adaptive
+    from slug_cache import SlugCache
+    from transcript_scan import CandidateSearch
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.export_project_plans
+    from scripts.export_checkpoint import (
+        DEADLINE_ENV,
+        Deadline,
+        ExportCheckpoint,
+        ExportInterrupted,
+        signals_interrupt_export,
+    )
+    from scripts.export_events import ExportReporter
+    from scripts.plan_archive import STDOUT, PlanArchive, archive_format
+    from scripts.plan_copy import LINK_MODES, copy_plan_to_all, planned_action
+    from scripts.plan_destinations import WORKTREES_ENV, project_roots
+    from scripts.plan_index import exporter_index, record_plan
+    from scripts.plan_listing import list_plan_names
+    from scripts.plan_naming import PLAIN_NAME, case_insensitive, plain_names
+    from scripts.plan_reconcile import (
+        StaleExport,
+        record_exports,
+        remove_export,
+        scan_destinations,
+        scanned_action,
+    )
+    from scripts.scan_strategy import SCAN_STRATEGY_ENV, STRATEGIES, scan_adaptive
+    from scripts.slug_cache import SlugCache
+    from scripts.transcript_scan import CandidateSearch
 
-def find_slugs_in_transcript(transcript_path: Path) -> set[str]:
-    """Scan transcript JSONL for all objects containing a 'slug' field."""
-    slugs: set[str] = set()
-    try:
-        with open(transcript_path, encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    obj = json.loads(line)
-                    if "slug" in obj:
-                        slugs.add(obj["slug"])
-                except json.JSONDecodeError:
-                    continue
-    except FileNotFoundError:
-        print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
-    except OSError as e:
-        print(f"Error reading transcript: {e}", file=sys.stderr)
+
+class PlanNamer(Protocol):
+    """Names the plans being exported; see plan_naming."""
+
+    def __call__(
+        self,
+        plans: list[tuple[str, os.stat_result]],
+        *,
+        case_insensitive: bool = False,
+    ) -> list[str]: ...
+
+
+DEFAULT_INCLUDE = ("*.jsonl",)
+DEFAULT_EXCLUDE = ("agent*",)
+
+
+def find_slugs_in_transcript(
+    transcript_path: Path, slugs: set[str] | None = None
+) -> set[str]:
+    """Scan transcript JSONL for all objects containing a 'slug' field.
+
+    When ``slugs`` is given, matches are added to it in place so one collection
+    can be shared across many transcripts.
+    """
+    if slugs is None:
+        slugs = set()
+    scan_adaptive(transcript_path, slugs.add)
     return slugs
 
 
-def main() -> int:
+def transcript_selected(
+    name: str,
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+) -> bool:
+    """Whether a transcript file name passes the include and exclude globs."""
+    return any(fnmatchcase(name, pattern) for pattern in include) and not any(
+        fnmatchcase(name, pattern) for pattern in exclude
+    )
+
+
+def _transcript_entries(
+    transcript_dir: Path,
+    checkpoint: ExportCheckpoint | None,
+    cache: SlugCache | None = None,
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+) -> list[tuple[Path, os.stat_result]]:
+    """List the selected transcripts that still need to be looked at.
+
+    Names are filtered before anything is stat'ed, and transcripts the slug
+    cache knows to be slug-free are dropped before anything is opened.
+    """
+    transcripts = []
+    with os.scandir(transcript_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if not transcript_selected(name, include, exclude):
+                continue
+            try:
+                st = entry.stat()
+            except OSError as e:
+                print(f"Error reading transcript: {e}", file=sys.stderr)
+                continue
+            if checkpoint and checkpoint.scanned.get(name) == st.st_size:
+                continue
+            if cache and cache.is_slug_free(name, st):
+                continue
+            transcripts.append((Path(entry.path), st))
+    return transcripts
+
+
+def collect_slugs(
+    transcript_dir: Path,
+    checkpoint: ExportCheckpoint | None = None,
+    candidates: set[str] | None = None,
+    jobs: int = 1,
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    deadline: Deadline | None = None,
+    strategy: str | None = None,
+) -> set[str]:
+    """Collect slugs from every non-agent transcript into one shared set.
+
+    Transcripts are read through the directory's slug cache, so only files
+    (or trailing bytes) that no earlier scan has seen are read. With a
+    checkpoint, its slug set is extended in place and transcripts that have
+    not grown since they were checkpointed are skipped outright.
+
+    With ``candidates``, only those slugs are collected: the cache is
+    consulted first, the bytes it does not cover are searched for the
+    outstanding candidates alone, and scanning stops once all are found.
+
+    ``jobs`` other than 1 scans each large transcript with that many
+    processes (0 means one per CPU). Only transcripts whose names match an
+    ``include`` glob and no ``exclude`` glob are read. ``strategy`` names
+    the reader instead of letting ``scan_strategy`` pick one.
+
+    Scanning stops early once ``deadline`` leaves only the time reserved for
+    copying; whatever was read by then is kept in the cache and checkpoint.
+    """
+    if deadline is None:
+        deadline = Deadline()
+    all_slugs = checkpoint.slugs if checkpoint else set()
+    cache = SlugCache.for_directory(transcript_dir)
+    transcripts = _transcript_entries(
+        transcript_dir, checkpoint, cache, include, exclude
+    )
+
+    if candidates is not None:
+        all_slugs.intersection_update(candidates)
+        search = CandidateSearch(candidates - all_slugs)
+        pending = []
+        for path, st in transcripts:
+            known, offset = cache.known(path.name, st)
+            search.discard(known)
+            all_slugs.update(slug for slug in known if slug in candidates)
+            if offset < st.st_size:
+                pending.append((path, st, offset))
+        for path, st, offset in pending:
+            if not search.remaining or deadline.scan_expired():
+                break
+            all_slugs.update(search.search(path, offset, deadline.scan_expired))
+            if checkpoint and search.remaining and not deadline.hit:
+                checkpoint.mark_scanned(path.name, st.st_size)
+        return all_slugs
+
+    try:
+        for path, st in transcripts:
+            if deadline.scan_expired():
+                break
+            all_slugs.update(
+                cache.scan(
+                    path,
+                    st,
+                    jobs=jobs,
+                    stop=deadline.scan_expired,
+                    strategy=strategy,
+                )
+            )
+            if checkpoint and not deadline.hit:
+                checkpoint.mark_scanned(path.name, st.st_size)
+    finally:
+        cache.save()
+    return all_slugs
+
+
+def list_plan_slugs(plans_dir: Path) -> set[str]:
+    """Return the slug of every plan file in ``plans_dir``."""
+    names = list_plan_names(plans_dir)
+    return {sys.intern(name[:-3]) for name in names if name.endswith(".md")}
+
+
+def resolve_plan_files(
+    slugs: set[str], plans_dir: Path, reporter: ExportReporter | None = None
+) -> list[tuple[str, Path]]:
+    """Match slugs against one listing of the plans directory.
+
+    The listing comes from the prewarmed cache while it is still fresh. A
+    ``Path`` is only built for slugs whose plan file actually exists.
+    """
+    if reporter is None:
+        reporter = ExportReporter()
+    plan_names = list_plan_names(plans_dir)
+
+    valid_files: list[tuple[str, Path]] = []
+    for slug in sorted(slugs):
+        name = f"{slug}.md"
+        if name not in plan_names:
+            source = os.path.join(plans_dir, name)
+            reporter.emit(
+                "missing",
+                f"Plan file not found for slug '{slug}': {source}",
+                error=True,
+                slug=slug,
+                source=source,
+            )
+            continue
+        valid_files.append((slug, plans_dir / name))
+    return valid_files
+
+
+def build_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted export from its checkpoint",
+    )
+    parser.add_argument(
+        "--early-exit",
+        action="store_true",
+        help="list ~/.claude/plans first, search transcripts for those plans "
+        "only and stop once every one has been referenced",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="scan large transcripts with N processes (0: one per CPU)",
+    )
+    parser.add_argument(
+        "--scan-strategy",
+        choices=("auto", *STRATEGIES),
+        help="how transcripts are read; auto picks the fastest measured so "
+        f"far for the file's size and file system (default: ${SCAN_STRATEGY_ENV})",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="write one JSON event per line instead of text",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="report which plans would be copied or overwritten, and their "
+        "total size, without copying anything",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="PATH",
+        help="write all plans into one archive (.tar.gz, .tgz, .tar or .zip) "
+        "instead of separate files; '-' streams a .tar.gz to stdout",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="only read transcripts whose file name matches GLOB; repeatable "
+        f"(default: {' '.join(DEFAULT_INCLUDE)})",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="skip transcripts whose file name matches GLOB; repeatable, "
+        f"replaces the default ({' '.join(DEFAULT_EXCLUDE)})",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="wrap up after SECONDS, copying what was found and deferring "
+        f"the rest to the next export (default: ${DEADLINE_ENV})",
+    )
+    parser.add_argument(
+        "--dest",
+        action="append",
+        metavar="DIR",
+        help="also export into DIR, e.g. another worktree; repeatable",
+    )
+    parser.add_argument(
+        "--worktrees",
+        action="store_true",
+        help="also export into every worktree of the current git repository "
+        f"(default: ${WORKTREES_ENV})",
+    )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="reflink",
+        help="how the copies after the first share its data; falls back to "
+        "copying where the file system cannot (default: reflink)",
+    )
+    parser.add_argument(
+        "--reconcile",
+        action="store_true",
+        help="also remove exports whose plan was deleted or renamed, or that "
+        "a newer export replaced; with --dry-run, only list them",
+    )
+    return parser
+
+
+def run(
+    args: argparse.Namespace,
+    exporter: str,
+    plan_names: PlanNamer,
+    name_pattern: re.Pattern[str] = PLAIN_NAME,
+) -> int:
+    """Export every plan referenced from TRANSCRIPT_DIR into the project.
+
+    ``plan_names`` maps the ``(slug, source stat)`` of every plan being
+    exported to their file names, in the same order, unique ignoring case
+    when a destination's file system ignores it; ``name_pattern``
+    matches every name it gives, so --reconcile recognises the exports.
+    """
     # 1. Get TRANSCRIPT_DIR env variable
     transcript_dir = os.environ.get("TRANSCRIPT_DIR")
     if not transcript_dir:
@@ -47,57 +385,413 @@ def main() -> int:
         print(f"TRANSCRIPT_DIR is not a directory: {transcript_dir}", file=sys.stderr)
         return 1
 
+    if args.archive is not None:
+        if args.reconcile:
+            print("--reconcile cannot be combined with --archive", file=sys.stderr)
+            return 1
+        if archive_format(args.archive) is None:
+            print(f"Unsupported archive type: {args.archive}", file=sys.stderr)
+            return 1
+        if args.archive != STDOUT:
+            args.archive = str(Path.cwd() / args.archive)
+
+    roots = project_roots(Path.cwd(), args.dest, args.worktrees)
+    for root in roots:
+        if not root.is_dir():
+            print(f"Destination is not a directory: {root}", file=sys.stderr)
+            return 1
+
+    checkpoint = ExportCheckpoint.for_export(exporter, transcript_path, Path.cwd())
+    if args.dry_run or args.archive is not None:
+        # Neither touches the project's plan files, so there is no progress
+        # worth checkpointing.
+        reporter = ExportReporter(args.json, to_stderr=args.archive == STDOUT)
+        try:
+            with signals_interrupt_export():
+                return _export(
+                    args,
+                    transcript_path,
+                    None,
+                    plan_names,
+                    reporter,
+                    Deadline(),
+                    roots,
+                    name_pattern,
+                )
+        except (ExportInterrupted, KeyboardInterrupt) as e:
+            signum = e.signum if isinstance(e, ExportInterrupted) else 2
+            return 128 + signum
+
+    if args.resume:
+        if checkpoint.load():
+            print(f"Resuming from checkpoint: {checkpoint.path}", file=sys.stderr)
+        else:
+            print("No checkpoint to resume, starting over", file=sys.stderr)
+    elif checkpoint.load() and checkpoint.deferred:
+        print(f"Resuming deferred export: {checkpoint.path}", file=sys.stderr)
+    else:
+        # An interrupted export is only continued when asked to.
+        checkpoint = ExportCheckpoint(checkpoint.path)
+
+    deadline = Deadline.resolve(args.deadline)
+    reporter = ExportReporter(args.json)
+    try:
+        with signals_interrupt_export():
+            result = _export(
+                args,
+                transcript_path,
+                checkpoint,
+                plan_names,
+                reporter,
+                deadline,
+                roots,
+                name_pattern,
+            )
+    except (ExportInterrupted, KeyboardInterrupt) as e:
+        checkpoint.flush()
+        print("Export interrupted; rerun with --resume to continue", file=sys.stderr)
+        signum = e.signum if isinstance(e, ExportInterrupted) else 2
+        reporter.summary(None, exit_code=128 + signum, interrupted=True)
+        return 128 + signum
+
+    if deadline.hit:
+        checkpoint.deferred = True
+        checkpoint.flush()
+        print(
+            "Deadline reached; the next export continues where this one stopped",
+            file=sys.stderr,
+        )
+    else:
+        checkpoint.discard()
+    return result
+
+
+def _export(
+    args: argparse.Namespace,
+    transcript_path: Path,
+    checkpoint: ExportCheckpoint | None,
+    plan_names: PlanNamer,
+    reporter: ExportReporter,
+    deadline: Deadline,
+    roots: list[Path],
+    name_pattern: re.Pattern[str] = PLAIN_NAME,
+) -> int:
+    """Scan, resolve and export; ``roots`` are the project directories."""
+    plans_source_dir = Path.home() / ".claude" / "plans"
+    candidates = None
+    if args.early_exit:
+        candidates = list_plan_slugs(plans_source_dir)
+        if not candidates:
+            print(f"No plan files found in {plans_source_dir}", file=sys.stderr)
+            reporter.summary(None, exported=0, exit_code=0)
+            return 0
+
     # 2. Parse all JSONL files, skip agent-* files
-    all_slugs: set[str] = set()
-    for jsonl_file in transcript_path.glob("*.jsonl"):
-        if jsonl_file.name.startswith("agent"):
-            continue
-        slugs = find_slugs_in_transcript(jsonl_file)
-        all_slugs.update(slugs)
+    with reporter.stage("scan"):
+        all_slugs = collect_slugs(
+            transcript_path,
+            checkpoint,
+            candidates,
+            args.jobs,
+            args.include or DEFAULT_INCLUDE,
+            DEFAULT_EXCLUDE if args.exclude is None else args.exclude,
+            deadline,
+            args.scan_strategy,
+        )
 
     if not all_slugs:
         print("No slugs found in any transcript files", file=sys.stderr)
+        reporter.summary(None, exported=0, exit_code=0)
         return 0
 
     # 3. Collect valid plan files
-    plans_source_dir = Path.home() / ".claude" / "plans"
-    valid_files: list[tuple[str, Path]] = []
+    with reporter.stage("resolve"):
+        valid_files = resolve_plan_files(all_slugs, plans_source_dir, reporter)
+        plans = _stat_plans(valid_files, reporter)
 
-    for slug in sorted(all_slugs):
-        source_file = plans_source_dir / f"{slug}.md"
+    # 4. Copy plan files (use plans/ folder only if more than one file)
+    use_plans_folder = len(valid_files) > 1
+    dest_dirs = [root / "plans" if use_plans_folder else root for root in roots]
+    with reporter.stage("resolve"):
+        # Names shared by every destination must not collide on any of them.
+        names = plan_names(
+            [(slug, st) for slug, _, st in plans],
+            case_insensitive=any(case_insensitive(d) for d in dest_dirs),
+        )
+    destinations = [
+        (slug, source_file, st, dest_dirs[0] / name)
+        for (slug, source_file, st), name in zip(plans, names, strict=True)
+    ]
 
-        if not source_file.exists():
-            print(
-                f"Plan file not found for slug '{slug}': {source_file}", file=sys.stderr
+    stale: list[StaleExport] | None = None
+    present: dict[Path, os.stat_result] | None = None
+    if args.reconcile:
+        with reporter.stage("reconcile"):
+            stale, present = scan_destinations(
+                dest_dirs,
+                name_pattern,
+                {dest_file.name: slug for slug, _, _, dest_file in destinations},
+                list_plan_slugs(plans_source_dir),
+                # Exports from when the plan count put them in the other layout.
+                [root if use_plans_folder else root / "plans" for root in roots],
             )
-            continue
 
-        valid_files.append((slug, source_file))
+    if args.dry_run:
+        return _report_plan(destinations, dest_dirs, reporter, stale, present)
+    if args.archive is not None:
+        return _write_archive(destinations, args.archive, reporter)
+    assert checkpoint is not None
+
+    if use_plans_folder:
+        for dest_dir in dest_dirs:
+            dest_dir.mkdir(exist_ok=True)
 
-    # 4. Copy plan files (use plans/ folder only if more than one file)
     copied = 0
-    use_plans_folder = len(valid_files) > 1
-    plans_dest_dir = Path.cwd() / "plans"
+    failed = set()
+    written: list[Path] = []
+    with reporter.stage("copy"), exporter_index() as index:
+        for slug, source_file, st, dest_file in destinations:
+            if deadline.expired():
+                break
+            dest_files = [dest_dir / dest_file.name for dest_dir in dest_dirs]
+            if slug in checkpoint.copied and all(d.exists() for d in dest_files):
+                for dest in dest_files:
+                    reporter.emit(
+                        "skipped",
+                        f"Already copied: {dest}",
+                        slug=slug,
+                        dest=dest,
+                        reason="checkpoint",
+                    )
+                copied += 1
+                written += dest_files
+                continue
 
-    if use_plans_folder and not plans_dest_dir.exists():
-        plans_dest_dir.mkdir(parents=True)
+            try:
+                results = copy_plan_to_all(source_file, dest_files, st, args.link)
+            except OSError as e:
+                reporter.emit(
+                    "error",
+                    f"Error copying {source_file}: {e}",
+                    error=True,
+                    slug=slug,
+                    source=source_file,
+                    message=str(e),
+                )
+                failed.add(slug)
+                continue
+            for dest, result in zip(dest_files, results, strict=True):
+                if result == "up-to-date":
+                    reporter.emit(
+                        "skipped",
+                        f"Up to date: {dest}",
+                        slug=slug,
+                        dest=dest,
+                        reason="up-to-date",
+                    )
+                else:
+                    reporter.emit(
+                        "copied",
+                        f"Copied: {dest}"
+                        + ("" if result == "copied" else f" ({result})"),
+                        slug=slug,
+                        source=source_file,
+                        dest=dest,
+                        method=result,
+                    )
+            if any(result != "up-to-date" for result in results):
+                record_plan(index, slug, source_file, st.st_mtime_ns, dest_files)
+            copied += 1
+            written += dest_files
+            checkpoint.mark_copied(slug)
+        record_exports(written)
 
-    for slug, source_file in valid_files:
-        if use_plans_folder:
-            dest_file = plans_dest_dir / f"plan-{slug}.md"
-        else:
-            dest_file = Path.cwd() / f"plan-{slug}.md"
+    if deadline.hit:
+        reporter.summary(
+            f"Exported {copied} plan file(s) before the deadline",
+            exported=copied,
+            deferred=True,
+            exit_code=0,
+        )
+        return 0
+    if stale is None:
+        reporter.summary(
+            f"Exported {copied} plan file(s)", exported=copied, exit_code=0
+        )
+        return 0
+    removed = _remove_stale(stale, failed, reporter)
+    reporter.summary(
+        f"Exported {copied} plan file(s), removed {removed} stale export(s)",
+        exported=copied,
+        removed=removed,
+        exit_code=0,
+    )
+    return 0
 
+
+def _remove_stale(
+    stale: list[StaleExport], failed: set[str], reporter: ExportReporter
+) -> int:
+    """Delete stale exports; those replacing a plan that failed to copy stay."""
+    removed = 0
+    with reporter.stage("reconcile"):
+        for slug, path, reason in stale:
+            if slug in failed:
+                continue
+            try:
+                if not remove_export(path):
+                    continue
+            except OSError as e:
+                reporter.emit(
+                    "error",
+                    f"Error removing {path}: {e}",
+                    error=True,
+                    slug=slug,
+                    dest=path,
+                    message=str(e),
+                )
+                continue
+            removed += 1
+            reporter.emit(
+                "removed",
+                f"Removed {reason} export: {path}",
+                slug=slug,
+                dest=path,
+                reason=reason,
+            )
+    return removed
+
+
+def _write_archive(
+    destinations: list[tuple[str, Path, os.stat_result, Path]],
+    target: str,
+    reporter: ExportReporter,
+) -> int:
+    """Stream every plan into the archive at ``target``."""
+    try:
+        with reporter.stage("archive"), PlanArchive(target) as archive:
+            for slug, source_file, st, dest_file in destinations:
+                archive.add(source_file, st, dest_file.name)
+                reporter.emit(
+                    "archived",
+                    f"Archived: {dest_file.name}",
+                    slug=slug,
+                    source=source_file,
+                    name=dest_file.name,
+                    bytes=st.st_size,
+                )
+    except (OSError, tarfile.TarError, zipfile.BadZipFile) as e:
+        reporter.emit(
+            "error",
+            f"Error writing archive {target}: {e}",
+            error=True,
+            archive=target,
+            message=str(e),
+        )
+        reporter.summary(None, exported=0, exit_code=1)
+        return 1
+
+    where = "stdout" if target == STDOUT else target
+    reporter.summary(
+        f"Archived {archive.count} plan file(s) to {where}",
+        exported=archive.count,
+        archive=where,
+        exit_code=0,
+    )
+    return 0
+
+
+def _stat_plans(
+    valid_files: list[tuple[str, Path]], reporter: ExportReporter
+) -> list[tuple[str, Path, os.stat_result]]:
+    """Stat every plan source once, for naming, planning and copying."""
+    plans = []
+    for slug, source_file in valid_files:
         try:
-            shutil.copy2(source_file, dest_file)
-            print(f"Copied: {dest_file}")
-            copied += 1
+            st = source_file.stat()
         except OSError as e:
-            print(f"Error copying {source_file}: {e}", file=sys.stderr)
+            reporter.emit(
+                "error",
+                f"Error reading {source_file}: {e}",
+                error=True,
+                slug=slug,
+                source=source_file,
+                message=str(e),
+            )
+            continue
+        plans.append((slug, source_file, st))
+    return plans
+
 
-    print(f"Exported {copied} plan file(s)")
+def _report_plan(
+    destinations: list[tuple[str, Path, os.stat_result, Path]],
+    dest_dirs: list[Path],
+    reporter: ExportReporter,
+    stale: list[StaleExport] | None = None,
+    present: dict[Path, os.stat_result] | None = None,
+) -> int:
+    """Report what an export would copy into each of ``dest_dirs``.
+
+    With ``stale`` (from --reconcile), the removals are reported too, and
+    ``present`` holds the destinations the reconcile scan already stat'ed.
+    No plan file is touched.
+    """
+    messages = {
+        "copy": "Would copy",
+        "overwrite": "Would overwrite",
+        "up-to-date": "Up to date",
+    }
+    actions = dict.fromkeys(messages, 0)
+    total_bytes = 0
+    with reporter.stage("plan"):
+        for slug, source_file, st, dest_file in destinations:
+            for dest_dir in dest_dirs:
+                dest = dest_dir / dest_file.name
+                if present is None:
+                    action = planned_action(st, dest)
+                else:
+                    action = scanned_action(st, present.get(dest))
+                size = 0 if action == "up-to-date" else st.st_size
+                actions[action] += 1
+                total_bytes += size
+                reporter.emit(
+                    "planned",
+                    f"{messages[action]}: {dest} ({size} bytes)",
+                    slug=slug,
+                    source=source_file,
+                    dest=dest,
+                    action=action,
+                    bytes=size,
+                )
+        for slug, path, reason in stale or []:
+            actions["remove"] = actions.get("remove", 0) + 1
+            reporter.emit(
+                "planned",
+                f"Would remove {reason} export: {path}",
+                slug=slug,
+                dest=path,
+                action="remove",
+                reason=reason,
+            )
+
+    removals = "" if stale is None else f", {len(stale)} to remove"
+    reporter.summary(
+        f"Dry run: {actions['copy']} to copy, {actions['overwrite']} to "
+        f"overwrite, {actions['up-to-date']} up to date{removals} "
+        f"({total_bytes} bytes)",
+        dry_run=True,
+        actions=actions,
+        bytes=total_bytes,
+        exit_code=0,
+    )
     return 0
 
 
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser("Export all project plans to the current directory.")
+    args = parser.parse_args(argv or [])
+    return run(args, "export_project_plans", plain_names)
+
+
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(main(sys.argv[1:]))
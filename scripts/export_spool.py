@@ -0,0 +1,102 @@
+"""Spool directory that coalesces bursts of SessionEnd exports.
+
+With PLAN_EXPORT_SPOOL set, each SessionEnd hook only drops a small job
+file into the spool and then tries to become the leader by taking an
+exclusive, non-blocking ``flock``. The one hook that gets the lock drains
+the spool in batches; the others return at once. A leader checks the spool
+again after releasing the lock, so a job dropped while it was finishing is
+never stranded: either the leader sees it, or the hook that dropped it
+finds the lock free.
+
+Job files are removed only after their batch has been exported, so jobs
+of a leader that dies are picked up by the next one.
+"""
+
+import contextlib
+import fcntl
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+try:
+    # When executed as a script from within scripts/
+    from plan_state import read_json, state_dir, write_json_atomic
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.export_spool
+    from scripts.plan_state import read_json, state_dir, write_json_atomic
+
+SPOOL_ENV = "PLAN_EXPORT_SPOOL"
+SPOOL_SETTLE = 0.05
+
+
+class ExportSpool:
+    """Queued SessionEnd exports, shared by all projects."""
+
+    def __init__(self) -> None:
+        self.root = state_dir() / "spool"
+        self.lock_path = self.root / "leader.lock"
+
+    def submit(
+        self,
+        transcript_path: str,
+        dest_dirs: list[Path],
+        link: str = "reflink",
+        all_plans: bool = False,
+    ) -> None:
+        """Queue the export of ``transcript_path`` into ``dest_dirs``."""
+        path = self.root / f"{time.time_ns():x}-{os.getpid()}.json"
+        write_json_atomic(
+            path,
+            {
+                "transcript_path": transcript_path,
+                "dest_dirs": [str(dest_dir) for dest_dir in dest_dirs],
+                "link": link,
+                "all_plans": all_plans,
+                "submitted": time.time(),
+            },
+        )
+
+    def queued(self) -> list[Path]:
+        """Job files in the spool, oldest first."""
+        try:
+            with os.scandir(self.root) as entries:
+                names = [
+                    entry.name for entry in entries if entry.name.endswith(".json")
+                ]
+        except OSError:
+            return []
+        return [self.root / name for name in sorted(names)]
+
+    def take(self) -> list[tuple[Path, dict[str, Any]]]:
+        """Read every queued job; unreadable job files are dropped."""
+        jobs = []
+        for path in self.queued():
+            record = read_json(path)
+            if isinstance(record, dict) and isinstance(
+                record.get("transcript_path"), str
+            ):
+                jobs.append((path, record))
+            else:
+                path.unlink(missing_ok=True)
+        return jobs
+
+    def done(self, paths: list[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    @contextlib.contextmanager
+    def lead(self) -> Iterator[bool]:
+        """Try to become the leader; yields whether this process is it."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,130 @@
+"""Page-cache policy for the transcript readers.
+
+Transcripts are read once, front to back, and the slug cache means they
+are rarely read again, so keeping them in the page cache only pushes out
+data other processes need. Readers declare the pass as sequential (which
+also widens the kernel's readahead), ask for the next window ahead of
+time, and drop the ranges they have consumed. PLAN_EXPORT_IO_POLICY
+selects the behaviour:
+
+    drop  sequential reads, consumed ranges are dropped (default)
+    keep  sequential reads, pages stay cached
+    off   no advice at all
+
+With PLAN_EXPORT_IO_IDLE=1, background exports and the prewarm worker also
+switch to the idle I/O scheduling class, so they only use the disk when
+nothing else does. Every hint is best effort and silently skipped where
+the platform lacks it.
+"""
+
+import os
+import sys
+
+IO_POLICY_ENV = "PLAN_EXPORT_IO_POLICY"
+IO_IDLE_ENV = "PLAN_EXPORT_IO_IDLE"
+POLICIES = ("drop", "keep", "off")
+# Consumed bytes are dropped, and the next window requested, this often.
+DROP_BEHIND_BYTES = 8 << 20
+READAHEAD_BYTES = 8 << 20
+# The kernel skips a cached folio that a drop range only partly covers, and
+# file folios can be up to this large.
+FOLIO_BYTES = 2 << 20
+
+# ioprio_set(2) is Linux-only, has no libc wrapper and a per-architecture
+# syscall number, keyed by the machine names Linux reports.
+_IOPRIO_SET = {"x86_64": 251, "i686": 289, "aarch64": 30}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+
+
+def io_policy() -> str:
+    """The policy named by PLAN_EXPORT_IO_POLICY; unknown values mean drop."""
+    policy = os.environ.get(IO_POLICY_ENV, "drop")
+    return policy if policy in POLICIES else "drop"
+
+
+def _advise(fd: int, offset: int, length: int, advice: int) -> None:
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+
+class SequentialRead:
+    """Page-cache advice for one front-to-back pass over an open file.
+
+    Call ``consumed`` with the offset reached as the reader advances and
+    ``finish`` once it is done. Each drop starts from the folio boundary
+    below the end of the previous one, so a folio cut by that boundary is
+    dropped the second time round.
+    """
+
+    def __init__(self, fd: int, offset: int = 0) -> None:
+        policy = io_policy()
+        self.fd = fd
+        self.enabled = policy != "off" and hasattr(os, "posix_fadvise")
+        self.drop = self.enabled and policy == "drop"
+        self._start = self._dropped = self._mark = offset
+        if self.enabled:
+            _advise(fd, offset, 0, os.POSIX_FADV_SEQUENTIAL)
+            _advise(fd, offset, READAHEAD_BYTES, os.POSIX_FADV_WILLNEED)
+
+    def consumed(self, position: int) -> None:
+        """Note that everything before ``position`` has been read."""
+        if not self.enabled or position - self._mark < DROP_BEHIND_BYTES:
+            return
+        if self.drop:
+            self._drop(position)
+        _advise(self.fd, position, READAHEAD_BYTES, os.POSIX_FADV_WILLNEED)
+        self._mark = position
+
+    def finish(self, position: int) -> None:
+        """Drop the rest of the consumed range."""
+        if self.drop:
+            self._drop(position)
+
+    def _drop(self, end: int) -> None:
+        start = max(self._start, self._dropped - self._dropped % FOLIO_BYTES)
+        if end > start:
+            _advise(self.fd, start, end - start, os.POSIX_FADV_DONTNEED)
+            self._dropped = end
+
+
+def drop_range(fd: int, start: int, end: int) -> None:
+    """Drop ``[start, end)`` of a file read by other means (e.g. mmap)."""
+    if io_policy() == "drop" and hasattr(os, "posix_fadvise") and end > start:
+        _advise(fd, start, end - start, os.POSIX_FADV_DONTNEED)
+
+
+def use_idle_io() -> bool:
+    """Move this process to the idle I/O class if PLAN_EXPORT_IO_IDLE is set.
+
+    Returns whether the class was changed; never on platforms other than
+    Linux, where the same syscall numbers mean something else.
+    """
+    if os.environ.get(IO_IDLE_ENV, "") in ("", "0"):
+        return False
+    if not sys.platform.startswith("linux"):
+        return False
+    # Imported here: ctypes and platform cost more to load than a hook
+    # that never asks for idle I/O should pay.
+    import ctypes
+    import ctypes.util
+    import platform
+
+    number = _IOPRIO_SET.get(platform.machine())
+    libc_name = ctypes.util.find_library("c")
+    if number is None or libc_name is None:
+        return False
+    try:
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        result = libc.syscall(
+            number,
+            _IOPRIO_WHO_PROCESS,
+            0,
+            _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT,
+        )
+    except (OSError, AttributeError):
+        return False
+    return bool(result == 0)
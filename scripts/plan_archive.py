@@ -0,0 +1,132 @@
+"""Bundle exported plans into one tar or zip archive.
+
+Plans are streamed into the archive one after another in large blocks, so
+no plan is held in memory and the archive is written strictly in order. An
+archive file is written next to its final path and renamed into place when
+complete; ``-`` streams a gzipped tar to stdout. Members keep the mtime of
+their source plan.
+"""
+
+import contextlib
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import BinaryIO
+
+COPY_BUFSIZE = 1 << 20
+STDOUT = "-"
+FORMATS = {".tar.gz": "tar.gz", ".tgz": "tar.gz", ".tar": "tar", ".zip": "zip"}
+
+
+def archive_format(target: str) -> str | None:
+    """The format for ``target``, from its extension; None if unsupported."""
+    if target == STDOUT:
+        return "tar.gz"
+    lowered = target.lower()
+    for suffix, fmt in FORMATS.items():
+        if lowered.endswith(suffix):
+            return fmt
+    return None
+
+
+class PlanArchive:
+    """Write plans into an archive; use as a context manager.
+
+    Leaving the ``with`` block because of an exception discards a partially
+    written archive file.
+    """
+
+    def __init__(self, target: str) -> None:
+        fmt = archive_format(target)
+        if fmt is None:
+            raise ValueError(
+                f"Unsupported archive type: {target} "
+                f"(use {', '.join(FORMATS)} or {STDOUT})"
+            )
+        self.target = target
+        self.format = fmt
+        self.count = 0
+        self._tmp_path: str | None = None
+        self._stream: BinaryIO
+        self._tar: tarfile.TarFile | None = None
+        self._zip: zipfile.ZipFile | None = None
+
+    def __enter__(self) -> "PlanArchive":
+        if self.target == STDOUT:
+            self._stream = sys.stdout.buffer
+        else:
+            path = Path(self.target)
+            fd, self._tmp_path = tempfile.mkstemp(
+                dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+            )
+            os.fchmod(fd, 0o644)
+            self._stream = os.fdopen(fd, "wb")
+        if self.format == "zip":
+            self._zip = zipfile.ZipFile(self._stream, "w", zipfile.ZIP_DEFLATED)
+        else:
+            if self.format == "tar.gz":
+                self._tar = tarfile.open(
+                    fileobj=self._stream, mode="w|gz", bufsize=COPY_BUFSIZE
+                )
+            else:
+                self._tar = tarfile.open(
+                    fileobj=self._stream, mode="w|", bufsize=COPY_BUFSIZE
+                )
+            # Read members in large blocks too, not the 16 KiB default.
+            self._tar.copybufsize = COPY_BUFSIZE  # type: ignore[attr-defined]
+        return self
+
+    def add(self, source: Path, st: os.stat_result, name: str) -> None:
+        """Append ``source`` (whose stat result is ``st``) as ``name``."""
+        with open(source, "rb") as f:
+            if self._zip is not None:
+                info = zipfile.ZipInfo(name, _zip_date_time(st.st_mtime))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                info.file_size = st.st_size
+                with self._zip.open(info, "w") as member:
+                    shutil.copyfileobj(f, member, COPY_BUFSIZE)
+            elif self._tar is not None:
+                tarinfo = tarfile.TarInfo(name)
+                tarinfo.size = st.st_size
+                tarinfo.mtime = int(st.st_mtime)
+                tarinfo.mode = 0o644
+                self._tar.addfile(tarinfo, f)
+        self.count += 1
+
+    def __exit__(self, exc_type: object, *_exc_info: object) -> None:
+        try:
+            if self._zip is not None:
+                self._zip.close()
+            if self._tar is not None:
+                self._tar.close()
+            self._stream.flush()
+            if self._tmp_path is not None:
+                os.fsync(self._stream.fileno())
+                self._stream.close()
+        except BaseException:
+            self._discard()
+            raise
+        if exc_type is not None:
+            self._discard()
+        elif self._tmp_path is not None:
+            os.replace(self._tmp_path, self.target)
+
+    def _discard(self) -> None:
+        if self._tmp_path is not None:
+            self._stream.close()
+            with contextlib.suppress(OSError):
+                os.unlink(self._tmp_path)
+
+
+def _zip_date_time(mtime: float) -> tuple[int, int, int, int, int, int]:
+    """Local time as a zip timestamp, which cannot go before 1980."""
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return (1980, 1, 1, 0, 0, 0)
+    return (t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec)
@@ -0,0 +1,157 @@
+"""Copy plan files so concurrent exporters of the same plan copy it once.
+
+Every destination has a sidecar lock file under the state directory. An
+exporter takes the lock, then checks whether the destination already matches
+the source (same size and mtime, which ``shutil.copy2`` preserves). Only if
+it does not is the file copied, so exporters that waited on the lock find a
+fresh copy and return straight away.
+
+A plan exported to several destinations is copied from the source once;
+the other destinations are reflinked (or, when asked, hard-linked) to that
+first copy and fall back to copying it where the file system cannot.
+"""
+
+import contextlib
+import errno
+import fcntl
+import os
+import shutil
+import sys
+import tempfile
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+
+try:
+    # When executed as a script from within scripts/
+    from plan_state import state_dir, state_key
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.plan_copy
+    from scripts.plan_state import state_dir, state_key
+
+LINK_MODES = ("reflink", "hardlink", "copy")
+# ioctl(2) request that clones a whole file on Linux (btrfs, XFS, ...).
+FICLONE = 0x40049409
+# Errors meaning "this file system cannot share the data", not real failures.
+_CANNOT_LINK = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EMLINK,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.ENOSYS,
+}
+
+
+def is_up_to_date(source_stat: os.stat_result, dest: Path) -> bool:
+    """Whether ``dest`` already holds a copy2 of a file with ``source_stat``."""
+    try:
+        dest_stat = dest.stat()
+    except OSError:
+        return False
+    return same_copy(source_stat, dest_stat)
+
+
+def same_copy(source_stat: os.stat_result, dest_stat: os.stat_result) -> bool:
+    """Whether ``dest_stat`` describes a copy2 of a file with ``source_stat``."""
+    return (
+        dest_stat.st_size == source_stat.st_size
+        and dest_stat.st_mtime_ns == source_stat.st_mtime_ns
+    )
+
+
+def planned_action(source_stat: os.stat_result, dest: Path) -> str:
+    """What ``copy_plan_to_all`` would do: "copy", "overwrite" or "up-to-date"."""
+    if is_up_to_date(source_stat, dest):
+        return "up-to-date"
+    return "overwrite" if dest.exists() else "copy"
+
+
+@contextlib.contextmanager
+def destination_lock(dest: Path) -> Iterator[None]:
+    """Hold an exclusive lock for ``dest`` while the body runs.
+
+    If the lock file cannot be created the body runs unlocked, which is no
+    worse than copying without coordination.
+    """
+    lock_path = state_dir() / "locks" / f"{state_key(str(dest.absolute()))}.lock"
+    try:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, "a")
+    except OSError:
+        yield
+        return
+    with lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+def copy_plan_to_all(
+    source: Path,
+    dests: Sequence[Path],
+    source_stat: os.stat_result | None = None,
+    link: str = "reflink",
+) -> list[str]:
+    """Copy ``source`` to every path in ``dests``, reading the source once.
+
+    Returns, for each destination, "copied", "reflinked", "linked" or
+    "up-to-date". The first destination gets a real copy (or is already up
+    to date); the rest share its data as ``link`` says, copying it instead
+    where the file system cannot. Errors are raised to the caller.
+    """
+    if source_stat is None:
+        source_stat = source.stat()
+    results = []
+    origin: Path | None = None
+    for dest in dests:
+        with destination_lock(dest):
+            if is_up_to_date(source_stat, dest):
+                results.append("up-to-date")
+            elif origin is None:
+                shutil.copy2(source, dest)
+                results.append("copied")
+            else:
+                results.append(_share(origin, dest, link))
+        if origin is None:
+            origin = dest
+    return results
+
+
+def _share(origin: Path, dest: Path, link: str) -> str:
+    """Make ``dest`` a copy of ``origin`` that shares its data if possible."""
+    try:
+        if link == "hardlink":
+            _replace_with(dest, lambda tmp: _hardlink(origin, tmp))
+            return "linked"
+        if link == "reflink" and sys.platform.startswith("linux"):
+            _replace_with(dest, lambda tmp: _reflink(origin, tmp))
+            return "reflinked"
+    except OSError as e:
+        if e.errno not in _CANNOT_LINK:
+            raise
+    shutil.copy2(origin, dest)
+    return "copied"
+
+
+def _replace_with(dest: Path, create: Callable[[Path], None]) -> None:
+    """Build ``dest`` under a temporary name with ``create``, then rename it."""
+    fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.")
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        create(tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _hardlink(origin: Path, tmp: Path) -> None:
+    tmp.unlink()
+    os.link(origin, tmp)
+
+
+def _reflink(origin: Path, tmp: Path) -> None:
+    with open(origin, "rb") as src, open(tmp, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(origin, tmp)
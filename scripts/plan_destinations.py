@@ -0,0 +1,81 @@
+"""Project roots that exported plans are written to.
+
+Plans go to the current directory, to every ``--dest`` directory and, with
+--worktrees (or PLAN_EXPORT_WORKTREES=1), to every worktree of the current
+git repository. Each root is listed once, the current directory first, so
+it is the one that receives the real copy. A worktree whose directory is
+gone is skipped with a warning; only ``--dest`` directories are required
+to exist.
+"""
+
+import os
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+WORKTREES_ENV = "PLAN_EXPORT_WORKTREES"
+GIT_TIMEOUT = 5
+
+
+def git_worktrees(cwd: Path) -> list[Path]:
+    """The worktrees of the repository containing ``cwd``; [] outside one.
+
+    Bare entries, worktrees git marks prunable and any other worktree that
+    is not a directory are left out.
+    """
+    # Only loaded when worktrees are asked for; hooks run without them.
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            ["git", "worktree", "list", "--porcelain"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=GIT_TIMEOUT,
+            check=False,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Could not list git worktrees: {e}", file=sys.stderr)
+        return []
+    if result.returncode != 0:
+        print("Not in a git repository, ignoring --worktrees", file=sys.stderr)
+        return []
+
+    worktrees = []
+    path: Path | None = None
+    for line in result.stdout.splitlines() + [""]:
+        if line.startswith("worktree "):
+            path = Path(line[len("worktree ") :])
+        elif line == "bare" or line.split(" ", 1)[0] == "prunable":
+            path = None
+        elif not line and path is not None:
+            if path.is_dir():
+                worktrees.append(path)
+            else:
+                print(f"Skipping missing worktree: {path}", file=sys.stderr)
+            path = None
+    return worktrees
+
+
+def worktrees_requested(flag: bool) -> bool:
+    return flag or os.environ.get(WORKTREES_ENV, "") not in ("", "0")
+
+
+def project_roots(
+    cwd: Path, dests: Sequence[str] | None = None, worktrees: bool = False
+) -> list[Path]:
+    """``cwd``, then the ``dests`` (relative to ``cwd``) and the worktrees."""
+    roots = [cwd]
+    roots += [cwd / dest for dest in dests or ()]
+    if worktrees_requested(worktrees):
+        roots += git_worktrees(cwd)
+
+    seen = set()
+    unique = []
+    for root in roots:
+        key = os.path.realpath(root)
+        if key not in seen:
+            seen.add(key)
+            unique.append(root)
+    return unique
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""Revision history of exported plans.
+
+Every time an export actually copies a plan (not when the copy is already
+up to date), the plan's text is recorded as a new revision of its slug.
+Each slug's history is one JSON file under the state directory holding the
+latest text in full and, for each earlier revision, a reverse line delta
+that turns the next revision back into it. Every SNAPSHOT_INTERVAL-th
+revision keeps its full text instead, so rebuilding any revision applies at
+most SNAPSHOT_INTERVAL - 1 deltas. Only the last HISTORY_LIMIT revisions
+are kept.
+
+Exports only append the new text to the slug's journal, a JSON Lines file
+next to its history, so recording costs one small write and no diff.
+Reading the history folds the journal into the deltas and saves them;
+so does an export whose append takes the journal past JOURNAL_LIMIT bytes,
+which keeps it bounded for plans nobody looks at. Recording is on unless
+PLAN_EXPORT_HISTORY=0.
+
+    plan_history.py                       slugs with a history
+    plan_history.py log SLUG              revisions of one plan
+    plan_history.py show SLUG [REV]       text of a revision (default: latest)
+    plan_history.py diff SLUG [OLD [NEW]] unified diff (default: last change)
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+try:
+    # When executed as a script from within scripts/
+    from plan_copy import destination_lock
+    from plan_state import read_json, state_dir, state_key, write_json_atomic
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.plan_history
+    from scripts.plan_copy import destination_lock
+    from scripts.plan_state import read_json, state_dir, state_key, write_json_atomic
+
+HISTORY_ENV = "PLAN_EXPORT_HISTORY"
+HISTORY_VERSION = 1
+SNAPSHOT_INTERVAL = 16
+HISTORY_LIMIT = 200
+# Journals are folded into the history once they grow past this size.
+JOURNAL_LIMIT = 1 << 20
+
+# A delta is a list of [start, end, lines]: replace lines[start:end] of the
+# newer revision with ``lines``. Ranges are in the newer revision's
+# numbering and in ascending order.
+Delta = list[list[Any]]
+
+
+def history_enabled() -> bool:
+    return os.environ.get(HISTORY_ENV, "") != "0"
+
+
+def history_path(slug: str) -> Path:
+    path: Path = state_dir() / "history" / f"{state_key(slug)}.json"
+    return path
+
+
+def journal_path(slug: str) -> Path:
+    return history_path(slug).with_suffix(".jsonl")
+
+
+def _read_journal(path: Path) -> list[dict[str, Any]]:
+    """The revisions appended to ``path``; a torn last line is skipped."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict) and isinstance(record.get("text"), str):
+            records.append(record)
+    return records
+
+
+def make_delta(new: list[str], old: list[str]) -> Delta:
+    """The reverse delta that turns ``new`` back into ``old``."""
+    matcher = difflib.SequenceMatcher(None, new, old, autojunk=False)
+    return [
+        [i1, i2, old[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(new: list[str], delta: Delta) -> list[str]:
+    old: list[str] = []
+    pos = 0
+    for start, end, lines in delta:
+        old += new[pos:start]
+        old += lines
+        pos = end
+    old += new[pos:]
+    return old
+
+
+def _lines(text: str) -> list[str]:
+    return text.splitlines(keepends=True)
+
+
+class PlanHistory:
+    """The recorded revisions of one plan."""
+
+    def __init__(self, slug: str) -> None:
+        self.slug = slug
+        self.path = history_path(slug)
+        self.revisions: list[dict[str, Any]] = []
+        self.latest: list[str] = []
+        data = read_json(self.path)
+        if (
+            isinstance(data, dict)
+            and data.get("version") == HISTORY_VERSION
+            and isinstance(data.get("revisions"), list)
+            and isinstance(data.get("latest"), list)
+        ):
+            self.revisions = data["revisions"]
+            self.latest = data["latest"]
+        # Revisions still in the journal, folded in as if added in order.
+        self.journaled = _read_journal(journal_path(slug))
+        for record in self.journaled:
+            self.add(record["text"], record.get("mtime_ns", 0), record.get("recorded"))
+
+    def numbers(self) -> list[int]:
+        return [int(revision["rev"]) for revision in self.revisions]
+
+    def text(self, rev: int | None = None) -> str:
+        """The text of revision ``rev`` (default: the latest).
+
+        Raises KeyError for a revision that is not in the history.
+        """
+        numbers = self.numbers()
+        if rev is None and numbers:
+            rev = numbers[-1]
+        if rev not in numbers:
+            raise KeyError(rev)
+        index = numbers.index(rev)
+        # Walk back from the nearest newer full text.
+        start = len(numbers) - 1
+        for candidate in range(index, len(numbers) - 1):
+            if "text" in self.revisions[candidate]:
+                start = candidate
+                break
+        lines = (
+            self.latest if start == len(numbers) - 1 else self.revisions[start]["text"]
+        )
+        for position in range(start - 1, index - 1, -1):
+            lines = apply_delta(lines, self.revisions[position]["delta"])
+        return "".join(lines)
+
+    def add(
+        self, text: str, mtime_ns: int, recorded: float | None = None
+    ) -> int | None:
+        """Record ``text`` as a new revision; None if it matches the latest."""
+        digest = hashlib.sha1(text.encode("utf-8", "surrogateescape")).hexdigest()
+        if self.revisions and self.revisions[-1]["sha1"] == digest:
+            return None
+        new = _lines(text)
+        if self.revisions:
+            previous = self.revisions[-1]
+            if previous["rev"] % SNAPSHOT_INTERVAL == 0:
+                previous["text"] = self.latest
+            else:
+                previous["delta"] = make_delta(new, self.latest)
+        rev = self.revisions[-1]["rev"] + 1 if self.revisions else 1
+        self.revisions.append(
+            {
+                "rev": rev,
+                "sha1": digest,
+                "mtime_ns": mtime_ns,
+                "recorded": time.time() if recorded is None else recorded,
+                "lines": len(new),
+            }
+        )
+        self.latest = new
+        del self.revisions[:-HISTORY_LIMIT]
+        return rev
+
+    def save(self) -> None:
+        """Write the history, journaled revisions included, and drop the journal.
+
+        Callers hold the history's lock, so nothing is appended meanwhile.
+        """
+        write_json_atomic(
+            self.path,
+            {
+                "version": HISTORY_VERSION,
+                "slug": self.slug,
+                "revisions": self.revisions,
+                "latest": self.latest,
+            },
+        )
+        if self.journaled:
+            journal_path(self.slug).unlink(missing_ok=True)
+            self.journaled = []
+
+
+def compact(slug: str) -> PlanHistory:
+    """``slug``'s history, with its journal folded in and saved."""
+    with destination_lock(history_path(slug)):
+        history = PlanHistory(slug)
+        if history.journaled:
+            history.save()
+    return history
+
+
+def record_revision(slug: str, data: bytes, mtime_ns: int) -> None:
+    """Append ``data``, the plan's current contents, to ``slug``'s journal.
+
+    Called after a plan was actually copied, so up-to-date exports cost
+    nothing; failures only cost the revision.
+    """
+    if not history_enabled():
+        return
+    record = {
+        "slug": slug,
+        "mtime_ns": mtime_ns,
+        "recorded": time.time(),
+        "text": data.decode("utf-8", errors="surrogateescape"),
+    }
+    path = journal_path(slug)
+    try:
+        with destination_lock(history_path(slug)):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                size = f.tell()
+        if size > JOURNAL_LIMIT:
+            compact(slug)
+    except OSError as e:
+        print(f"Could not record plan revision: {e}", file=sys.stderr)
+
+
+def _compact_all() -> None:
+    try:
+        journals = sorted((state_dir() / "history").glob("*.jsonl"))
+    except OSError:
+        return
+    for journal in journals:
+        records = _read_journal(journal)
+        if records and isinstance(records[0].get("slug"), str):
+            try:
+                compact(records[0]["slug"])
+            except OSError as e:
+                print(f"Could not save plan history: {e}", file=sys.stderr)
+
+
+def _all_slugs() -> list[tuple[str, int]]:
+    _compact_all()
+    try:
+        paths = sorted((state_dir() / "history").glob("*.json"))
+    except OSError:
+        return []
+    slugs = []
+    for path in paths:
+        data = read_json(path)
+        if isinstance(data, dict) and isinstance(data.get("revisions"), list):
+            slugs.append((str(data.get("slug")), len(data["revisions"])))
+    return sorted(slugs)
+
+
+def _show_log(history: PlanHistory) -> None:
+    for revision in history.revisions:
+        when = time.strftime(
+            "%Y-%m-%d %H:%M:%S", time.localtime(revision["mtime_ns"] / 1e9)
+        )
+        print(f"{revision['rev']:>4}  {when}  {revision['lines']:>5} lines")
+
+
+def _diff(history: PlanHistory, old: int | None, new: int | None) -> int:
+    numbers = history.numbers()
+    if new is None:
+        new = numbers[-1]
+    if old is None:
+        if new not in numbers:
+            print(f"No revision {new} of {history.slug}", file=sys.stderr)
+            return 1
+        if numbers.index(new) == 0:
+            print(f"No revision before {new}", file=sys.stderr)
+            return 1
+        old = numbers[numbers.index(new) - 1]
+    try:
+        old_lines = _lines(history.text(old))
+        new_lines = _lines(history.text(new))
+    except KeyError as e:
+        print(f"No revision {e.args[0]} of {history.slug}", file=sys.stderr)
+        return 1
+    sys.stdout.writelines(
+        difflib.unified_diff(
+            old_lines,
+            new_lines,
+            f"plan-{history.slug}.md@{old}",
+            f"plan-{history.slug}.md@{new}",
+        )
+    )
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Show the history of exported plans.")
+    parser.add_argument("command", nargs="?", choices=["log", "show", "diff"])
+    parser.add_argument("slug", nargs="?")
+    parser.add_argument("revisions", nargs="*", type=int, metavar="REV")
+    args = parser.parse_args(argv or [])
+
+    if args.command is None:
+        slugs = _all_slugs()
+        if not slugs:
+            hint = "" if history_enabled() else f" (turned off by {HISTORY_ENV}=0)"
+            print(f"No plan history{hint}")
+        for slug, count in slugs:
+            print(f"{slug}  {count} revision(s)")
+        return 0
+    if args.slug is None:
+        parser.error(f"{args.command} needs a SLUG")
+
+    try:
+        history = compact(args.slug)
+    except OSError as e:
+        print(f"Could not save the history of {args.slug}: {e}", file=sys.stderr)
+        history = PlanHistory(args.slug)
+    if not history.revisions:
+        print(f"No history for {args.slug}", file=sys.stderr)
+        return 1
+    if args.command == "log":
+        _show_log(history)
+        return 0
+    if args.command == "show":
+        if len(args.revisions) > 1:
+            parser.error("show takes at most one REV")
+        rev = args.revisions[0] if args.revisions else None
+        try:
+            sys.stdout.write(history.text(rev))
+        except KeyError:
+            print(f"No revision {rev} of {args.slug}", file=sys.stderr)
+            return 1
+        return 0
+    if len(args.revisions) > 2:
+        parser.error("diff takes at most two REVs")
+    old = new = None
+    if len(args.revisions) == 1:
+        new = args.revisions[0]
+    elif len(args.revisions) == 2:
+        old, new = args.revisions
+    return _diff(history, old, new)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
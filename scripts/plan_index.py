@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""Full-text index over exported plans.
+
+The exporters add a plan to the index whenever they copy it, together with
+the directories it was exported to; a plan whose mtime is already indexed
+is skipped. The index is an SQLite FTS5 table when the interpreter's SQLite
+has FTS5, and otherwise an inverted index kept in a JSON file. Both rank
+matches with BM25 and require every query word to appear.
+
+    plan_index.py search WORDS... [--limit N] [--json]
+    plan_index.py rebuild         index every plan in ~/.claude/plans
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import math
+import re
+import sqlite3
+import sys
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+try:
+    # When executed as a script from within scripts/
+    from plan_copy import destination_lock
+    from plan_history import history_enabled, record_revision
+    from plan_state import read_json, state_dir, write_json_atomic
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.plan_index
+    from scripts.plan_copy import destination_lock
+    from scripts.plan_history import history_enabled, record_revision
+    from scripts.plan_state import read_json, state_dir, write_json_atomic
+
+INDEX_VERSION = 1
+SQLITE_TIMEOUT = 5.0
+# BM25 parameters, the same as FTS5's defaults.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# (slug, score, destination directories); higher scores rank first.
+SearchHit = tuple[str, float, list[str]]
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased runs of letters and digits, close to FTS5's unicode61."""
+    return _WORD.findall(text.casefold())
+
+
+@functools.cache
+def fts5_available() -> bool:
+    try:
+        with contextlib.closing(sqlite3.connect(":memory:")) as db:
+            db.execute("CREATE VIRTUAL TABLE probe USING fts5(body)")
+    except sqlite3.Error:
+        return False
+    return True
+
+
+class SqlitePlanIndex:
+    """The index as an FTS5 table in an SQLite database."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=SQLITE_TIMEOUT)
+        # In WAL mode a commit does not wait for fsync, which keeps indexing
+        # off the export's critical path.
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS plans"
+                " (slug TEXT PRIMARY KEY, mtime_ns INTEGER, dests TEXT)"
+            )
+            self.db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS plan_text"
+                " USING fts5(slug UNINDEXED, body)"
+            )
+
+    def update(self, slug: str, text: str, mtime_ns: int, dests: Sequence[str]) -> bool:
+        with self.db:
+            row = self.db.execute(
+                "SELECT mtime_ns, dests FROM plans WHERE slug = ?", (slug,)
+            ).fetchone()
+            known = json.loads(row[1]) if row else []
+            merged = known + [dest for dest in dests if dest not in known]
+            if row and row[0] == mtime_ns:
+                if merged != known:
+                    self.db.execute(
+                        "UPDATE plans SET dests = ? WHERE slug = ?",
+                        (json.dumps(merged), slug),
+                    )
+                return False
+            self.db.execute("DELETE FROM plan_text WHERE slug = ?", (slug,))
+            self.db.execute(
+                "INSERT INTO plan_text (slug, body) VALUES (?, ?)", (slug, text)
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?)",
+                (slug, mtime_ns, json.dumps(merged)),
+            )
+        return True
+
+    def search(self, query: str, limit: int) -> list[SearchHit]:
+        words = tokenize(query)
+        if not words:
+            return []
+        match = " ".join(f'"{word}"' for word in words)
+        rows = self.db.execute(
+            "SELECT plan_text.slug, bm25(plan_text), plans.dests"
+            " FROM plan_text JOIN plans ON plans.slug = plan_text.slug"
+            " WHERE plan_text MATCH ? ORDER BY bm25(plan_text), plan_text.slug"
+            " LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        return [(slug, -rank, json.loads(dests)) for slug, rank, dests in rows]
+
+    def close(self) -> None:
+        self.db.close()
+
+
+class JsonPlanIndex:
+    """The index as term postings in a JSON file, for SQLite without FTS5.
+
+    Updates are applied in memory and written by ``close``, which reloads
+    the file under its lock first so concurrent exporters do not lose each
+    other's updates.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.docs: dict[str, dict[str, Any]] = {}
+        self.postings: dict[str, dict[str, int]] = {}
+        self._pending: list[tuple[str, str, int, Sequence[str]]] = []
+        self._load()
+
+    def _load(self) -> None:
+        data = read_json(self.path)
+        if (
+            isinstance(data, dict)
+            and data.get("version") == INDEX_VERSION
+            and isinstance(data.get("docs"), dict)
+            and isinstance(data.get("postings"), dict)
+        ):
+            self.docs = data["docs"]
+            self.postings = data["postings"]
+
+    def update(self, slug: str, text: str, mtime_ns: int, dests: Sequence[str]) -> bool:
+        reindexed, changed = self._apply(slug, text, mtime_ns, dests)
+        if changed:
+            self._pending.append((slug, text, mtime_ns, dests))
+        return reindexed
+
+    def _apply(
+        self, slug: str, text: str, mtime_ns: int, dests: Sequence[str]
+    ) -> tuple[bool, bool]:
+        """Apply one update; return (text reindexed, anything changed)."""
+        doc = self.docs.get(slug)
+        known = doc["dests"] if doc else []
+        merged = known + [dest for dest in dests if dest not in known]
+        if doc and doc["mtime_ns"] == mtime_ns:
+            doc["dests"] = merged
+            return False, merged != known
+        for word in doc["terms"] if doc else []:
+            postings = self.postings.get(word, {})
+            postings.pop(slug, None)
+            if not postings:
+                self.postings.pop(word, None)
+        counts = Counter(tokenize(text))
+        for word, count in counts.items():
+            self.postings.setdefault(word, {})[slug] = count
+        self.docs[slug] = {
+            "mtime_ns": mtime_ns,
+            "dests": merged,
+            "length": sum(counts.values()),
+            "terms": sorted(counts),
+        }
+        return True, True
+
+    def search(self, query: str, limit: int) -> list[SearchHit]:
+        words = set(tokenize(query))
+        if not words or not all(word in self.postings for word in words):
+            return []
+        slugs = set.intersection(*(set(self.postings[word]) for word in words))
+        total = len(self.docs)
+        average = sum(doc["length"] for doc in self.docs.values()) / total
+        scores = dict.fromkeys(slugs, 0.0)
+        for word in words:
+            postings = self.postings[word]
+            n = len(postings)
+            idf = math.log((total - n + 0.5) / (n + 0.5) + 1)
+            for slug in slugs:
+                tf = postings[slug]
+                norm = 1 - BM25_B + BM25_B * self.docs[slug]["length"] / average
+                scores[slug] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            (slug, score, list(self.docs[slug]["dests"]))
+            for slug, score in ranked[:limit]
+        ]
+
+    def close(self) -> None:
+        if not self._pending:
+            return
+        with destination_lock(self.path):
+            self._load()
+            for update in self._pending:
+                self._apply(*update)
+            write_json_atomic(
+                self.path,
+                {
+                    "version": INDEX_VERSION,
+                    "docs": self.docs,
+                    "postings": self.postings,
+                },
+            )
+        self._pending = []
+
+
+PlanIndex = SqlitePlanIndex | JsonPlanIndex
+
+
+def _open() -> PlanIndex:
+    root: Path = state_dir()
+    if fts5_available():
+        return SqlitePlanIndex(root / "plan-index.sqlite3")
+    return JsonPlanIndex(root / "plan-index.json")
+
+
+@contextlib.contextmanager
+def open_index() -> Iterator[PlanIndex]:
+    """The plan index, in SQLite when FTS5 is available."""
+    index = _open()
+    try:
+        yield index
+    finally:
+        index.close()
+
+
+class ExporterIndex:
+    """The plan index for an exporter, opened by the first plan it indexes.
+
+    Exports that copy nothing new never open it. Indexing is a side effect
+    of exporting, so failures to open or update it are reported and never
+    stop an export; after a failed open, ``get`` returns None.
+    """
+
+    def __init__(self) -> None:
+        self._index: PlanIndex | None = None
+        self._failed = False
+
+    def get(self) -> PlanIndex | None:
+        if self._index is None and not self._failed:
+            try:
+                self._index = _open()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Could not open the plan index: {e}", file=sys.stderr)
+                self._failed = True
+        return self._index
+
+    def close(self) -> None:
+        if self._index is None:
+            return
+        try:
+            self._index.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Could not update the plan index: {e}", file=sys.stderr)
+        self._index = None
+
+
+@contextlib.contextmanager
+def exporter_index() -> Iterator[ExporterIndex]:
+    """An ``ExporterIndex``, closed (if it was ever opened) on exit."""
+    index = ExporterIndex()
+    try:
+        yield index
+    finally:
+        index.close()
+
+
+def index_plan(
+    index: PlanIndex | None,
+    slug: str,
+    data: bytes,
+    mtime_ns: int,
+    dests: Sequence[Path],
+) -> None:
+    """Add a just-exported plan to ``index``; ``dests`` are the files written."""
+    if index is None:
+        return
+    text = data.decode("utf-8", errors="replace")
+    try:
+        index.update(slug, text, mtime_ns, [str(dest.parent) for dest in dests])
+    except (OSError, sqlite3.Error) as e:
+        print(f"Could not index plan {slug}: {e}", file=sys.stderr)
+
+
+def record_plan(
+    index: ExporterIndex,
+    slug: str,
+    source: Path,
+    mtime_ns: int,
+    dests: Sequence[Path],
+) -> None:
+    """Index a plan the exporter just copied and record its revision.
+
+    The source is read once for both, and not at all when neither the
+    index nor plan history (see plan_history) is in use.
+    """
+    if index.get() is None and not history_enabled():
+        return
+    try:
+        data = source.read_bytes()
+    except OSError as e:
+        print(f"Could not read plan {slug}: {e}", file=sys.stderr)
+        return
+    record_revision(slug, data, mtime_ns)
+    index_plan(index.get(), slug, data, mtime_ns, dests)
+
+
+def rebuild(plans_dir: Path) -> int:
+    """Index every plan in ``plans_dir``; return how many were (re)indexed."""
+    indexed = 0
+    with open_index() as index:
+        for source in sorted(plans_dir.glob("*.md")):
+            try:
+                st = source.stat()
+                text = source.read_text(encoding="utf-8", errors="replace")
+            except OSError as e:
+                print(f"Error reading {source}: {e}", file=sys.stderr)
+                continue
+            if index.update(source.stem, text, st.st_mtime_ns, []):
+                indexed += 1
+    return indexed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Search exported plans.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="rank plans matching WORDS")
+    search.add_argument("words", nargs="+")
+    search.add_argument("--limit", type=int, default=20, metavar="N")
+    search.add_argument(
+        "--json", action="store_true", help="write one JSON object per hit"
+    )
+    commands.add_parser("rebuild", help="index every plan in ~/.claude/plans")
+    args = parser.parse_args(argv or [])
+
+    if args.command == "rebuild":
+        count = rebuild(Path.home() / ".claude" / "plans")
+        print(f"Indexed {count} plan(s)")
+        return 0
+
+    try:
+        with open_index() as index:
+            hits = index.search(" ".join(args.words), args.limit)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Could not search the plan index: {e}", file=sys.stderr)
+        return 1
+    for slug, score, dests in hits:
+        if args.json:
+            print(json.dumps({"slug": slug, "score": score, "dests": dests}))
+        else:
+            where = f"  {', '.join(dests)}" if dests else ""
+            print(f"{score:7.2f}  {slug}{where}")
+    if not hits and not args.json:
+        print("No matching plans", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
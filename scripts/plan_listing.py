@@ -0,0 +1,63 @@
+"""Cached listing of the plans directory.
+
+The listing is stored with the directory's inode and mtime. A file created
+or removed in the directory changes its mtime, so the cached names are used
+only while the directory still has the recorded fingerprint. Listings taken
+within a second of the directory's last change are not trusted, since a
+later change in the same clock tick could leave the mtime unchanged.
+"""
+
+import os
+import time
+from pathlib import Path
+
+try:
+    # When executed as a script from within scripts/
+    from plan_state import read_json, state_dir, state_key, write_json_atomic
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.plan_listing
+    from scripts.plan_state import read_json, state_dir, state_key, write_json_atomic
+
+LISTING_VERSION = 1
+RACY_WINDOW_NS = 1_000_000_000
+
+
+def list_plan_names(plans_dir: Path, *, save: bool = False) -> set[str]:
+    """Return the file names in ``plans_dir``, from the cache when it is fresh.
+
+    With ``save``, a fresh listing is written back to the cache. A missing
+    or unreadable directory has no names.
+    """
+    try:
+        st = os.stat(plans_dir)
+    except OSError:
+        return set()
+
+    path = state_dir() / "plan-listing" / f"{state_key(str(plans_dir))}.json"
+    data = read_json(path)
+    if (
+        isinstance(data, dict)
+        and data.get("version") == LISTING_VERSION
+        and data.get("ino") == st.st_ino
+        and data.get("mtime_ns") == st.st_mtime_ns
+        and isinstance(data.get("names"), list)
+    ):
+        return set(data["names"])
+
+    listed_at = time.time_ns()
+    try:
+        names = set(os.listdir(plans_dir))
+    except OSError:
+        return set()
+    if save and listed_at - st.st_mtime_ns > RACY_WINDOW_NS:
+        data = {
+            "version": LISTING_VERSION,
+            "ino": st.st_ino,
+            "mtime_ns": st.st_mtime_ns,
+            "names": sorted(names),
+        }
+        try:
+            write_json_atomic(path, data)
+        except OSError:
+            pass
+    return names
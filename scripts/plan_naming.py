@@ -0,0 +1,120 @@
+"""Name exported plan files in bulk.
+
+Naming works on the stat results the exporter has already collected, so
+building the names costs no extra ``stat`` calls. Timestamps are formatted
+with ``time.strftime`` and memoized per second, since plans written in the
+same burst share most of their mtimes.
+
+Names contain the slug, so two plans never get the same name, not even
+two timestamped plans from the same second. They can still collide on a
+case-insensitive file system (the default on macOS and Windows), where
+``plan-Auth.md`` and ``plan-auth.md`` are one file and the second copy
+would overwrite the first. When a destination is on such a file system the
+exporters ask for case-insensitively unique names: colliding names get a
+``-2``, ``-3``, ... suffix, assigned in slug order so every run picks the
+same names. Elsewhere every plan keeps its plain name.
+"""
+
+import os
+import re
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+# The names each exporter gives plans; ``stem`` is the slug, plus the
+# suffix dedupe_names may have added.
+PLAIN_NAME = re.compile(r"plan-(?P<stem>.+)\.md")
+TIMESTAMPED_NAME = re.compile(r"\d{8}-\d{6}-plan-(?P<stem>.+)\.md")
+
+
+class TimestampFormatter:
+    """Format mtimes as local ``YYYYMMDD-HHMMSS``, once per distinct second."""
+
+    def __init__(self, fmt: str = TIMESTAMP_FORMAT) -> None:
+        self.fmt = fmt
+        self._formatted: dict[int, str] = {}
+
+    def __call__(self, st: os.stat_result) -> str:
+        second = st.st_mtime_ns // 1_000_000_000
+        stamp = self._formatted.get(second)
+        if stamp is None:
+            stamp = time.strftime(self.fmt, time.localtime(second))
+            self._formatted[second] = stamp
+        return stamp
+
+
+def case_insensitive(directory: Path) -> bool:
+    """Whether the file system holding ``directory`` ignores the case of names.
+
+    A name from the directory (or its nearest existing ancestor) is looked
+    up with its case swapped, so nothing is written.
+    """
+    path = directory.absolute()
+    while not path.is_dir() and path != path.parent:
+        path = path.parent
+    try:
+        with os.scandir(path) as entries:
+            name = next((e.name for e in entries if e.name.swapcase() != e.name), None)
+        if name is None:
+            path, name = path.parent, path.name
+        swapped = name.swapcase()
+        return swapped != name and os.path.samefile(path / name, path / swapped)
+    except OSError:
+        return False
+
+
+def plain_names(
+    plans: Iterable[tuple[str, os.stat_result]], *, case_insensitive: bool = False
+) -> list[str]:
+    """``plan-{slug}.md`` for every plan."""
+    named = [(slug, f"plan-{slug}.md") for slug, _ in plans]
+    if case_insensitive:
+        return dedupe_names(named)
+    return [name for _, name in named]
+
+
+def timestamped_names(
+    plans: Iterable[tuple[str, os.stat_result]],
+    formatter: TimestampFormatter | None = None,
+    *,
+    case_insensitive: bool = False,
+) -> list[str]:
+    """``{mtime}-plan-{slug}.md`` for every plan."""
+    if formatter is None:
+        formatter = TimestampFormatter()
+    named = [(slug, f"{formatter(st)}-plan-{slug}.md") for slug, st in plans]
+    if case_insensitive:
+        return dedupe_names(named)
+    return [name for _, name in named]
+
+
+def dedupe_names(named: list[tuple[str, str]]) -> list[str]:
+    """Make names unique case-insensitively, keeping the input order.
+
+    Among names that collide, the one with the smallest slug keeps its name
+    and the others are suffixed in slug order.
+    """
+    names = [name for _, name in named]
+    groups: dict[str, list[int]] = {}
+    for index, name in enumerate(names):
+        groups.setdefault(name.casefold(), []).append(index)
+
+    taken = set(groups)
+    for indices in groups.values():
+        if len(indices) < 2:
+            continue
+        indices.sort(key=lambda i: named[i][0])
+        for index in indices[1:]:
+            stem, dot, ext = names[index].rpartition(".")
+            if not dot:
+                stem, ext = ext, ""
+            counter = 2
+            while True:
+                candidate = f"{stem}-{counter}{dot}{ext}"
+                if candidate.casefold() not in taken:
+                    break
+                counter += 1
+            taken.add(candidate.casefold())
+            names[index] = candidate
+    return names
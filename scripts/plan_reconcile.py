@@ -0,0 +1,178 @@
+"""Find exported plans that no longer match ~/.claude/plans.
+
+An exported plan file stays in the project after its source is deleted or
+renamed, and a timestamped export of an edited plan leaves the previous
+export behind under its old name. Reconciling lists each destination
+directory once and sorts the files named like the exporter's exports into
+the ones this export writes and stale ones:
+
+    orphaned    no plan in ~/.claude/plans has its slug
+    superseded  its plan is now exported under another name
+
+Only files an exporter wrote can be stale. Every exporter records the
+names it writes in a per-directory manifest under the state directory, and
+a file missing from it, such as a hand-written ``plan-notes.md`` in the
+project root, is never removed, whatever its name. Exports of plans that
+still exist but are not part of this export (a plan of another project
+exported here with --dest, say) are left alone too.
+"""
+
+import os
+import re
+import sys
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+try:
+    # When executed as a script from within scripts/
+    from plan_copy import destination_lock, same_copy
+    from plan_state import read_json, state_dir, state_key, write_json_atomic
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.plan_reconcile
+    from scripts.plan_copy import destination_lock, same_copy
+    from scripts.plan_state import read_json, state_dir, state_key, write_json_atomic
+
+MANIFEST_VERSION = 1
+
+_DEDUPE_SUFFIX = re.compile(r"-\d+$")
+
+# (slug, exported file, "orphaned" or "superseded")
+StaleExport = tuple[str, Path, str]
+
+
+def _stale_reason(
+    stem: str, wanted_slugs: set[str], source_slugs: set[str]
+) -> tuple[str, str] | None:
+    """(slug, reason) for an export named after ``stem``; None to keep it."""
+    # A stem ending in -N is a slug or a deduplicated name; the slug wins.
+    for slug in dict.fromkeys([stem, _DEDUPE_SUFFIX.sub("", stem)]):
+        if slug in wanted_slugs:
+            return slug, "superseded"
+        if slug in source_slugs:
+            return None
+    return stem, "orphaned"
+
+
+def manifest_path(dest_dir: Path) -> Path:
+    key = state_key(str(dest_dir.absolute()))
+    path: Path = state_dir() / "exports" / f"{key}.json"
+    return path
+
+
+def exported_names(dest_dir: Path) -> set[str]:
+    """The names of the files exporters have written to ``dest_dir``."""
+    data = read_json(manifest_path(dest_dir))
+    if (
+        isinstance(data, dict)
+        and data.get("version") == MANIFEST_VERSION
+        and isinstance(data.get("files"), list)
+    ):
+        return {name for name in data["files"] if isinstance(name, str)}
+    return set()
+
+
+def _update_manifest(
+    dest_dir: Path, add: Iterable[str] = (), remove: Iterable[str] = ()
+) -> None:
+    path = manifest_path(dest_dir)
+    try:
+        with destination_lock(path):
+            names = exported_names(dest_dir)
+            updated = (names | set(add)) - set(remove)
+            if updated != names:
+                write_json_atomic(
+                    path,
+                    {
+                        "version": MANIFEST_VERSION,
+                        "dir": str(dest_dir.absolute()),
+                        "files": sorted(updated),
+                    },
+                )
+    except OSError as e:
+        # The export itself succeeded; its files just stay unprunable.
+        print(f"Could not update the export manifest: {e}", file=sys.stderr)
+
+
+def record_exports(dest_files: Iterable[Path]) -> None:
+    """Add exported files to their directories' manifests, once per directory."""
+    by_dir: dict[Path, list[str]] = defaultdict(list)
+    for dest in dest_files:
+        by_dir[dest.parent].append(dest.name)
+    for dest_dir, names in by_dir.items():
+        _update_manifest(dest_dir, add=names)
+
+
+def scan_destinations(
+    dest_dirs: Iterable[Path],
+    pattern: re.Pattern[str],
+    wanted: Mapping[str, str],
+    source_slugs: set[str],
+    other_dirs: Iterable[Path] = (),
+) -> tuple[list[StaleExport], dict[Path, os.stat_result]]:
+    """List every destination directory once.
+
+    ``wanted`` maps the file names this export writes to their slugs, and
+    ``pattern`` matches the names the exporter gives plans. Returns the
+    stale exports, among the files in each directory's manifest, and the
+    stat of every wanted file that already exists, so planning needs no
+    further lookups. ``other_dirs`` are directories earlier exports may
+    have written to that this one does not, such as the plans/ folder of
+    a project that is down to one plan; every export found there is stale.
+    """
+    wanted_slugs = set(wanted.values())
+    stale: list[StaleExport] = []
+    present: dict[Path, os.stat_result] = {}
+    targets = list(dest_dirs)
+    for dest_dir in dict.fromkeys([*targets, *other_dirs]):
+        writes_here = dest_dir in targets
+        try:
+            with os.scandir(dest_dir) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            print(f"Error listing {dest_dir}: {e}", file=sys.stderr)
+            continue
+        exported = exported_names(dest_dir)
+        for entry in entries:
+            match = pattern.fullmatch(entry.name)
+            if match is None:
+                continue
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                if writes_here and entry.name in wanted:
+                    present[Path(entry.path)] = entry.stat(follow_symlinks=False)
+                    continue
+            except OSError as e:
+                print(f"Error reading {entry.path}: {e}", file=sys.stderr)
+                continue
+            if entry.name not in exported:
+                continue
+            found = _stale_reason(match["stem"], wanted_slugs, source_slugs)
+            if found is not None:
+                stale.append((found[0], Path(entry.path), found[1]))
+    return stale, present
+
+
+def scanned_action(
+    source_stat: os.stat_result, dest_stat: os.stat_result | None
+) -> str:
+    """``plan_copy.planned_action`` for a destination already stat'ed."""
+    if dest_stat is None:
+        return "copy"
+    return "up-to-date" if same_copy(source_stat, dest_stat) else "overwrite"
+
+
+def remove_export(path: Path) -> bool:
+    """Delete a stale export and forget it; False if it was already gone."""
+    with destination_lock(path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            removed = False
+        else:
+            removed = True
+    _update_manifest(path.parent, remove=[path.name])
+    return removed
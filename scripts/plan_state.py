@@ -0,0 +1,52 @@
+"""Persistent state shared by the export scripts.
+
+Everything lives under ~/.claude/plan-export/ unless PLAN_EXPORT_STATE_DIR
+points somewhere else.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+STATE_DIR_ENV = "PLAN_EXPORT_STATE_DIR"
+
+
+def state_dir() -> Path:
+    """Return the root directory for checkpoints, caches and logs."""
+    override = os.environ.get(STATE_DIR_ENV)
+    if override:
+        return Path(override)
+    return Path.home() / ".claude" / "plan-export"
+
+
+def state_key(*parts: str) -> str:
+    """Build a short, filesystem-safe key identifying a combination of paths."""
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def read_json(path: Path) -> Any:
+    """Load a JSON state file, returning None if it is missing or corrupt."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_atomic(path: Path, data: Any, *, fsync: bool = False) -> None:
+    """Replace ``path`` with ``data`` so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
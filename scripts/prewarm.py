@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Warm the export caches in the background while a session runs.
+
+SessionStart starts this worker, detached and at low priority, when
+PLAN_EXPORT_PREWARM is set. It scans the session's transcript into the
+directory's slug cache (recording the size and offset covered so far), does
+the same for the other transcripts in that directory, and caches the plans
+directory listing. SessionEnd then only has to parse the bytes appended
+during the session. With PLAN_EXPORT_IO_IDLE=1 it also uses the idle I/O
+class.
+
+    prewarm.py TRANSCRIPT_PATH
+"""
+
+import os
+import sys
+from pathlib import Path
+
+try:
+    # When executed as a script from within scripts/
+    from io_policy import use_idle_io
+    from plan_listing import list_plan_names
+    from slug_cache import SlugCache
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.prewarm
+    from scripts.io_policy import use_idle_io
+    from scripts.plan_listing import list_plan_names
+    from scripts.slug_cache import SlugCache
+
+PREWARM_NICENESS = 10
+
+
+def prewarm(transcript: Path) -> None:
+    """Fill the slug cache for ``transcript``'s directory and the plan listing."""
+    cache = SlugCache.for_directory(transcript.parent)
+    cache.scan(transcript)
+    cache.save()
+
+    try:
+        with os.scandir(transcript.parent) as entries:
+            others = [
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".jsonl")
+                and not entry.name.startswith("agent")
+                and entry.name != transcript.name
+            ]
+    except OSError as e:
+        print(f"Error listing transcripts: {e}", file=sys.stderr)
+        others = []
+    for path in others:
+        cache.scan(path)
+    cache.save()
+
+    list_plan_names(Path.home() / ".claude" / "plans", save=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    if not argv:
+        print("usage: prewarm.py TRANSCRIPT_PATH", file=sys.stderr)
+        return 2
+    try:
+        os.nice(PREWARM_NICENESS)
+    except OSError:
+        pass
+    use_idle_io()
+    prewarm(Path(argv[0]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,236 @@
+"""Pick the reader for each transcript scan from measured throughput.
+
+Transcripts range from a few kilobytes of a session in progress to
+gigabytes of a long-running one, on local disks, tmpfs or NFS, and no one
+reader is fastest for all of them:
+
+    lines    buffered line iteration (scan_transcript)
+    chunked  1 MiB reads searched for the "slug" key
+    mmap     the same search over a read-only mapping
+    tail     chunked reads from the end of the file backwards
+
+PLAN_EXPORT_SCAN_STRATEGY (or --scan-strategy) names one to always use;
+unset or "auto", the choice is made per scan. Ranges shorter than
+MEASURE_MIN_BYTES are read line by line, where start-up cost is all that
+matters. Longer scans are timed, and their throughput is kept in the state
+directory per (file system type, size class). The first scans of a class
+try every reader MIN_SAMPLES times; after that the fastest one is used,
+and every EXPLORE_INTERVAL-th scan re-measures the least tried reader so
+the choice follows changes in the machine.
+
+A scan that can be cut short (one given a ``stop`` callback) never reads
+from the end: a cut-short tail scan covers no prefix, so the next scan
+would start over, and under a deadline it would never finish. A cut-short
+scan is not timed but still counts as a trial of its reader, so exploring
+moves on to the next one.
+"""
+
+import functools
+import os
+import re
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+try:
+    # When executed as a script from within scripts/
+    from plan_copy import destination_lock
+    from plan_state import read_json, state_dir, write_json_atomic
+    from transcript_scan import scan_chunked, scan_mmap, scan_tail, scan_transcript
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.scan_strategy
+    from scripts.plan_copy import destination_lock
+    from scripts.plan_state import read_json, state_dir, write_json_atomic
+    from scripts.transcript_scan import (
+        scan_chunked,
+        scan_mmap,
+        scan_tail,
+        scan_transcript,
+    )
+
+SCAN_STRATEGY_ENV = "PLAN_EXPORT_SCAN_STRATEGY"
+READERS: dict[str, Callable[..., int]] = {
+    "lines": scan_transcript,
+    "chunked": scan_chunked,
+    "mmap": scan_mmap,
+    "tail": scan_tail,
+}
+STRATEGIES = tuple(READERS)
+TUNING_VERSION = 1
+MEASURE_MIN_BYTES = 1 << 20
+# Upper bounds of the size classes; larger ranges are "huge".
+SIZE_CLASSES = ((16 << 20, "medium"), (256 << 20, "large"))
+MIN_SAMPLES = 2
+EXPLORE_INTERVAL = 20
+# Weight of the newest measurement in a strategy's running throughput.
+SMOOTHING = 0.3
+# Where mmap page faults and small reads each cost a round trip.
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "9p", "fuse.sshfs"}
+# /proc/self/mounts writes spaces, tabs and the like in mount points as \ooo.
+_OCTAL_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+def requested_strategy(strategy: str | None = None) -> str:
+    """``strategy``, else PLAN_EXPORT_SCAN_STRATEGY; unknown values mean auto."""
+    if strategy is None:
+        strategy = os.environ.get(SCAN_STRATEGY_ENV, "auto")
+    return strategy if strategy in STRATEGIES else "auto"
+
+
+@functools.cache
+def _mounts() -> list[tuple[str, str]]:
+    """(mount point, file system type), longest mount point first."""
+    mounts = []
+    try:
+        with open("/proc/self/mounts", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3:
+                    point = _OCTAL_ESCAPE.sub(lambda m: chr(int(m[1], 8)), fields[1])
+                    mounts.append((point, fields[2]))
+    except OSError:
+        return []
+    return sorted(mounts, key=lambda mount: len(mount[0]), reverse=True)
+
+
+def filesystem_type(path: Path) -> str:
+    """The type of the file system holding ``path``; "unknown" off Linux."""
+    real = os.path.realpath(path)
+    for point, fstype in _mounts():
+        if real == point or real.startswith(point.rstrip("/") + "/"):
+            return fstype
+    return "unknown"
+
+
+def size_class(length: int) -> str:
+    for limit, name in SIZE_CLASSES:
+        if length < limit:
+            return name
+    return "huge"
+
+
+def _candidates(fstype: str, size: str, forward: bool = False) -> list[str]:
+    """Every strategy, the likeliest winner first; ties and trials go in order.
+
+    With ``forward``, only the readers that cover a prefix when cut short.
+    """
+    if fstype in NETWORK_FILESYSTEMS:
+        candidates = ["chunked", "lines", "tail", "mmap"]
+    elif size == "medium":
+        candidates = ["chunked", "mmap", "lines", "tail"]
+    else:
+        candidates = ["mmap", "chunked", "lines", "tail"]
+    if forward:
+        candidates.remove("tail")
+    return candidates
+
+
+def tuning_path() -> Path:
+    path: Path = state_dir() / "scan-strategy.json"
+    return path
+
+
+def _load() -> dict[str, Any]:
+    data = read_json(tuning_path())
+    if (
+        isinstance(data, dict)
+        and data.get("version") == TUNING_VERSION
+        and isinstance(data.get("classes"), dict)
+    ):
+        return data
+    return {"version": TUNING_VERSION, "classes": {}}
+
+
+def choose(fstype: str, size: str, forward: bool = False) -> str:
+    """The strategy to use next for a range of class ``size`` on ``fstype``.
+
+    With ``forward``, "tail" is never picked.
+    """
+    entry = _load()["classes"].get(f"{fstype}:{size}", {})
+    stats = entry.get("strategies", {})
+    candidates = _candidates(fstype, size, forward)
+    samples = {name: stats.get(name, {}).get("samples", 0) for name in candidates}
+    for name in candidates:
+        if samples[name] < MIN_SAMPLES:
+            return name
+    if entry.get("scans", 0) % EXPLORE_INTERVAL == EXPLORE_INTERVAL - 1:
+        return min(candidates, key=samples.__getitem__)
+    # A reader only ever cut short has no throughput yet.
+    return max(candidates, key=lambda name: stats[name].get("rate", 0.0))
+
+
+def record(
+    fstype: str, size: str, strategy: str, length: int, seconds: float | None
+) -> None:
+    """Fold one timed scan into the persisted throughput of ``strategy``.
+
+    ``seconds`` is None for a scan that was cut short: it counts as a trial
+    of ``strategy`` but its throughput is not measured.
+    """
+    path = tuning_path()
+    try:
+        with destination_lock(path):
+            data = _load()
+            entry = data["classes"].setdefault(
+                f"{fstype}:{size}", {"scans": 0, "strategies": {}}
+            )
+            entry["scans"] += 1
+            stats = entry["strategies"].setdefault(strategy, {"samples": 0})
+            if seconds is not None:
+                rate = length / max(seconds, 1e-9)
+                old = stats.get("rate", rate)
+                stats["rate"] = old + SMOOTHING * (rate - old)
+            stats["samples"] += 1
+            write_json_atomic(path, data)
+    except OSError:
+        # Tuning is advisory; the next scan simply measures again.
+        pass
+
+
+def scan_adaptive(
+    transcript_path: Path,
+    add: Callable[[str], object],
+    offset: int = 0,
+    stop: Callable[[], bool] | None = None,
+    *,
+    size: int | None = None,
+    strategy: str | None = None,
+) -> int:
+    """``scan_transcript`` with the reader picked as described above.
+
+    ``size`` saves a stat when the caller already has one; ``strategy``
+    overrides PLAN_EXPORT_SCAN_STRATEGY. Scans of at least
+    MEASURE_MIN_BYTES are timed and recorded, whichever reader ran them;
+    one that ``stop`` cut short only counts as a trial. With a ``stop``,
+    a forward reader is used instead of "tail", even one asked for.
+    """
+    if size is None:
+        try:
+            size = os.path.getsize(transcript_path)
+        except OSError:
+            # The line reader reports the error.
+            end: int = scan_transcript(transcript_path, add, offset, stop)
+            return end
+    length = size - offset
+    name = requested_strategy(strategy)
+    if name == "tail" and stop is not None:
+        name = "chunked"
+    if length < MEASURE_MIN_BYTES:
+        return READERS["lines" if name == "auto" else name](
+            transcript_path, add, offset, stop
+        )
+
+    fstype = filesystem_type(transcript_path)
+    sized = size_class(length)
+    if name == "auto":
+        name = choose(fstype, sized, forward=stop is not None)
+    started = time.perf_counter()
+    end = READERS[name](transcript_path, add, offset, stop)
+    elapsed = time.perf_counter() - started
+    # Like SlugCache.scan, only poll ``stop`` again if the scan ended early.
+    if end < size and stop is not None and stop():
+        record(fstype, sized, name, end - offset, None)
+    elif end - offset >= MEASURE_MIN_BYTES:
+        record(fstype, sized, name, end - offset, elapsed)
+    return end
@@ -3,13 +3,145 @@
 Export transcript_path from stdin JSON to CLAUDE_ENV_FILE.
 
 Called on SessionStart hook to make transcript path available to other hooks.
+
+By default the line is appended under an exclusive flock. With
+PLAN_EXPORT_ENV_WRITE=append the line is written as one lock-free O_APPEND
+record instead: the write is skipped when the file already ends with the
+same line, and older TRANSCRIPT_DIR lines are compacted away once the file
+grows past COMPACT_THRESHOLD bytes.
+
+With PLAN_EXPORT_PREWARM=1 a detached, low-priority prewarm.py worker is
+started to index the transcript and plans directory ahead of SessionEnd.
 """
 
 import fcntl
 import json
 import os
+import select
 import shlex
+import subprocess
 import sys
+import tempfile
+
+ENV_WRITE_MODE_ENV = "PLAN_EXPORT_ENV_WRITE"
+COMPACT_THRESHOLD = 16 * 1024
+EXPORT_PREFIX = b"export TRANSCRIPT_DIR="
+PREWARM_ENV = "PLAN_EXPORT_PREWARM"
+PREWARM_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prewarm.py")
+
+
+def append_line_atomic(env_file: str, line: str) -> bool:
+    """Append ``line`` to ``env_file`` as a single lock-free O_APPEND write.
+
+    Returns False if the file already ends with the same line and nothing was
+    written. Raises ValueError if the record is too long to be written
+    atomically.
+    """
+    record = f"{line}\n".encode()
+    if len(record) > select.PIPE_BUF:
+        raise ValueError(f"env line longer than PIPE_BUF ({select.PIPE_BUF} bytes)")
+
+    fd = os.open(env_file, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        size = os.fstat(fd).st_size
+        if size >= len(record):
+            # Read the preceding byte too, so a longer line that merely ends
+            # with the same text is not taken for a repeat.
+            start = max(0, size - len(record) - 1)
+            tail = os.pread(fd, size - start, start)
+            at_line_start = start == size - len(record) or tail[:1] == b"\n"
+            if at_line_start and tail.endswith(record):
+                return False
+        os.write(fd, record)
+        size += len(record)
+    finally:
+        os.close(fd)
+
+    if size > COMPACT_THRESHOLD:
+        compact_env_file(env_file)
+    return True
+
+
+def compact_env_file(env_file: str) -> None:
+    """Atomically rewrite ``env_file`` keeping only its last TRANSCRIPT_DIR line.
+
+    Earlier TRANSCRIPT_DIR exports are overridden by the last one anyway, so
+    sourcing the compacted file has the same effect. Other lines are kept.
+
+    Compaction holds the file's flock, so compactions and locked writes
+    take turns. Lock-free appenders may still write to the old file until
+    it is replaced; whatever they wrote past the part that was read is
+    appended to the compacted file afterwards.
+    """
+    with open(env_file, "rb") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.stat(env_file).st_ino != os.fstat(f.fileno()).st_ino:
+                # Another compaction replaced the file while we waited.
+                return
+        except FileNotFoundError:
+            return
+        lines = f.readlines()
+        read = f.tell()
+
+        last_export = max(
+            (i for i, line in enumerate(lines) if line.startswith(EXPORT_PREFIX)),
+            default=None,
+        )
+        kept = [
+            line
+            for i, line in enumerate(lines)
+            if i == last_export or not line.startswith(EXPORT_PREFIX)
+        ]
+        if len(kept) == len(lines):
+            return
+
+        directory = os.path.dirname(os.path.abspath(env_file))
+        fd, tmp_name = tempfile.mkstemp(prefix=".env-compact.", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.writelines(kept)
+            os.chmod(tmp_name, os.fstat(f.fileno()).st_mode & 0o7777)
+            os.replace(tmp_name, env_file)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+        f.seek(read)
+        while late := f.read():
+            fd = os.open(env_file, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, late)
+            finally:
+                os.close(fd)
+
+
+def append_line_locked(env_file: str, line: str) -> None:
+    """Append ``line`` to ``env_file`` while holding an exclusive flock."""
+    with open(env_file, "a", encoding="utf-8") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        f.write(f"{line}\n")
+
+
+def spawn_prewarm(transcript_path: str) -> bool:
+    """Start prewarm.py for ``transcript_path`` in its own session.
+
+    The worker is not waited for and inherits no terminal or pipes, so the
+    hook returns immediately. Returns False if it could not be started.
+    """
+    try:
+        subprocess.Popen(
+            [sys.executable, PREWARM_SCRIPT, transcript_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError as e:
+        print(f"Could not start prewarm worker: {e}", file=sys.stderr)
+        return False
+    return True
 
 
 def main() -> int:
@@ -45,10 +177,21 @@ def main() -> int:
         print(f"Transcript directory does not exist: {transcript_dir}", file=sys.stderr)
         return 1
 
+    if os.environ.get(PREWARM_ENV, "") not in ("", "0"):
+        spawn_prewarm(os.path.abspath(transcript_path))
+
+    line = f"export TRANSCRIPT_DIR={shlex.quote(transcript_dir)}"
     try:
-        with open(env_file, "a", encoding="utf-8") as f:
-            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-            f.write(f"export TRANSCRIPT_DIR={shlex.quote(transcript_dir)}\n")
+        if os.environ.get(ENV_WRITE_MODE_ENV) == "append":
+            try:
+                if not append_line_atomic(env_file, line):
+                    print("TRANSCRIPT_DIR already exported", file=sys.stderr)
+                    return 0
+            except ValueError as e:
+                print(f"{e}, falling back to locked write", file=sys.stderr)
+                append_line_locked(env_file, line)
+        else:
+            append_line_locked(env_file, line)
     except OSError as e:
         print(f"Error writing to env file: {e}", file=sys.stderr)
         return 1
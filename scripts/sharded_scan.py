@@ -0,0 +1,203 @@
+"""Scan one large transcript on several cores.
+
+The file is split into byte ranges aligned to newline boundaries, and each
+range is scanned in its own process over a shared read-only mmap. Within a
+range, the scanner jumps between occurrences of the "slug" key instead of
+walking every line. Per-range results are merged in file order, so the
+merged slugs keep their order of first appearance.
+
+A ``stop`` callback is polled while the shards run. Once it returns True
+the workers finish their current window and return, and the scan ends
+after the last line of the complete prefix of ranges, like a serial scan
+that was cut short.
+"""
+
+import contextlib
+import mmap
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import sys
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+try:
+    # When executed as a script from within scripts/
+    from io_policy import drop_range
+    from scan_strategy import scan_adaptive
+    from transcript_scan import MMAP_WINDOW, SLUG_KEY, line_slug
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.sharded_scan
+    from scripts.io_policy import drop_range
+    from scripts.scan_strategy import scan_adaptive
+    from scripts.transcript_scan import MMAP_WINDOW, SLUG_KEY, line_slug
+
+# Below this many unscanned bytes, process start-up costs more than it saves.
+SHARD_MIN_SIZE = 64 << 20
+# How often the parent polls ``stop`` while the shards run.
+STOP_POLL_SECONDS = 0.05
+
+# Set in the workers by _init_worker; the parent sets it to stop them.
+_cancel: multiprocessing.synchronize.Event | None = None
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Map a --jobs value to a process count; 0 means one per CPU."""
+    return jobs if jobs > 0 else os.cpu_count() or 1
+
+
+def shard_ranges(
+    mm: mmap.mmap, start: int, end: int, shards: int
+) -> list[tuple[int, int]]:
+    """Split ``[start, end)`` into up to ``shards`` ranges that begin at lines."""
+    step = max(1, (end - start) // max(1, shards))
+    bounds = [start]
+    for i in range(1, shards):
+        newline = mm.find(b"\n", max(start + i * step, bounds[-1]), end)
+        if newline < 0 or newline + 1 >= end:
+            break
+        if newline + 1 > bounds[-1]:
+            bounds.append(newline + 1)
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:], strict=False))
+
+
+def _init_worker(cancel: multiprocessing.synchronize.Event) -> None:
+    global _cancel
+    _cancel = cancel
+
+
+def scan_range(path: str, start: int, end: int) -> tuple[list[str], int]:
+    """Return the slugs in ``[start, end)`` of ``path`` and where scanning ended.
+
+    The range is searched in windows of about MMAP_WINDOW bytes cut at line
+    boundaries; if the worker is cancelled between windows, the returned
+    offset is the start of the first line left unscanned, else ``end``. The
+    scanned part is dropped from the page cache afterwards, following the
+    policy in ``io_policy``.
+    """
+    found: dict[str, None] = {}
+    pos = start
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                aligned = start - start % mmap.PAGESIZE
+                with contextlib.suppress(OSError):
+                    mm.madvise(mmap.MADV_SEQUENTIAL, aligned, end - aligned)
+            while pos < end and not (_cancel is not None and _cancel.is_set()):
+                limit = min(pos + MMAP_WINDOW, end)
+                cut = mm.rfind(b"\n", pos, limit) + 1 or mm.find(b"\n", limit, end) + 1
+                if not cut:
+                    cut = end
+                while pos < cut:
+                    hit = mm.find(SLUG_KEY, pos, cut)
+                    if hit < 0:
+                        break
+                    line_start = mm.rfind(b"\n", start, hit) + 1 or start
+                    line_end = mm.find(b"\n", hit, cut)
+                    if line_end < 0:
+                        line_end = cut
+                    slug = line_slug(mm[line_start:line_end])
+                    if slug is not None:
+                        found.setdefault(slug)
+                    pos = line_end + 1
+                pos = cut
+        drop_range(f.fileno(), start, pos)
+    return list(found), pos
+
+
+def _scan_shards(
+    transcript_path: Path,
+    offset: int,
+    size: int,
+    workers: int,
+    stop: Callable[[], bool] | None = None,
+) -> tuple[int, list[list[str]]] | None:
+    """Scan ``[offset, size)`` in parallel; None if that was not possible."""
+    try:
+        with open(transcript_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                ranges = shard_ranges(mm, offset, size, workers)
+                # Like scan_transcript, stop before an unterminated last line.
+                end = mm.rfind(b"\n", offset, size) + 1 or offset
+    except OSError as e:
+        print(f"Error reading transcript: {e}", file=sys.stderr)
+        return None
+
+    path = str(transcript_path)
+    context = multiprocessing.get_context()
+    cancel = context.Event()
+    results = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(ranges),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(cancel,),
+        ) as pool:
+            futures = [pool.submit(scan_range, path, a, b) for a, b in ranges]
+            pending = set(futures)
+            while pending and stop is not None:
+                if stop():
+                    cancel.set()
+                    for future in pending:
+                        future.cancel()
+                    break
+                pending = wait(
+                    pending, timeout=STOP_POLL_SECONDS, return_when=FIRST_COMPLETED
+                ).not_done
+            for future, (range_start, range_end) in zip(futures, ranges, strict=True):
+                if future.cancelled():
+                    end = range_start
+                    break
+                slugs, reached = future.result()
+                results.append(slugs)
+                if reached < range_end:
+                    end = reached
+                    break
+    except (OSError, BrokenProcessPool) as e:
+        print(f"Parallel scan failed ({e}), scanning serially", file=sys.stderr)
+        return None
+    return end, results
+
+
+def scan_sharded(
+    transcript_path: Path,
+    add: Callable[[str], object],
+    offset: int = 0,
+    jobs: int = 0,
+    strategy: str | None = None,
+    stop: Callable[[], bool] | None = None,
+) -> int:
+    """Parallel drop-in for ``scan_transcript`` on large transcripts.
+
+    Falls back to the serial scanner ``scan_strategy`` picks (or
+    ``strategy``) for small files, a single job, or when worker processes
+    cannot be started. Either way ``stop`` can cut the scan short.
+    """
+    workers = resolve_jobs(jobs)
+    try:
+        size = os.path.getsize(transcript_path)
+    except FileNotFoundError:
+        print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
+        return offset
+    except OSError as e:
+        print(f"Error reading transcript: {e}", file=sys.stderr)
+        return offset
+
+    sharded = None
+    if workers > 1 and size - offset >= max(1, SHARD_MIN_SIZE):
+        sharded = _scan_shards(transcript_path, offset, size, workers, stop)
+    if sharded is None:
+        end: int = scan_adaptive(
+            transcript_path, add, offset, stop, size=size, strategy=strategy
+        )
+        return end
+
+    end, results = sharded
+    for slugs in results:
+        for slug in slugs:
+            add(sys.intern(slug))
+    return end
@@ -0,0 +1,218 @@
+"""Per-directory cache of the slugs found in each transcript.
+
+SessionEnd stores what it scanned here and the project exporters read it
+first, so a transcript is only ever scanned once. Each entry holds the slugs
+in order of first appearance, the byte offset scanned up to and the file's
+fingerprint (device, inode, size, mtime). Transcripts are append-only, so a
+cached file that has grown only needs its new bytes scanned, and one that
+was fully scanned without finding a slug can be skipped without opening it
+until its fingerprint changes.
+
+Each transcript's entry is a file of its own, written as soon as the
+transcript is scanned, so a hook rewrites only the entry it scanned and an
+export holds one entry in memory at a time. ``save`` removes the entries of
+transcripts that no longer exist.
+"""
+
+import contextlib
+import os
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+try:
+    # When executed as a script from within scripts/
+    from plan_state import read_json, state_dir, state_key, write_json_atomic
+    from scan_strategy import scan_adaptive
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.slug_cache
+    from scripts.plan_state import read_json, state_dir, state_key, write_json_atomic
+    from scripts.scan_strategy import scan_adaptive
+
+CACHE_VERSION = 2
+ENTRY_SUFFIX = ".json"
+
+
+class SlugCache:
+    """Cached slug scans for the transcripts of one TRANSCRIPT_DIR."""
+
+    def __init__(self, path: Path, transcript_dir: Path | None = None) -> None:
+        self.path = path
+        self.transcript_dir = transcript_dir
+        # The entry read or written last: callers usually look a transcript
+        # up with is_slug_free() or known() right before scanning it.
+        self._last: tuple[str, dict[str, Any] | None] | None = None
+        self._updated = False
+
+    @classmethod
+    def for_directory(cls, transcript_dir: Path) -> "SlugCache":
+        """The cache for ``transcript_dir``; entries are read when needed."""
+        key = state_key(str(transcript_dir.resolve()))
+        return cls(state_dir() / "slug-cache" / key, transcript_dir)
+
+    def entry_path(self, name: str) -> Path:
+        return self.path / f"{name}{ENTRY_SUFFIX}"
+
+    def names(self) -> set[str]:
+        """The transcripts that have an entry."""
+        try:
+            listed = os.listdir(self.path)
+        except OSError:
+            return set()
+        return {
+            name.removesuffix(ENTRY_SUFFIX)
+            for name in listed
+            if name.endswith(ENTRY_SUFFIX) and not name.startswith(".")
+        }
+
+    def _entry(self, name: str) -> dict[str, Any] | None:
+        if self._last is not None and self._last[0] == name:
+            return self._last[1]
+        data = read_json(self.entry_path(name))
+        entry = data if isinstance(data, dict) else None
+        if entry is not None and entry.get("version") != CACHE_VERSION:
+            entry = None
+        self._last = (name, entry)
+        return entry
+
+    def known(self, name: str, st: os.stat_result) -> tuple[list[str], int]:
+        """Return the cached slugs of transcript ``name`` and the offset they cover.
+
+        The offset is 0 when the cache knows nothing about the file as it is
+        now, and equals its size when nothing is left to scan. The slugs are
+        interned, so callers collecting them across transcripts share one
+        copy of each.
+        """
+        entry = self._entry(name)
+        if entry is None or not self._matches(entry, st):
+            return [], 0
+        slugs = [sys.intern(slug) for slug in entry["slugs"]]
+        if entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return slugs, st.st_size
+        return slugs, entry["offset"]
+
+    def is_slug_free(self, name: str, st: os.stat_result) -> bool:
+        """Whether transcript ``name`` is known, as it is now, to hold no slug."""
+        entry = self._entry(name)
+        return (
+            entry is not None
+            and self._matches(entry, st)
+            and not entry["slugs"]
+            and entry["size"] == st.st_size > 0
+            and entry["mtime_ns"] == st.st_mtime_ns
+        )
+
+    def scan(
+        self,
+        transcript_path: Path,
+        st: os.stat_result | None = None,
+        *,
+        jobs: int = 1,
+        stop: Callable[[], bool] | None = None,
+        strategy: str | None = None,
+    ) -> list[str]:
+        """Return the slugs of ``transcript_path`` in order of first appearance.
+
+        Only bytes past the cached offset are read; an unchanged transcript is
+        not opened at all. Pass ``st`` to reuse a stat result the caller
+        already has. With ``jobs`` other than 1, large transcripts are
+        scanned by that many processes (0 means one per CPU). A serial scan
+        cut short by ``stop`` is cached as a scan of the prefix it covered,
+        so the next scan continues from there. The serial reader is picked
+        by ``scan_strategy``, or named by ``strategy``. The entry is written
+        before returning; a failure to write it only costs a rescan later.
+        """
+        if st is None:
+            try:
+                st = os.stat(transcript_path)
+            except FileNotFoundError:
+                print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
+                return []
+            except OSError as e:
+                print(f"Error reading transcript: {e}", file=sys.stderr)
+                return []
+
+        name = transcript_path.name
+        cached, offset = self.known(name, st)
+        if offset == st.st_size and offset:
+            return cached
+
+        slugs = dict.fromkeys(cached)
+        if jobs == 1:
+            end = scan_adaptive(
+                transcript_path,
+                slugs.setdefault,
+                offset,
+                stop,
+                size=st.st_size,
+                strategy=strategy,
+            )
+        else:
+            # multiprocessing is only loaded by the scans that can use it.
+            try:
+                from sharded_scan import scan_sharded
+            except ModuleNotFoundError:  # pragma: no cover
+                from scripts.sharded_scan import scan_sharded
+            end = scan_sharded(
+                transcript_path, slugs.setdefault, offset, jobs, strategy, stop
+            )
+        stopped = stop is not None and end < st.st_size and stop()
+        found = list(slugs)
+        entry = {
+            "version": CACHE_VERSION,
+            "dev": st.st_dev,
+            "ino": st.st_ino,
+            # A cut-short scan records the fingerprint of the prefix it read,
+            # which never matches the file, so known() resumes at the offset.
+            "size": end if stopped else st.st_size,
+            "mtime_ns": 0 if stopped else st.st_mtime_ns,
+            "offset": end,
+            "slugs": found,
+        }
+        self._last = (name, entry)
+        self._updated = True
+        try:
+            write_json_atomic(self.entry_path(name), entry)
+        except OSError as e:
+            print(f"Error writing slug cache: {e}", file=sys.stderr)
+        return found
+
+    @staticmethod
+    def _matches(entry: dict[str, Any], st: os.stat_result) -> bool:
+        """Whether ``entry`` describes an earlier state of the same file."""
+        try:
+            return (
+                entry["dev"] == st.st_dev
+                and entry["ino"] == st.st_ino
+                and entry["offset"] <= st.st_size
+                and isinstance(entry["slugs"], list)
+            )
+        except (KeyError, TypeError):
+            return False
+
+    def save(self) -> None:
+        """Remove the entries of transcripts that no longer exist.
+
+        ``scan`` writes entries as it goes, so this only prunes, and only
+        after something was scanned. The entries are listed before the
+        transcripts, so an entry another hook writes meanwhile for a new
+        transcript is never taken for a stale one. Failures are ignored:
+        a stale entry only takes up space.
+        """
+        if not self._updated or self.transcript_dir is None:
+            return
+        self._updated = False
+        cached = self.names()
+        try:
+            present = set(os.listdir(self.transcript_dir))
+        except OSError:
+            return
+        for name in cached - present:
+            with contextlib.suppress(OSError):
+                self.entry_path(name).unlink()
+        # The single-file cache of earlier versions.
+        with contextlib.suppress(OSError):
+            self.path.with_suffix(".json").unlink()
+        with contextlib.suppress(OSError):
+            self.path.with_suffix(".lock").unlink()
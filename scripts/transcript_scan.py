@@ -0,0 +1,381 @@
+"""Low-level readers that pull plan slugs out of transcript JSONL files.
+
+``scan_transcript`` iterates over lines; ``scan_chunked``, ``scan_mmap``
+and ``scan_tail`` find the same slugs by searching raw bytes for the
+"slug" key, reading chunks, a mapping, or chunks from the end backwards.
+All four share one contract, so ``scan_strategy`` can pick among them.
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import re
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+try:
+    # When executed as a script from within scripts/
+    from io_policy import SequentialRead, drop_range
+except ModuleNotFoundError:  # pragma: no cover
+    # When imported as scripts.transcript_scan
+    from scripts.io_policy import SequentialRead, drop_range
+
+# Every line with a top-level slug contains this key, so lines without it
+# are skipped before JSON decoding.
+SLUG_KEY = b'"slug"'
+STOP_CHECK_LINES = 4096
+
+
+def line_slug(line: bytes) -> str | None:
+    """Decode one transcript line and return its top-level slug, if any."""
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(obj, dict):
+        slug = obj.get("slug")
+        if isinstance(slug, str):
+            return slug
+    return None
+
+
+def scan_transcript(
+    transcript_path: Path,
+    add: Callable[[str], object],
+    offset: int = 0,
+    stop: Callable[[], bool] | None = None,
+) -> int:
+    """Pass every slug found from byte ``offset`` onward to ``add``.
+
+    Returns the offset just past the last complete line, so a line that is
+    still being written is scanned again by the next call. Slugs are interned,
+    so every reference to the same plan shares a single string object.
+    ``stop`` is polled every STOP_CHECK_LINES lines; once it returns True the
+    scan ends early and the offset reached so far is returned. The pass
+    follows the page-cache policy in ``io_policy``.
+    """
+    end = position = offset
+    try:
+        with open(transcript_path, "rb") as f:
+            if offset:
+                f.seek(offset)
+            reader = SequentialRead(f.fileno(), offset)
+            for count, line in enumerate(f, 1):
+                if count % STOP_CHECK_LINES == 0:
+                    if stop is not None and stop():
+                        break
+                    reader.consumed(position)
+                position += len(line)
+                if line.endswith(b"\n"):
+                    end = position
+                if SLUG_KEY not in line:
+                    continue
+                slug = line_slug(line)
+                if slug is not None:
+                    add(sys.intern(slug))
+            reader.finish(position)
+    except FileNotFoundError:
+        print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
+    except OSError as e:
+        print(f"Error reading transcript: {e}", file=sys.stderr)
+    return end
+
+
+CHUNK_SIZE = 1 << 20
+MMAP_WINDOW = 8 << 20
+_END = -1
+
+# What the byte-searching readers search: bytes or an mmap.
+Buffer = bytes | mmap.mmap
+
+
+def _trie_regex(words: Iterable[bytes]) -> bytes:
+    """Build an alternation with shared prefixes factored out, like a trie.
+
+    Matching then costs time proportional to the slug length rather than to
+    the number of candidates.
+    """
+    trie: dict[int, Any] = {}
+    for word in words:
+        node = trie
+        for byte in word:
+            node = node.setdefault(byte, {})
+        node[_END] = {}
+
+    def emit(node: dict[int, Any]) -> bytes:
+        branches = [
+            re.escape(bytes([byte])) + emit(child)
+            for byte, child in sorted(node.items())
+            if byte != _END
+        ]
+        if not branches:
+            return b""
+        body = b"|".join(branches)
+        if len(branches) > 1 or _END in node:
+            body = b"(?:" + body + b")"
+        return body + b"?" if _END in node else body
+
+    return emit(trie)
+
+
+def _json_forms(slug: str) -> set[bytes]:
+    """The ways a JSON encoder may write ``slug`` inside a string literal."""
+    return {
+        json.dumps(slug)[1:-1].encode(),
+        json.dumps(slug, ensure_ascii=False)[1:-1].encode(),
+    }
+
+
+class CandidateSearch:
+    """Find a closed set of candidate slugs in raw transcript bytes.
+
+    Transcripts are read in large chunks and searched with one compiled
+    pattern for ``"slug":"<candidate>"``, so lines without a candidate are
+    never decoded. Each hit is verified by decoding just its line with the
+    same rules as ``scan_transcript`` (a JSON object whose top-level "slug"
+    is the candidate). Found slugs leave the candidate set and the pattern
+    shrinks with it; searching stops once nothing is left to find.
+    """
+
+    def __init__(self, candidates: Iterable[str]) -> None:
+        self.remaining = set(candidates)
+        self._pattern: re.Pattern[bytes] | None = None
+
+    def discard(self, slugs: Iterable[str]) -> None:
+        """Stop looking for ``slugs``, e.g. because a cache already has them."""
+        before = len(self.remaining)
+        self.remaining.difference_update(slugs)
+        if len(self.remaining) != before:
+            self._pattern = None
+
+    def _compiled(self) -> re.Pattern[bytes]:
+        if self._pattern is None:
+            forms = {form for slug in self.remaining for form in _json_forms(slug)}
+            self._pattern = re.compile(rb'"slug"\s*:\s*"' + _trie_regex(forms) + rb'"')
+        return self._pattern
+
+    def search(
+        self,
+        transcript_path: Path,
+        offset: int = 0,
+        stop: Callable[[], bool] | None = None,
+    ) -> list[str]:
+        """Return the candidates referenced in ``transcript_path`` past ``offset``.
+
+        ``stop`` is polled before each chunk; once it returns True the
+        search ends with what was found so far.
+        """
+        found: list[str] = []
+        if not self.remaining:
+            return found
+        try:
+            with open(transcript_path, "rb") as f:
+                if offset:
+                    f.seek(offset)
+                reader = SequentialRead(f.fileno(), offset)
+                position = offset
+                tail = b""
+                while self.remaining:
+                    if stop is not None and stop():
+                        break
+                    reader.consumed(position)
+                    chunk = f.read(CHUNK_SIZE)
+                    position += len(chunk)
+                    if not chunk:
+                        # A final line without a newline still counts.
+                        self._search_lines(tail, len(tail), found)
+                        break
+                    buf = tail + chunk
+                    cut = buf.rfind(b"\n") + 1
+                    self._search_lines(buf, cut, found)
+                    tail = buf[cut:]
+                reader.finish(position)
+        except FileNotFoundError:
+            print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
+        except OSError as e:
+            print(f"Error reading transcript: {e}", file=sys.stderr)
+        return found
+
+    def _search_lines(self, buf: bytes, end: int, found: list[str]) -> None:
+        """Search the complete lines in ``buf[:end]``."""
+        pos = 0
+        while self.remaining and pos < end:
+            match = self._compiled().search(buf, pos, end)
+            if match is None:
+                return
+            line_start = buf.rfind(b"\n", 0, match.start()) + 1
+            line_end = buf.find(b"\n", match.end(), end)
+            if line_end < 0:
+                line_end = end
+            slug = line_slug(buf[line_start:line_end])
+            if slug is not None and slug in self.remaining:
+                found.append(sys.intern(slug))
+                self.discard((slug,))
+            pos = line_end + 1
+
+
+def _slug_lines(buf: Buffer, start: int, end: int) -> Iterator[tuple[int, str]]:
+    """(line offset, slug) for each line of ``buf[start:end]`` with a slug.
+
+    Only the lines containing the "slug" key are sliced and decoded; ``buf``
+    may be bytes or an mmap.
+    """
+    pos = start
+    while pos < end:
+        hit = buf.find(SLUG_KEY, pos, end)
+        if hit < 0:
+            return
+        line_start = buf.rfind(b"\n", start, hit) + 1 or start
+        line_end = buf.find(b"\n", hit, end)
+        if line_end < 0:
+            line_end = end
+        slug = line_slug(buf[line_start:line_end])
+        if slug is not None:
+            yield line_start, sys.intern(slug)
+        pos = line_end + 1
+
+
+def scan_chunked(
+    transcript_path: Path,
+    add: Callable[[str], object],
+    offset: int = 0,
+    stop: Callable[[], bool] | None = None,
+) -> int:
+    """``scan_transcript`` reading CHUNK_SIZE bytes at a time.
+
+    Each chunk is searched for the "slug" key directly, so lines without
+    one are never split out of it. ``stop`` is polled before each chunk.
+    """
+    end = offset
+    try:
+        with open(transcript_path, "rb", buffering=0) as f:
+            if offset:
+                f.seek(offset)
+            reader = SequentialRead(f.fileno(), offset)
+            position = offset
+            tail = b""
+            while not (stop is not None and stop()):
+                reader.consumed(position)
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    # A final line without a newline still counts.
+                    for _, slug in _slug_lines(tail, 0, len(tail)):
+                        add(slug)
+                    break
+                position += len(chunk)
+                buf = tail + chunk
+                cut = buf.rfind(b"\n") + 1
+                for _, slug in _slug_lines(buf, 0, cut):
+                    add(slug)
+                end += cut
+                tail = buf[cut:]
+            reader.finish(position)
+    except FileNotFoundError:
+        print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
+    except OSError as e:
+        print(f"Error reading transcript: {e}", file=sys.stderr)
+    return end
+
+
+def scan_mmap(
+    transcript_path: Path,
+    add: Callable[[str], object],
+    offset: int = 0,
+    stop: Callable[[], bool] | None = None,
+) -> int:
+    """``scan_transcript`` searching a read-only mapping of the file.
+
+    Nothing is copied out of the page cache except the lines with a slug.
+    ``stop`` is polled before each window of MMAP_WINDOW bytes.
+    """
+    end = offset
+    try:
+        with open(transcript_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= offset:
+                return offset
+            reader = SequentialRead(f.fileno(), offset)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    aligned = offset - offset % mmap.PAGESIZE
+                    with contextlib.suppress(OSError):
+                        mm.madvise(mmap.MADV_SEQUENTIAL, aligned, size - aligned)
+                while end < size and not (stop is not None and stop()):
+                    reader.consumed(end)
+                    limit = min(end + MMAP_WINDOW, size)
+                    cut = mm.rfind(b"\n", end, limit) + 1
+                    if not cut:
+                        cut = mm.find(b"\n", limit, size) + 1
+                    if not cut:
+                        # A final line without a newline still counts.
+                        for _, slug in _slug_lines(mm, end, size):
+                            add(slug)
+                        break
+                    for _, slug in _slug_lines(mm, end, cut):
+                        add(slug)
+                    end = cut
+            reader.finish(size)
+    except FileNotFoundError:
+        print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
+    except (OSError, ValueError) as e:
+        print(f"Error reading transcript: {e}", file=sys.stderr)
+    return end
+
+
+def scan_tail(
+    transcript_path: Path,
+    add: Callable[[str], object],
+    offset: int = 0,
+    stop: Callable[[], bool] | None = None,
+) -> int:
+    """``scan_transcript`` reading CHUNK_SIZE blocks from the end backwards.
+
+    The most recently written bytes of a live transcript are read first,
+    while they are still in the page cache. Slugs are passed to ``add`` in
+    order of first appearance once the whole range is read; a scan cut
+    short by ``stop`` (polled before each block) adds nothing and returns
+    ``offset``, since it has not covered any prefix of the range.
+    """
+    end: int | None = None
+    first_seen: dict[str, int] = {}
+    try:
+        with open(transcript_path, "rb", buffering=0) as f:
+            fd = f.fileno()
+            size = os.fstat(fd).st_size
+            position = size
+            carry = b""
+            while position > offset:
+                if stop is not None and stop():
+                    return offset
+                start = max(offset, position - CHUNK_SIZE)
+                buf = os.pread(fd, position - start, start) + carry
+                if end is None and b"\n" in buf:
+                    end = start + buf.rfind(b"\n") + 1
+                # Bytes before the first newline belong to a line that
+                # starts in an earlier block.
+                cut = 0 if start == offset else buf.find(b"\n") + 1
+                if start > offset and not cut:
+                    carry = buf
+                    position = start
+                    continue
+                # Blocks come in reverse, so a slug's first appearance is the
+                # last one seen.
+                for line_start, slug in _slug_lines(buf, cut, len(buf)):
+                    seen = first_seen.get(slug)
+                    if seen is None or start + line_start < seen:
+                        first_seen[slug] = start + line_start
+                drop_range(fd, start, position)
+                carry = buf[:cut]
+                position = start
+    except FileNotFoundError:
+        print(f"Transcript file not found: {transcript_path}", file=sys.stderr)
+        return offset
+    except OSError as e:
+        print(f"Error reading transcript: {e}", file=sys.stderr)
+        return offset
+    for slug in sorted(first_seen, key=first_seen.__getitem__):
+        add(slug)
+    return offset if end is None else end
@@ -11,6 +11,7 @@ import time
 from pathlib import Path
 from unittest import mock
 
+from benchmarks import load_session_end
 from scripts import export_plan
 
 from . import TempDirTestCase
@@ -65,6 +66,47 @@ class ConcurrencyTests(TempDirTestCase):
         expected_line = f"export TRANSCRIPT_DIR={shlex.quote(transcript_dir)}"
         self.assertEqual(lines, [expected_line, expected_line])
 
+    def test_env_file_concurrent_append_mode_writes(self) -> None:
+        """Lock-free append mode never interleaves or corrupts records."""
+        env_file = self.tmpdir / "env.sh"
+        transcript = self.tmpdir / "transcript.jsonl"
+        transcript.write_text(json.dumps({"slug": "s"}), encoding="utf-8")
+
+        input_json = json.dumps({"transcript_path": str(transcript)})
+        script_path = SCRIPTS_DIR / "session_start.py"
+        env = {
+            **os.environ,
+            "CLAUDE_ENV_FILE": str(env_file),
+            "PLAN_EXPORT_ENV_WRITE": "append",
+        }
+
+        barrier = threading.Barrier(4)
+        results = []
+
+        def worker():
+            barrier.wait()
+            result = subprocess.run(
+                [sys.executable, str(script_path)],
+                input=input_json,
+                capture_output=True,
+                text=True,
+                env=env,
+            )
+            results.append(result.returncode)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [0, 0, 0, 0])
+        lines = env_file.read_text(encoding="utf-8").splitlines()
+        transcript_dir = os.path.dirname(str(transcript))
+        expected_line = f"export TRANSCRIPT_DIR={shlex.quote(transcript_dir)}"
+        self.assertGreaterEqual(len(lines), 1)
+        self.assertEqual(set(lines), {expected_line})
+
     def test_concurrent_same_slug_copy(self) -> None:
         project_dir = self.tmpdir / "project"
         project_dir.mkdir()
@@ -180,6 +222,20 @@ class ConcurrencyTests(TempDirTestCase):
 
         self.assertEqual(result, 0)
 
+    def test_many_concurrent_session_end_hooks(self) -> None:
+        report = load_session_end.run_load(
+            self.tmpdir,
+            sessions=8,
+            collision_rate=0.5,
+            large_fraction=0.25,
+            large_lines=2_000,
+            plan_size=16 * 1024,
+        )
+
+        self.assertEqual(report.failures, [])
+        self.assertEqual(report.corruptions, [])
+        self.assertEqual(len(report.latencies), 8)
+
 
 if __name__ == "__main__":
     import unittest
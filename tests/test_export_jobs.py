@@ -0,0 +1,60 @@
+"""Tests for scripts/export_jobs.py."""
+
+import os
+from unittest import mock
+
+from scripts import export_jobs
+
+from . import TempDirTestCase
+
+
+class ExportJobsTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch.dict(
+            os.environ, {"PLAN_EXPORT_STATE_DIR": str(self.tmpdir / "state")}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.jobs = export_jobs.ExportJobs(self.tmpdir)
+
+    def test_started_job_is_pending_until_finished(self) -> None:
+        job_id = self.jobs.start("/t/session.jsonl")
+
+        [pending] = self.jobs.pending()
+        self.assertEqual(pending["id"], job_id)
+        self.assertEqual(pending["state"], "running")
+
+        self.jobs.finish(job_id, {"exit_code": 0, "output": ["done"]})
+
+        self.assertEqual(self.jobs.pending(), [])
+        [finished] = self.jobs.finished()
+        self.assertEqual(finished["id"], job_id)
+        self.assertEqual(finished["output"], ["done"])
+
+    def test_job_whose_worker_died_is_reported_lost(self) -> None:
+        job_id = self.jobs.start("/t/session.jsonl")
+        with mock.patch("os.kill", side_effect=ProcessLookupError):
+            self.jobs.set_pid(job_id, 999_999)
+            [pending] = self.jobs.pending()
+
+        self.assertEqual(pending["pid"], 999_999)
+        self.assertEqual(pending["state"], "lost")
+
+    def test_log_is_rotated(self) -> None:
+        with mock.patch.object(export_jobs, "LOG_MAX_BYTES", 300):
+            for i in range(12):
+                self.jobs.finish(f"job-{i}", {"exit_code": 0, "output": ["x" * 40]})
+
+        names = sorted(p.name for p in self.jobs.root.glob("export.log*"))
+        self.assertEqual(
+            names, ["export.log", "export.log.1", "export.log.2", "export.log.3"]
+        )
+        self.assertLessEqual(self.jobs.log_path.stat().st_size, 300)
+        self.assertEqual(self.jobs.finished(limit=1)[0]["id"], "job-11")
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
@@ -2,13 +2,42 @@
 
 import io
 import json
+import os
+import subprocess
+import sys
+from pathlib import Path
 from unittest import mock
 
-from scripts import export_plan
+from scripts import (
+    export_checkpoint,
+    export_jobs,
+    export_plan,
+    export_spool,
+    plan_reconcile,
+    slug_cache,
+    transcript_scan,
+)
 
 from . import TempDirTestCase
 
 
+class HookImportTests(TempDirTestCase):
+    def test_hook_does_not_load_what_it_may_not_need(self) -> None:
+        # Each hook is a fresh interpreter, so module loading is its start-up.
+        scripts_dir = Path(__file__).resolve().parents[1] / "scripts"
+        code = (
+            f"import sys; sys.path.insert(0, {str(scripts_dir)!r}); "
+            "import export_plan; "
+            "print(' '.join(sorted(set(sys.modules) & {'ctypes', "
+            "'multiprocessing', 'sqlite3', 'subprocess', 'slug_cache'})))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), "")
+
+
 class FindSlugTests(TempDirTestCase):
     def test_valid_jsonl_with_slug(self) -> None:
         transcript = self.tmpdir / "transcript.jsonl"
@@ -162,6 +191,63 @@ class ExportPlanMainTests(TempDirTestCase):
         # Second slug file should NOT exist
         self.assertFalse((project_dir / f"plan-{second_slug}.md").exists())
 
+    def _all_plans_session(self, slugs: list[str], plans: list[str]):
+        project_dir = self.tmpdir / "project"
+        project_dir.mkdir()
+        home_dir = self.tmpdir / "home"
+        plans_dir = home_dir / ".claude" / "plans"
+        plans_dir.mkdir(parents=True)
+        for slug in plans:
+            (plans_dir / f"{slug}.md").write_text(f"plan {slug}", encoding="utf-8")
+        transcript = self.tmpdir / "transcript.jsonl"
+        transcript.write_text(
+            "".join(json.dumps({"slug": slug}) + "\n" for slug in slugs),
+            encoding="utf-8",
+        )
+        return project_dir, home_dir, {"transcript_path": str(transcript)}
+
+    def test_all_plans_exports_every_slug_from_one_scan(self) -> None:
+        project_dir, home_dir, input_data = self._all_plans_session(
+            ["first", "gone", "second", "first"], ["first", "second"]
+        )
+
+        with mock.patch("pathlib.Path.home", return_value=home_dir):
+            with mock.patch("pathlib.Path.cwd", return_value=project_dir):
+                with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+                    with mock.patch.object(
+                        slug_cache, "scan_adaptive", wraps=slug_cache.scan_adaptive
+                    ) as scan:
+                        with mock.patch("sys.stderr", io.StringIO()):
+                            result = export_plan.main(["--all-plans"])
+
+        self.assertEqual(result, 0)
+        scan.assert_called_once()
+        self.assertEqual(
+            sorted(p.name for p in (project_dir / "plans").iterdir()),
+            ["plan-first.md", "plan-second.md"],
+        )
+        self.assertEqual(
+            (project_dir / "plans" / "plan-second.md").read_text(encoding="utf-8"),
+            "plan second",
+        )
+        self.assertFalse((project_dir / "plan-first.md").exists())
+
+    def test_all_plans_with_a_single_plan_exports_to_the_root(self) -> None:
+        project_dir, home_dir, input_data = self._all_plans_session(
+            ["first", "gone"], ["first"]
+        )
+
+        with mock.patch("pathlib.Path.home", return_value=home_dir):
+            with mock.patch("pathlib.Path.cwd", return_value=project_dir):
+                with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+                    with mock.patch.dict(os.environ, {"PLAN_EXPORT_ALL_PLANS": "1"}):
+                        with mock.patch("sys.stderr", io.StringIO()):
+                            result = export_plan.main([])
+
+        self.assertEqual(result, 0)
+        self.assertTrue((project_dir / "plan-first.md").exists())
+        self.assertFalse((project_dir / "plans").exists())
+
     def test_full_flow_copies_plan_file(self) -> None:
         project_dir = self.tmpdir / "project"
         project_dir.mkdir()
@@ -216,6 +302,311 @@ class ExportPlanMainTests(TempDirTestCase):
         self.assertEqual(result, 0)
         self.assertFalse((project_dir / f"plan-{slug}.md").exists())
 
+    def test_json_mode_streams_events(self) -> None:
+        project_dir = self.tmpdir / "project"
+        project_dir.mkdir()
+        home_dir = self.tmpdir / "home"
+        plans_dir = home_dir / ".claude" / "plans"
+        plans_dir.mkdir(parents=True)
+        (plans_dir / "abc123.md").write_text("plan contents", encoding="utf-8")
+        transcript = self.tmpdir / "transcript.jsonl"
+        transcript.write_text(json.dumps({"slug": "abc123"}), encoding="utf-8")
+
+        stdout = io.StringIO()
+        input_data = {"transcript_path": str(transcript)}
+        with mock.patch("pathlib.Path.home", return_value=home_dir):
+            with mock.patch("pathlib.Path.cwd", return_value=project_dir):
+                with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+                    with mock.patch("sys.stdout", stdout):
+                        result = export_plan.main(["--json"])
+
+        self.assertEqual(result, 0)
+        events = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([e["event"] for e in events], ["copied", "summary"])
+        self.assertEqual(events[0]["slug"], "abc123")
+        self.assertEqual(events[0]["dest"], str(project_dir / "plan-abc123.md"))
+        self.assertEqual(events[1]["exported"], 1)
+        self.assertEqual(events[1]["counts"], {"copied": 1})
+        self.assertIn("scan", events[1]["timings"])
+        self.assertIn("total", events[1]["timings"])
+
+
+class BackgroundExportTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.project_dir = self.tmpdir / "project"
+        self.project_dir.mkdir()
+        self.home_dir = self.tmpdir / "home"
+        plans_dir = self.home_dir / ".claude" / "plans"
+        plans_dir.mkdir(parents=True)
+        (plans_dir / "abc123.md").write_text("plan contents", encoding="utf-8")
+        self.transcript = self.tmpdir / "transcript.jsonl"
+        self.transcript.write_text(json.dumps({"slug": "abc123"}), encoding="utf-8")
+        for patcher in (
+            mock.patch("pathlib.Path.home", return_value=self.home_dir),
+            mock.patch("pathlib.Path.cwd", return_value=self.project_dir),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self, argv: list[str], detach) -> int:
+        input_data = {"transcript_path": str(self.transcript)}
+        with mock.patch.object(export_plan, "detach", side_effect=detach):
+            with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+                return export_plan.main(argv)
+
+    def _status(self) -> list[dict]:
+        stdout = io.StringIO()
+        with mock.patch("sys.stdout", stdout):
+            self.assertEqual(export_plan.main(["status", "--json"]), 0)
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_hook_returns_before_the_export_runs(self) -> None:
+        jobs = []
+
+        def defer(job):
+            jobs.append(job)
+            return True
+
+        self.assertEqual(self._run(["--detach"], defer), 0)
+        self.assertFalse((self.project_dir / "plan-abc123.md").exists())
+        self.assertEqual([e["event"] for e in self._status()], ["pending"])
+
+        jobs[0]()
+
+        self.assertTrue((self.project_dir / "plan-abc123.md").exists())
+        [finished] = self._status()
+        self.assertEqual(finished["event"], "finished")
+        self.assertEqual(finished["exit_code"], 0)
+        self.assertIn("Copied plan to", finished["output"][-1])
+
+    def test_async_env_detaches_and_invalid_input_is_rejected_first(self) -> None:
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_ASYNC": "1"}):
+            self.assertEqual(self._run([], lambda job: True), 0)
+            with mock.patch("sys.stdin", io.StringIO("{}")):
+                self.assertEqual(export_plan.main([]), 1)
+
+        self.assertEqual(len(self._status()), 1)
+
+    def test_falls_back_to_foreground_when_fork_fails(self) -> None:
+        self.assertEqual(self._run(["--detach"], lambda job: False), 0)
+
+        self.assertTrue((self.project_dir / "plan-abc123.md").exists())
+        self.assertEqual(self._status(), [])
+
+    def test_deadline_defers_the_export_to_the_next_hook(self) -> None:
+        def expired(deadline, reserve=0.0):
+            deadline.hit = True
+            return True
+
+        with mock.patch.object(transcript_scan, "STOP_CHECK_LINES", 1):
+            with mock.patch.object(
+                export_checkpoint.Deadline,
+                "expired",
+                autospec=True,
+                side_effect=expired,
+            ):
+                self.assertEqual(self._run(["--deadline", "1"], None), 0)
+
+        self.assertFalse((self.project_dir / "plan-abc123.md").exists())
+        [pending] = self._status()
+        self.assertEqual(pending["state"], "deferred")
+        self.assertEqual(pending["transcript_path"], str(self.transcript))
+
+        plans_dir = self.home_dir / ".claude" / "plans"
+        (plans_dir / "def456.md").write_text("next plan", encoding="utf-8")
+        deferred = self.transcript
+        self.transcript = self.tmpdir / "next.jsonl"
+        self.transcript.write_text(json.dumps({"slug": "def456"}), encoding="utf-8")
+        self.assertEqual(self._run([], None), 0)
+
+        self.assertEqual(
+            (self.project_dir / "plan-abc123.md").read_text(encoding="utf-8"),
+            "plan contents",
+        )
+        self.assertTrue((self.project_dir / "plan-def456.md").exists())
+        [finished] = self._status()
+        self.assertEqual(finished["event"], "finished")
+        self.assertEqual(finished["transcript_path"], str(deferred))
+
+    def test_plan_is_exported_to_every_destination(self) -> None:
+        worktree = self.tmpdir / "worktree"
+        worktree.mkdir()
+
+        self.assertEqual(self._run(["--dest", str(worktree)], None), 0)
+
+        for root in (self.project_dir, worktree):
+            self.assertEqual(
+                (root / "plan-abc123.md").read_text(encoding="utf-8"),
+                "plan contents",
+            )
+            # Recorded, so --reconcile may prune it once the plan is gone.
+            self.assertEqual(plan_reconcile.exported_names(root), {"plan-abc123.md"})
+
+    def test_deleted_worktrees_do_not_stop_the_export(self) -> None:
+        worktree = self.tmpdir / "worktree"
+        worktree.mkdir()
+        porcelain = (
+            f"worktree {self.project_dir}\n\n"
+            f"worktree {worktree}\n\n"
+            f"worktree {self.tmpdir / 'gone'}\nprunable gitdir file points to "
+            "non-existent location\n"
+        )
+        listing = subprocess.CompletedProcess([], 0, porcelain, "")
+        with mock.patch("subprocess.run", return_value=listing):
+            self.assertEqual(self._run(["--worktrees"], None), 0)
+
+        for root in (self.project_dir, worktree):
+            self.assertTrue((root / "plan-abc123.md").exists())
+        self.assertFalse((self.tmpdir / "gone").exists())
+
+    def test_deferred_export_keeps_its_destinations(self) -> None:
+        worktree = self.tmpdir / "worktree"
+        worktree.mkdir()
+        export_jobs.ExportJobs(self.project_dir).defer(
+            str(self.transcript), [self.project_dir, worktree]
+        )
+
+        other = self.tmpdir / "other.jsonl"
+        other.write_text("{}\n", encoding="utf-8")
+        self.transcript = other
+        self.assertEqual(self._run([], None), 0)
+
+        self.assertTrue((worktree / "plan-abc123.md").exists())
+
+
+class SpoolExportTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.home_dir = self.tmpdir / "home"
+        self.plans_dir = self.home_dir / ".claude" / "plans"
+        self.plans_dir.mkdir(parents=True)
+        (self.plans_dir / "abc123.md").write_text("plan contents", encoding="utf-8")
+        self.transcript_dir = self.tmpdir / "transcripts"
+        self.transcript_dir.mkdir()
+        self.project_dir = self.tmpdir / "project"
+        self.project_dir.mkdir()
+        for patcher in (
+            mock.patch("pathlib.Path.home", return_value=self.home_dir),
+            mock.patch("pathlib.Path.cwd", return_value=self.project_dir),
+            mock.patch.dict(os.environ, {"PLAN_EXPORT_SPOOL": "1"}),
+            mock.patch.object(export_plan, "SPOOL_SETTLE", 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _transcript(self, name: str, slug: str | None) -> str:
+        path = self.transcript_dir / name
+        line = json.dumps({"slug": slug} if slug else {"type": "user"})
+        path.write_text(line + "\n", encoding="utf-8")
+        return str(path)
+
+    def _hook(self, transcript_path: str) -> int:
+        input_data = {"transcript_path": transcript_path}
+        with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+            return export_plan.main([])
+
+    def test_burst_is_exported_in_one_batch(self) -> None:
+        spool = export_spool.ExportSpool()
+        for name in ("a.jsonl", "b.jsonl"):
+            spool.submit(self._transcript(name, "abc123"), [self.project_dir])
+
+        with mock.patch.object(
+            export_plan, "list_plan_names", wraps=export_plan.list_plan_names
+        ) as listing:
+            with mock.patch.object(
+                export_plan, "copy_plan_to_all", wraps=export_plan.copy_plan_to_all
+            ) as copy:
+                result = self._hook(self._transcript("c.jsonl", None))
+
+        self.assertEqual(result, 0)
+        listing.assert_called_once()
+        copy.assert_called_once()
+        self.assertTrue((self.project_dir / "plan-abc123.md").exists())
+        self.assertEqual(spool.queued(), [])
+
+    def test_hook_returns_while_another_process_leads(self) -> None:
+        spool = export_spool.ExportSpool()
+        with spool.lead() as leader:
+            self.assertTrue(leader)
+            self.assertEqual(self._hook(self._transcript("a.jsonl", "abc123")), 0)
+
+        self.assertFalse((self.project_dir / "plan-abc123.md").exists())
+        [queued] = spool.take()
+        self.assertEqual(queued[1]["dest_dirs"], [str(self.project_dir)])
+
+    def test_jobs_queued_during_a_batch_are_exported_by_the_same_leader(
+        self,
+    ) -> None:
+        (self.plans_dir / "def456.md").write_text("late plan", encoding="utf-8")
+        late = self._transcript("late.jsonl", "def456")
+        original_batch = export_plan.export_batch
+        batches = []
+
+        def batch(records, reporter, deadline):
+            batches.append([r["transcript_path"] for r in records])
+            if len(batches) == 1:
+                export_spool.ExportSpool().submit(late, [self.project_dir])
+            return original_batch(records, reporter, deadline)
+
+        with mock.patch.object(export_plan, "export_batch", side_effect=batch):
+            self.assertEqual(self._hook(self._transcript("a.jsonl", "abc123")), 0)
+
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(batches[1], [late])
+        self.assertTrue((self.project_dir / "plan-def456.md").exists())
+
+    def test_deadline_after_every_slug_is_found_exports_the_batch(self) -> None:
+        (self.plans_dir / "def456.md").write_text("second plan", encoding="utf-8")
+        records = [
+            {
+                "transcript_path": self._transcript(name, slug),
+                "dest_dirs": [str(self.project_dir)],
+            }
+            for name, slug in (("a.jsonl", "abc123"), ("b.jsonl", "def456"))
+        ]
+        deadline = export_checkpoint.Deadline()
+        original_find = export_plan.find_session_slugs
+
+        def find(transcript, **kwargs):
+            found = original_find(transcript, **kwargs)
+            if transcript.name == "b.jsonl":
+                # The scan of the last transcript ran out of time after its
+                # slug turned up.
+                deadline.hit = True
+            return found
+
+        with mock.patch.object(export_plan, "find_session_slugs", side_effect=find):
+            with mock.patch("sys.stdout", io.StringIO()):
+                result = export_plan.export_batch(
+                    records, export_plan.ExportReporter(), deadline
+                )
+
+        self.assertEqual(result, (2, 2, 0))
+        for slug in ("abc123", "def456"):
+            self.assertTrue((self.project_dir / f"plan-{slug}.md").exists())
+
+    def test_batch_exports_every_plan_of_all_plans_sessions(self) -> None:
+        (self.plans_dir / "def456.md").write_text("second plan", encoding="utf-8")
+        path = self.transcript_dir / "both.jsonl"
+        path.write_text(
+            json.dumps({"slug": "abc123"}) + "\n" + json.dumps({"slug": "def456"}),
+            encoding="utf-8",
+        )
+        export_spool.ExportSpool().submit(
+            self._transcript("one.jsonl", "def456"), [self.project_dir]
+        )
+
+        input_data = {"transcript_path": str(path)}
+        with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+            self.assertEqual(export_plan.main(["--all-plans"]), 0)
+
+        self.assertTrue((self.project_dir / "plan-def456.md").exists())
+        self.assertEqual(
+            sorted(p.name for p in (self.project_dir / "plans").iterdir()),
+            ["plan-abc123.md", "plan-def456.md"],
+        )
+
 
 if __name__ == "__main__":
     import unittest
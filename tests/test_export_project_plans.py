@@ -1,10 +1,21 @@
 """Tests for scripts/export_project_plans.py."""
 
+import contextlib
+import io
 import json
 import os
+import shutil
+import signal
+import tarfile
 from unittest import mock
 
-from scripts import export_project_plans
+from scripts import (
+    export_checkpoint,
+    export_project_plans,
+    plan_reconcile,
+    slug_cache,
+    transcript_scan,
+)
 
 from . import TempDirTestCase
 
@@ -40,6 +51,51 @@ class FindSlugsTests(TempDirTestCase):
         slugs = export_project_plans.find_slugs_in_transcript(transcript)
         self.assertEqual(slugs, {"one", "two"})
 
+    def test_shared_collection_is_updated_in_place(self) -> None:
+        first = self.tmpdir / "a.jsonl"
+        second = self.tmpdir / "b.jsonl"
+        first.write_text(json.dumps({"slug": "one"}), encoding="utf-8")
+        second.write_text(json.dumps({"slug": "two"}), encoding="utf-8")
+
+        shared: set[str] = set()
+        export_project_plans.find_slugs_in_transcript(first, shared)
+        result = export_project_plans.find_slugs_in_transcript(second, shared)
+
+        self.assertIs(result, shared)
+        self.assertEqual(shared, {"one", "two"})
+
+    def test_non_string_and_non_object_slugs_are_ignored(self) -> None:
+        transcript = self.tmpdir / "t.jsonl"
+        transcript.write_text(
+            "\n".join(
+                [
+                    json.dumps(["slug"]),
+                    json.dumps({"slug": ["nested"]}),
+                    json.dumps({"slug": "ok"}),
+                ]
+            ),
+            encoding="utf-8",
+        )
+
+        slugs = export_project_plans.find_slugs_in_transcript(transcript)
+        self.assertEqual(slugs, {"ok"})
+
+
+class ResolvePlanFilesTests(TempDirTestCase):
+    def test_only_existing_plans_are_resolved_in_sorted_order(self) -> None:
+        plans_dir = self.tmpdir / "plans"
+        plans_dir.mkdir()
+        (plans_dir / "b.md").write_text("b", encoding="utf-8")
+        (plans_dir / "a.md").write_text("a", encoding="utf-8")
+
+        valid = export_project_plans.resolve_plan_files({"b", "a", "x"}, plans_dir)
+
+        self.assertEqual(valid, [("a", plans_dir / "a.md"), ("b", plans_dir / "b.md")])
+
+    def test_missing_plans_directory_resolves_nothing(self) -> None:
+        valid = export_project_plans.resolve_plan_files({"a"}, self.tmpdir / "none")
+        self.assertEqual(valid, [])
+
 
 class ExportProjectPlansMainTests(TempDirTestCase):
     def test_missing_env_var_returns_error(self) -> None:
@@ -223,6 +279,708 @@ class ExportProjectPlansMainTests(TempDirTestCase):
         self.assertFalse((project_dir / "plans" / "plan-fail.md").exists())
 
 
+class ResumableExportTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.project_dir = self.tmpdir / "project"
+        self.project_dir.mkdir()
+        self.home_dir = self.tmpdir / "home"
+        plans_dir = self.home_dir / ".claude" / "plans"
+        plans_dir.mkdir(parents=True)
+        self.transcript_dir = self.tmpdir / "transcripts"
+        self.transcript_dir.mkdir()
+        (self.transcript_dir / "a.jsonl").write_text(
+            json.dumps({"slug": "one"}) + "\n" + json.dumps({"slug": "two"}) + "\n",
+            encoding="utf-8",
+        )
+        (plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+        (plans_dir / "two.md").write_text("plan two", encoding="utf-8")
+        self.checkpoints = self.home_dir / ".claude" / "plan-export" / "checkpoints"
+
+    def _run(self, argv: list[str], copy2) -> int:
+        with mock.patch.dict(
+            os.environ, {"TRANSCRIPT_DIR": str(self.transcript_dir)}, clear=True
+        ):
+            with mock.patch("pathlib.Path.home", return_value=self.home_dir):
+                with mock.patch("pathlib.Path.cwd", return_value=self.project_dir):
+                    with mock.patch("shutil.copy2", side_effect=copy2):
+                        return export_project_plans.main(argv)
+
+    def test_interrupted_export_resumes_without_rescanning(self) -> None:
+        original_copy2 = __import__("shutil").copy2
+
+        def interrupt_on_second(src, dst):
+            if "two" in str(src):
+                raise KeyboardInterrupt
+            return original_copy2(src, dst)
+
+        result = self._run([], interrupt_on_second)
+
+        self.assertEqual(result, 130)
+        self.assertEqual(len(list(self.checkpoints.glob("*.json"))), 1)
+
+        copies = []
+
+        def record_copy(src, dst):
+            copies.append(src)
+            return original_copy2(src, dst)
+
+        with mock.patch.object(slug_cache, "scan_adaptive") as scan:
+            result = self._run(["--resume"], record_copy)
+
+        self.assertEqual(result, 0)
+        scan.assert_not_called()
+        self.assertEqual([p.name for p in copies], ["two.md"])
+        plans = self.project_dir / "plans"
+        self.assertEqual((plans / "plan-one.md").read_text("utf-8"), "plan one")
+        self.assertEqual((plans / "plan-two.md").read_text("utf-8"), "plan two")
+        self.assertEqual(list(self.checkpoints.glob("*.json")), [])
+
+    def test_resume_rescans_only_appended_bytes(self) -> None:
+        def interrupt(src, dst):
+            raise KeyboardInterrupt
+
+        self.assertEqual(self._run([], interrupt), 130)
+
+        transcript = self.transcript_dir / "a.jsonl"
+        size = transcript.stat().st_size
+        with open(transcript, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"slug": "three"}) + "\n")
+
+        offsets = []
+        original_scan = slug_cache.scan_adaptive
+
+        def record_scan(path, add, offset=0, stop=None, **kwargs):
+            offsets.append(offset)
+            return original_scan(path, add, offset, stop, **kwargs)
+
+        with mock.patch.object(slug_cache, "scan_adaptive", side_effect=record_scan):
+            result = self._run(["--resume"], __import__("shutil").copy2)
+
+        self.assertEqual(result, 0)
+        self.assertEqual(offsets, [size])
+        self.assertTrue((self.project_dir / "plans" / "plan-two.md").exists())
+
+    def test_sigterm_saves_checkpoint_and_exits_cleanly(self) -> None:
+        def terminate(src, dst):
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        previous = signal.getsignal(signal.SIGTERM)
+        result = self._run([], terminate)
+
+        self.assertEqual(result, 128 + signal.SIGTERM)
+        self.assertEqual(len(list(self.checkpoints.glob("*.json"))), 1)
+        self.assertIs(signal.getsignal(signal.SIGTERM), previous)
+
+    def test_resume_without_checkpoint_runs_full_export(self) -> None:
+        result = self._run(["--resume"], __import__("shutil").copy2)
+
+        self.assertEqual(result, 0)
+        self.assertTrue((self.project_dir / "plans" / "plan-one.md").exists())
+        self.assertTrue((self.project_dir / "plans" / "plan-two.md").exists())
+
+
+class EarlyExitTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.project_dir = self.tmpdir / "project"
+        self.project_dir.mkdir()
+        self.home_dir = self.tmpdir / "home"
+        self.plans_dir = self.home_dir / ".claude" / "plans"
+        self.plans_dir.mkdir(parents=True)
+        self.transcript_dir = self.tmpdir / "transcripts"
+        self.transcript_dir.mkdir()
+
+    def _run(self) -> int:
+        with mock.patch.dict(
+            os.environ, {"TRANSCRIPT_DIR": str(self.transcript_dir)}, clear=True
+        ):
+            with mock.patch("pathlib.Path.home", return_value=self.home_dir):
+                with mock.patch("pathlib.Path.cwd", return_value=self.project_dir):
+                    return export_project_plans.main(["--early-exit"])
+
+    def test_scanning_stops_once_every_plan_is_found(self) -> None:
+        (self.plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+        for name in ("a.jsonl", "b.jsonl"):
+            (self.transcript_dir / name).write_text(
+                json.dumps({"slug": "one"}) + "\n", encoding="utf-8"
+            )
+
+        searched = []
+        original_search = transcript_scan.CandidateSearch.search
+
+        def record_search(search, path, offset=0, stop=None):
+            searched.append(path.name)
+            return original_search(search, path, offset, stop)
+
+        with mock.patch.object(
+            transcript_scan.CandidateSearch,
+            "search",
+            autospec=True,
+            side_effect=record_search,
+        ):
+            result = self._run()
+
+        self.assertEqual(result, 0)
+        self.assertEqual(len(searched), 1)
+        self.assertTrue((self.project_dir / "plan-one.md").exists())
+
+    def test_cached_slugs_are_used_without_searching(self) -> None:
+        (self.plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            json.dumps({"slug": "one"}) + "\n", encoding="utf-8"
+        )
+        with mock.patch.dict(
+            os.environ, {"TRANSCRIPT_DIR": str(self.transcript_dir)}, clear=True
+        ):
+            with mock.patch("pathlib.Path.home", return_value=self.home_dir):
+                with mock.patch("pathlib.Path.cwd", return_value=self.project_dir):
+                    self.assertEqual(export_project_plans.main(), 0)
+
+        with mock.patch.object(transcript_scan.CandidateSearch, "search") as search:
+            result = self._run()
+
+        self.assertEqual(result, 0)
+        search.assert_not_called()
+
+    def test_slugs_without_plan_files_are_not_collected(self) -> None:
+        (self.plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            json.dumps({"slug": "gone"}) + "\n" + json.dumps({"slug": "one"}),
+            encoding="utf-8",
+        )
+
+        with mock.patch("sys.stderr") as stderr:
+            result = self._run()
+
+        self.assertEqual(result, 0)
+        self.assertTrue((self.project_dir / "plan-one.md").exists())
+        written = "".join(call.args[0] for call in stderr.write.call_args_list)
+        self.assertNotIn("gone", written)
+
+    def test_empty_plans_directory_skips_scanning(self) -> None:
+        (self.transcript_dir / "a.jsonl").write_text(
+            json.dumps({"slug": "one"}), encoding="utf-8"
+        )
+
+        with mock.patch.object(slug_cache, "scan_adaptive") as scan:
+            result = self._run()
+
+        self.assertEqual(result, 0)
+        scan.assert_not_called()
+
+
+class ProjectExportTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.project_dir = self.tmpdir / "project"
+        self.project_dir.mkdir()
+        self.home_dir = self.tmpdir / "home"
+        self.plans_dir = self.home_dir / ".claude" / "plans"
+        self.plans_dir.mkdir(parents=True)
+        self.transcript_dir = self.tmpdir / "transcripts"
+        self.transcript_dir.mkdir()
+        # Calls made outside _run keep their slug cache in the fake home too.
+        patcher = mock.patch("pathlib.Path.home", return_value=self.home_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, argv: list[str]) -> tuple[int, list[dict]]:
+        stdout = io.StringIO()
+        with mock.patch.dict(
+            os.environ, {"TRANSCRIPT_DIR": str(self.transcript_dir)}, clear=True
+        ):
+            with mock.patch("pathlib.Path.home", return_value=self.home_dir):
+                with mock.patch("pathlib.Path.cwd", return_value=self.project_dir):
+                    with mock.patch("sys.stdout", stdout):
+                        result = export_project_plans.main(argv)
+        return result, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+class JsonOutputTests(ProjectExportTestCase):
+    def test_one_event_per_plan_then_summary(self) -> None:
+        (self.plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+        (self.plans_dir / "two.md").write_text("plan two", encoding="utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            "\n".join(json.dumps({"slug": s}) for s in ("one", "two", "gone")),
+            encoding="utf-8",
+        )
+
+        result, events = self._run(["--json"])
+        self.assertEqual(result, 0)
+        self.assertEqual(
+            [(e["event"], e.get("slug")) for e in events],
+            [
+                ("missing", "gone"),
+                ("copied", "one"),
+                ("copied", "two"),
+                ("summary", None),
+            ],
+        )
+        summary = events[-1]
+        self.assertEqual(summary["exported"], 2)
+        self.assertEqual(summary["exit_code"], 0)
+        self.assertEqual(summary["counts"], {"missing": 1, "copied": 2})
+        self.assertEqual(set(summary["timings"]), {"scan", "resolve", "copy", "total"})
+
+        _, events = self._run(["--json"])
+        self.assertEqual(
+            [e["event"] for e in events], ["missing", "skipped", "skipped", "summary"]
+        )
+        self.assertEqual(events[1]["reason"], "up-to-date")
+
+    def test_text_mode_is_unchanged(self) -> None:
+        (self.plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            json.dumps({"slug": "one"}), encoding="utf-8"
+        )
+
+        stdout = io.StringIO()
+        with mock.patch.dict(
+            os.environ, {"TRANSCRIPT_DIR": str(self.transcript_dir)}, clear=True
+        ):
+            with mock.patch("pathlib.Path.home", return_value=self.home_dir):
+                with mock.patch("pathlib.Path.cwd", return_value=self.project_dir):
+                    with mock.patch("sys.stdout", stdout):
+                        export_project_plans.main()
+
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            [
+                f"Copied: {self.project_dir / 'plan-one.md'}",
+                "Exported 1 plan file(s)",
+            ],
+        )
+
+
+class DryRunTests(ProjectExportTestCase):
+    def test_reports_actions_without_copying(self) -> None:
+        for slug in ("new", "changed", "same"):
+            (self.plans_dir / f"{slug}.md").write_text(f"plan {slug}", "utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            "\n".join(json.dumps({"slug": s}) for s in ("new", "changed", "same")),
+            encoding="utf-8",
+        )
+        dest_dir = self.project_dir / "plans"
+        dest_dir.mkdir()
+        (dest_dir / "plan-changed.md").write_text("old", encoding="utf-8")
+        shutil.copy2(self.plans_dir / "same.md", dest_dir / "plan-same.md")
+
+        with mock.patch("shutil.copy2") as copy2:
+            result, events = self._run(["--dry-run", "--json"])
+
+        self.assertEqual(result, 0)
+        copy2.assert_not_called()
+        self.assertFalse((dest_dir / "plan-new.md").exists())
+        self.assertEqual((dest_dir / "plan-changed.md").read_text("utf-8"), "old")
+        planned = {e["slug"]: (e["action"], e["bytes"]) for e in events[:-1]}
+        self.assertEqual(
+            planned,
+            {
+                "new": ("copy", len("plan new")),
+                "changed": ("overwrite", len("plan changed")),
+                "same": ("up-to-date", 0),
+            },
+        )
+        summary = events[-1]
+        self.assertTrue(summary["dry_run"])
+        self.assertEqual(
+            summary["actions"], {"copy": 1, "overwrite": 1, "up-to-date": 1}
+        )
+        self.assertEqual(summary["bytes"], len("plan new") + len("plan changed"))
+
+    def test_does_not_create_plans_folder_or_checkpoint(self) -> None:
+        for slug in ("one", "two"):
+            (self.plans_dir / f"{slug}.md").write_text(f"plan {slug}", "utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            "\n".join(json.dumps({"slug": s}) for s in ("one", "two")),
+            encoding="utf-8",
+        )
+
+        with mock.patch.object(export_project_plans.ExportCheckpoint, "flush") as flush:
+            result, _ = self._run(["--dry-run", "--json"])
+
+        self.assertEqual(result, 0)
+        flush.assert_not_called()
+        self.assertFalse((self.project_dir / "plans").exists())
+        cache_files = list(
+            (self.home_dir / ".claude" / "plan-export" / "slug-cache").glob("*/*.json")
+        )
+        self.assertEqual(len(cache_files), 1)
+
+
+class ReconcileTests(ProjectExportTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        for slug in ("one", "two"):
+            (self.plans_dir / f"{slug}.md").write_text(f"plan {slug}", "utf-8")
+        (self.plans_dir / "elsewhere.md").write_text("other project", "utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            "\n".join(json.dumps({"slug": s}) for s in ("one", "two")),
+            encoding="utf-8",
+        )
+        self.dest_dir = self.project_dir / "plans"
+        self.dest_dir.mkdir()
+        for name in ("plan-one.md", "plan-renamed.md", "plan-elsewhere.md", "a.md"):
+            (self.dest_dir / name).write_text("old", encoding="utf-8")
+        # As if an earlier export wrote them.
+        plan_reconcile.record_exports(
+            self.dest_dir / name
+            for name in ("plan-one.md", "plan-renamed.md", "plan-elsewhere.md")
+        )
+
+    def test_dry_run_previews_copies_and_removals(self) -> None:
+        with mock.patch.object(
+            export_project_plans, "planned_action"
+        ) as planned_action:
+            result, events = self._run(["--reconcile", "--dry-run", "--json"])
+
+        self.assertEqual(result, 0)
+        planned_action.assert_not_called()
+        self.assertTrue((self.dest_dir / "plan-renamed.md").exists())
+        self.assertEqual(
+            [(e["slug"], e["action"]) for e in events[:-1]],
+            [("one", "overwrite"), ("two", "copy"), ("renamed", "remove")],
+        )
+        self.assertEqual(events[-2]["reason"], "orphaned")
+        self.assertEqual(
+            events[-1]["actions"],
+            {"copy": 1, "overwrite": 1, "up-to-date": 0, "remove": 1},
+        )
+
+    def test_removes_orphans_after_copying(self) -> None:
+        result, events = self._run(["--reconcile", "--json"])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(
+            sorted(p.name for p in self.dest_dir.iterdir()),
+            ["a.md", "plan-elsewhere.md", "plan-one.md", "plan-two.md"],
+        )
+        self.assertEqual(
+            [e["event"] for e in events],
+            ["copied", "copied", "removed", "summary"],
+        )
+        self.assertEqual(events[-1]["removed"], 1)
+
+    def test_hand_written_files_in_the_project_root_are_kept(self) -> None:
+        (self.plans_dir / "two.md").unlink()
+        for name in ("plan-notes.md", "plan-release.md"):
+            (self.project_dir / name).write_text("mine", encoding="utf-8")
+
+        result, events = self._run(["--reconcile", "--json"])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(
+            sorted(p.name for p in self.project_dir.iterdir() if p.is_file()),
+            ["plan-notes.md", "plan-one.md", "plan-release.md"],
+        )
+        # Only the exports left in plans/ from when there were two plans.
+        self.assertEqual(
+            sorted(e["dest"] for e in events if e["event"] == "removed"),
+            [
+                str(self.dest_dir / "plan-one.md"),
+                str(self.dest_dir / "plan-renamed.md"),
+            ],
+        )
+
+    def test_plans_folder_is_reconciled_once_one_plan_is_left(self) -> None:
+        (self.plans_dir / "two.md").unlink()
+
+        result, events = self._run(["--reconcile", "--json"])
+
+        self.assertEqual(result, 0)
+        self.assertTrue((self.project_dir / "plan-one.md").exists())
+        self.assertEqual(
+            sorted(p.name for p in self.dest_dir.iterdir()),
+            ["a.md", "plan-elsewhere.md"],
+        )
+        self.assertEqual(
+            sorted((e["slug"], e["reason"]) for e in events if e["event"] == "removed"),
+            [("one", "superseded"), ("renamed", "orphaned")],
+        )
+
+    def test_project_root_is_reconciled_once_plans_move_to_the_folder(
+        self,
+    ) -> None:
+        (self.project_dir / "plan-one.md").write_text("old", encoding="utf-8")
+        plan_reconcile.record_exports([self.project_dir / "plan-one.md"])
+
+        result, _ = self._run(["--reconcile", "--json"])
+
+        self.assertEqual(result, 0)
+        self.assertFalse((self.project_dir / "plan-one.md").exists())
+        self.assertEqual(
+            (self.dest_dir / "plan-one.md").read_text(encoding="utf-8"), "plan one"
+        )
+
+    def test_stale_exports_stay_without_reconcile(self) -> None:
+        result, _ = self._run(["--json"])
+
+        self.assertEqual(result, 0)
+        self.assertTrue((self.dest_dir / "plan-renamed.md").exists())
+
+    def test_cannot_be_combined_with_archive(self) -> None:
+        with mock.patch("sys.stderr", io.StringIO()):
+            result, _ = self._run(["--reconcile", "--archive", "plans.zip"])
+
+        self.assertEqual(result, 1)
+
+
+class ArchiveExportTests(ProjectExportTestCase):
+    def test_plans_are_archived_instead_of_copied(self) -> None:
+        for slug in ("one", "two"):
+            (self.plans_dir / f"{slug}.md").write_text(f"plan {slug}", "utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            "\n".join(json.dumps({"slug": s}) for s in ("one", "two")),
+            encoding="utf-8",
+        )
+
+        result, events = self._run(["--archive", "plans.tar.gz", "--json"])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(
+            sorted(p.name for p in self.project_dir.iterdir()), ["plans.tar.gz"]
+        )
+        with tarfile.open(self.project_dir / "plans.tar.gz") as tar:
+            self.assertEqual(tar.getnames(), ["plan-one.md", "plan-two.md"])
+        self.assertEqual(
+            [e["event"] for e in events], ["archived", "archived", "summary"]
+        )
+        self.assertEqual(events[-1]["exported"], 2)
+
+    def test_unsupported_archive_type_is_an_error(self) -> None:
+        result, events = self._run(["--archive", "plans.rar"])
+
+        self.assertEqual(result, 1)
+        self.assertEqual(events, [])
+
+
+class TranscriptSelectionTests(ProjectExportTestCase):
+    def _write(self, name: str, *slugs: str) -> None:
+        lines = [json.dumps({"type": "user"})] + [
+            json.dumps({"slug": slug}) for slug in slugs
+        ]
+        (self.transcript_dir / name).write_text("\n".join(lines) + "\n", "utf-8")
+
+    def test_slug_free_transcripts_are_not_reopened(self) -> None:
+        (self.plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+        self._write("a.jsonl", "one")
+        self._write("b.jsonl")
+        self._run(["--json"])
+
+        opened = []
+        original_scan = slug_cache.scan_adaptive
+
+        def record_scan(path, add, offset=0, stop=None, **kwargs):
+            opened.append(path.name)
+            return original_scan(path, add, offset, stop, **kwargs)
+
+        self._write("c.jsonl")
+        with mock.patch.object(slug_cache, "scan_adaptive", record_scan):
+            result, _ = self._run(["--json"])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(opened, ["c.jsonl"])
+
+    def test_include_and_exclude_patterns(self) -> None:
+        for slug in ("kept", "agent", "other"):
+            (self.plans_dir / f"{slug}.md").write_text(slug, encoding="utf-8")
+        self._write("session-1.jsonl", "kept")
+        self._write("agent-1.jsonl", "agent")
+        self._write("notes.jsonl", "other")
+
+        self.assertEqual(
+            export_project_plans.collect_slugs(self.transcript_dir),
+            {"kept", "other"},
+        )
+        self.assertEqual(
+            export_project_plans.collect_slugs(
+                self.transcript_dir, include=["session-*.jsonl"]
+            ),
+            {"kept"},
+        )
+        self.assertEqual(
+            export_project_plans.collect_slugs(self.transcript_dir, exclude=["notes*"]),
+            {"kept", "agent"},
+        )
+
+        result, _ = self._run(["--json", "--include", "*-1.jsonl", "--exclude", ""])
+        self.assertEqual(result, 0)
+        self.assertEqual(
+            sorted(p.name for p in (self.project_dir / "plans").iterdir()),
+            ["plan-agent.md", "plan-kept.md"],
+        )
+
+
+class CaseCollisionTests(ProjectExportTestCase):
+    def test_names_are_only_suffixed_on_case_insensitive_destinations(self) -> None:
+        for slug in ("Auth", "auth"):
+            (self.plans_dir / f"{slug}.md").write_text(slug, encoding="utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            "\n".join(json.dumps({"slug": s}) for s in ("Auth", "auth")) + "\n",
+            encoding="utf-8",
+        )
+        plans = self.project_dir / "plans"
+
+        with mock.patch.object(
+            export_project_plans, "case_insensitive", return_value=False
+        ):
+            self.assertEqual(self._run(["--json"])[0], 0)
+        self.assertEqual(
+            sorted(p.name for p in plans.iterdir()), ["plan-Auth.md", "plan-auth.md"]
+        )
+
+        for path in plans.iterdir():
+            path.unlink()
+        with mock.patch.object(
+            export_project_plans, "case_insensitive", return_value=True
+        ) as probe:
+            self.assertEqual(self._run(["--json"])[0], 0)
+        probe.assert_called_with(plans)
+        self.assertEqual(
+            sorted(p.name for p in plans.iterdir()),
+            ["plan-Auth.md", "plan-auth-2.md"],
+        )
+
+
+class MultiDestinationTests(ProjectExportTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        for slug in ("one", "two"):
+            (self.plans_dir / f"{slug}.md").write_text(f"plan {slug}", "utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            "\n".join(json.dumps({"slug": s}) for s in ("one", "two")) + "\n",
+            encoding="utf-8",
+        )
+        self.worktree = self.tmpdir / "worktree"
+        self.worktree.mkdir()
+
+    def test_plans_land_in_every_destination(self) -> None:
+        result, events = self._run(
+            ["--json", "--dest", str(self.worktree), "--link", "hardlink"]
+        )
+
+        self.assertEqual(result, 0)
+        self.assertEqual(
+            [(e["event"], e.get("method")) for e in events[:-1]],
+            [("copied", "copied"), ("copied", "linked")] * 2,
+        )
+        self.assertEqual(events[-1]["exported"], 2)
+        for slug in ("one", "two"):
+            name = f"plan-{slug}.md"
+            self.assertEqual(
+                (self.project_dir / "plans" / name).stat().st_ino,
+                (self.worktree / "plans" / name).stat().st_ino,
+            )
+
+    def test_dry_run_covers_every_destination(self) -> None:
+        result, events = self._run(["--json", "--dry-run", "--dest", "../worktree"])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(events[-1]["actions"]["copy"], 4)
+        self.assertFalse((self.worktree / "plans").exists())
+
+    def test_missing_destination_is_an_error(self) -> None:
+        result, events = self._run(["--json", "--dest", "missing"])
+
+        self.assertEqual(result, 1)
+        self.assertEqual(events, [])
+
+
+def expire_after(checks: int):
+    """A Deadline.scan_expired replacement that runs out after ``checks`` calls."""
+    calls = [0]
+
+    def expired(deadline):
+        calls[0] += 1
+        if calls[0] <= checks:
+            return False
+        deadline.hit = True
+        return True
+
+    return expired
+
+
+class DeadlineTests(ProjectExportTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        for slug in ("one", "two"):
+            (self.plans_dir / f"{slug}.md").write_text(f"plan {slug}", "utf-8")
+        (self.transcript_dir / "a.jsonl").write_text(
+            json.dumps({"slug": "one"}) + "\n", encoding="utf-8"
+        )
+        (self.transcript_dir / "b.jsonl").write_text(
+            json.dumps({"slug": "two"}) + "\n", encoding="utf-8"
+        )
+        self.checkpoints = self.home_dir / ".claude" / "plan-export" / "checkpoints"
+
+    def test_deadline_copies_what_was_found_and_defers_the_rest(self) -> None:
+        with mock.patch.object(
+            export_project_plans.os, "scandir", side_effect=sorted_scandir
+        ):
+            with mock.patch.object(
+                export_checkpoint.Deadline,
+                "scan_expired",
+                autospec=True,
+                side_effect=expire_after(1),
+            ):
+                result, events = self._run(["--json", "--deadline", "5"])
+
+        self.assertEqual(result, 0)
+        self.assertEqual([e["event"] for e in events], ["copied", "summary"])
+        self.assertTrue(events[-1]["deferred"])
+        [checkpoint] = self.checkpoints.iterdir()
+        record = json.loads(checkpoint.read_text(encoding="utf-8"))
+        self.assertTrue(record["deferred"])
+        self.assertEqual(list(record["scanned"]), ["a.jsonl"])
+
+        # The next export picks the deferred work up without --resume; with
+        # two plans found, both now go to plans/.
+        stderr = io.StringIO()
+        with mock.patch("sys.stderr", stderr):
+            result, events = self._run(["--json"])
+        self.assertEqual(result, 0)
+        self.assertEqual([e["event"] for e in events], ["copied", "copied", "summary"])
+        self.assertIn("Resuming deferred export", stderr.getvalue())
+        self.assertEqual(list(self.checkpoints.iterdir()), [])
+        self.assertTrue((self.project_dir / "plans" / "plan-two.md").exists())
+
+    def test_interrupted_checkpoint_still_needs_resume(self) -> None:
+        with mock.patch("pathlib.Path.home", return_value=self.home_dir):
+            checkpoint = export_checkpoint.ExportCheckpoint.for_export(
+                "export_project_plans", self.transcript_dir, self.project_dir
+            )
+            checkpoint.mark_scanned("a.jsonl", 100)
+            checkpoint.flush()
+
+        result, events = self._run(["--json"])
+
+        self.assertEqual(result, 0)
+        self.assertEqual([e["event"] for e in events], ["copied", "copied", "summary"])
+
+    def test_deadline_from_environment(self) -> None:
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_DEADLINE": "2.5"}):
+            self.assertEqual(export_checkpoint.Deadline.resolve(None).budget, 2.5)
+            self.assertEqual(export_checkpoint.Deadline.resolve(1).budget, 1)
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_DEADLINE": "soon"}):
+            self.assertIsNone(export_checkpoint.Deadline.resolve(None).budget)
+        self.assertFalse(export_checkpoint.Deadline().expired())
+        deadline = export_checkpoint.Deadline(0.001)
+        with mock.patch("time.monotonic", return_value=deadline.at):
+            self.assertTrue(deadline.expired())
+        self.assertTrue(deadline.hit)
+
+
+def sorted_scandir(path):
+    """os.scandir with entries in name order, for a predictable scan order."""
+    with _real_scandir(path) as entries:
+        items = sorted(entries, key=lambda entry: entry.name)
+    return contextlib.nullcontext(iter(items))
+
+
+_real_scandir = os.scandir
+
+
 if __name__ == "__main__":
     import unittest
 
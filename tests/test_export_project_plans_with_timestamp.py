@@ -72,6 +72,40 @@ class ExportWithTimestampMainTests(TempDirTestCase):
         self.assertFalse((project_dir / "plans").exists())
         self.assertEqual(exported.read_text(encoding="utf-8"), "plan one")
 
+    def test_reconcile_replaces_the_export_of_an_edited_plan(self) -> None:
+        project_dir = self.tmpdir / "project"
+        project_dir.mkdir()
+        home_dir = self.tmpdir / "home"
+        plans_dir = home_dir / ".claude" / "plans"
+        plans_dir.mkdir(parents=True)
+        transcript_dir = self.tmpdir / "transcripts"
+        transcript_dir.mkdir()
+        (transcript_dir / "a.jsonl").write_text(
+            json.dumps({"slug": "one"}), encoding="utf-8"
+        )
+        plan_file = plans_dir / "one.md"
+        plan_file.write_text("plan one", encoding="utf-8")
+        (project_dir / "plan-one.md").write_text("plain export", encoding="utf-8")
+
+        with mock.patch.dict(
+            os.environ, {"TRANSCRIPT_DIR": str(transcript_dir)}, clear=True
+        ):
+            with mock.patch("pathlib.Path.home", return_value=home_dir):
+                with mock.patch("pathlib.Path.cwd", return_value=project_dir):
+                    with mock.patch("sys.stdout"):
+                        for ts in (1735689600, 1738368000):
+                            os.utime(plan_file, (ts, ts))
+                            result = export_project_plans_with_timestamp.main(
+                                ["--reconcile"]
+                            )
+                            self.assertEqual(result, 0)
+
+        stamp = datetime.fromtimestamp(1738368000).strftime("%Y%m%d-%H%M%S")
+        self.assertEqual(
+            sorted(p.name for p in project_dir.iterdir()),
+            [f"{stamp}-plan-one.md", "plan-one.md"],
+        )
+
     def test_multiple_files_export_to_plans_folder(self) -> None:
         """When 2+ plan files exist, they should go to plans/ folder."""
         project_dir = self.tmpdir / "project"
@@ -0,0 +1,49 @@
+"""Tests for scripts/export_spool.py."""
+
+import os
+from unittest import mock
+
+from scripts import export_spool
+
+from . import TempDirTestCase
+
+
+class ExportSpoolTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch.dict(
+            os.environ, {"PLAN_EXPORT_STATE_DIR": str(self.tmpdir / "state")}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.spool = export_spool.ExportSpool()
+
+    def test_jobs_stay_queued_until_done(self) -> None:
+        self.spool.submit("/t/a.jsonl", [self.tmpdir])
+        self.spool.submit("/t/b.jsonl", [self.tmpdir])
+        (self.spool.root / "corrupt.json").write_text("{", encoding="utf-8")
+
+        jobs = self.spool.take()
+
+        self.assertEqual(
+            [record["transcript_path"] for _, record in jobs],
+            ["/t/a.jsonl", "/t/b.jsonl"],
+        )
+        self.assertEqual(jobs[0][1]["dest_dirs"], [str(self.tmpdir)])
+        self.assertEqual(len(self.spool.queued()), 2)
+        self.spool.done([jobs[0][0]])
+        self.assertEqual(self.spool.queued(), [jobs[1][0]])
+
+    def test_only_one_leader_at_a_time(self) -> None:
+        with self.spool.lead() as leader:
+            self.assertTrue(leader)
+            with export_spool.ExportSpool().lead() as other:
+                self.assertFalse(other)
+        with export_spool.ExportSpool().lead() as leader:
+            self.assertTrue(leader)
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Tests for scripts/io_policy.py."""
+
+import json
+import os
+from unittest import mock
+
+from scripts import io_policy, transcript_scan
+
+from . import TempDirTestCase
+
+MiB = 1 << 20
+
+
+class SequentialReadTests(TempDirTestCase):
+    def _advice(self, policy: str, steps: list[int], offset: int = 0) -> list:
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_IO_POLICY": policy}):
+            with mock.patch("os.posix_fadvise", create=True) as fadvise:
+                reader = io_policy.SequentialRead(3, offset)
+                for position in steps:
+                    reader.consumed(position)
+                reader.finish(steps[-1])
+        return [call.args[1:] for call in fadvise.call_args_list]
+
+    def test_consumed_ranges_are_dropped_from_folio_boundaries(self) -> None:
+        advice = self._advice("drop", [5 * MiB, 9 * MiB, 12 * MiB, 19 * MiB], MiB)
+
+        drops = [
+            (start, length)
+            for start, length, kind in advice
+            if kind == os.POSIX_FADV_DONTNEED
+        ]
+        self.assertEqual(drops, [(MiB, 8 * MiB), (8 * MiB, 11 * MiB), (18 * MiB, MiB)])
+        self.assertEqual(advice[0], (MiB, 0, os.POSIX_FADV_SEQUENTIAL))
+
+    def test_keep_only_reads_ahead(self) -> None:
+        advice = self._advice("keep", [9 * MiB, 19 * MiB])
+
+        self.assertEqual(
+            [kind for _, _, kind in advice],
+            [os.POSIX_FADV_SEQUENTIAL] + [os.POSIX_FADV_WILLNEED] * 3,
+        )
+
+    def test_off_gives_no_advice(self) -> None:
+        self.assertEqual(self._advice("off", [9 * MiB, 19 * MiB]), [])
+
+    def test_scan_drops_the_whole_transcript(self) -> None:
+        transcript = self.tmpdir / "t.jsonl"
+        transcript.write_text(json.dumps({"slug": "a"}) + "\n", encoding="utf-8")
+        size = transcript.stat().st_size
+
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_IO_POLICY": "drop"}):
+            with mock.patch("os.posix_fadvise", create=True) as fadvise:
+                transcript_scan.scan_transcript(transcript, lambda slug: None)
+
+        self.assertIn(
+            (0, size, os.POSIX_FADV_DONTNEED),
+            [call.args[1:] for call in fadvise.call_args_list],
+        )
+
+    def test_idle_io_needs_to_be_asked_for(self) -> None:
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_IO_IDLE": "0"}):
+            with mock.patch("ctypes.CDLL") as cdll:
+                self.assertFalse(io_policy.use_idle_io())
+        cdll.assert_not_called()
+
+    def test_idle_io_is_linux_only(self) -> None:
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_IO_IDLE": "1"}):
+            with mock.patch("sys.platform", "darwin"):
+                with mock.patch("platform.machine", return_value="arm64"):
+                    with mock.patch("ctypes.CDLL") as cdll:
+                        self.assertFalse(io_policy.use_idle_io())
+        cdll.assert_not_called()
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
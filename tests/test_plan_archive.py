@@ -0,0 +1,86 @@
+"""Tests for scripts/plan_archive.py."""
+
+import io
+import os
+import tarfile
+import time
+import zipfile
+from unittest import mock
+
+from scripts import plan_archive
+
+from . import TempDirTestCase
+
+
+class PlanArchiveTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.plans = []
+        for i, slug in enumerate(("one", "two")):
+            source = self.tmpdir / f"{slug}.md"
+            source.write_text(f"plan {slug}\n" * 1000, encoding="utf-8")
+            mtime = 1735689600 + 2 * i  # zip stores even seconds
+            os.utime(source, (mtime, mtime))
+            self.plans.append((source, source.stat(), f"plan-{slug}.md"))
+
+    def _write(self, target: str) -> None:
+        with plan_archive.PlanArchive(target) as archive:
+            for source, st, name in self.plans:
+                archive.add(source, st, name)
+
+    def test_tar_gz_keeps_contents_and_mtimes(self) -> None:
+        target = self.tmpdir / "plans.tar.gz"
+        self._write(str(target))
+
+        with tarfile.open(target, "r:gz") as tar:
+            members = tar.getmembers()
+            self.assertEqual([m.name for m in members], ["plan-one.md", "plan-two.md"])
+            self.assertEqual([m.mtime for m in members], [1735689600, 1735689602])
+            data = tar.extractfile(members[1])
+            assert data is not None
+            self.assertEqual(data.read(), (self.tmpdir / "two.md").read_bytes())
+
+    def test_zip_keeps_contents_and_mtimes(self) -> None:
+        target = self.tmpdir / "plans.zip"
+        self._write(str(target))
+
+        with zipfile.ZipFile(target) as zf:
+            self.assertEqual(zf.namelist(), ["plan-one.md", "plan-two.md"])
+            self.assertEqual(
+                zf.read("plan-one.md"), (self.tmpdir / "one.md").read_bytes()
+            )
+            info = zf.getinfo("plan-two.md")
+            self.assertEqual(info.date_time, time.localtime(1735689602)[:6])
+
+    def test_stdout_streams_tar_gz(self) -> None:
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with mock.patch("sys.stdout", stdout):
+            self._write("-")
+
+        stdout.buffer.seek(0)
+        with tarfile.open(fileobj=stdout.buffer, mode="r|gz") as tar:
+            self.assertEqual([m.name for m in tar], ["plan-one.md", "plan-two.md"])
+
+    def test_failure_leaves_no_partial_archive(self) -> None:
+        target = self.tmpdir / "out" / "plans.tar"
+        target.parent.mkdir()
+
+        with self.assertRaises(FileNotFoundError):
+            with plan_archive.PlanArchive(str(target)) as archive:
+                source, st, name = self.plans[0]
+                archive.add(source, st, name)
+                archive.add(self.tmpdir / "missing.md", st, "missing.md")
+
+        self.assertEqual(list(target.parent.iterdir()), [])
+
+    def test_unsupported_extension(self) -> None:
+        self.assertIsNone(plan_archive.archive_format("plans.rar"))
+        self.assertEqual(plan_archive.archive_format("Plans.TGZ"), "tar.gz")
+        with self.assertRaises(ValueError):
+            plan_archive.PlanArchive("plans.rar")
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
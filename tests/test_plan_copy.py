@@ -0,0 +1,137 @@
+"""Tests for scripts/plan_copy.py."""
+
+import errno
+import os
+import shutil
+import threading
+import time
+from unittest import mock
+
+from scripts import plan_copy
+
+from . import TempDirTestCase
+
+
+class SingleDestinationTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch("pathlib.Path.home", return_value=self.tmpdir / "home")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.source = self.tmpdir / "source.md"
+        self.source.write_text("plan", encoding="utf-8")
+        self.dest = self.tmpdir / "plan-source.md"
+
+    def _copy(self) -> list[str]:
+        return plan_copy.copy_plan_to_all(self.source, [self.dest])
+
+    def test_copies_missing_destination(self) -> None:
+        self.assertEqual(self._copy(), ["copied"])
+        self.assertEqual(self.dest.read_text(encoding="utf-8"), "plan")
+
+    def test_up_to_date_destination_is_not_copied_again(self) -> None:
+        self._copy()
+
+        with mock.patch("shutil.copy2") as copy2:
+            self.assertEqual(self._copy(), ["up-to-date"])
+
+        copy2.assert_not_called()
+
+    def test_changed_source_is_copied_again(self) -> None:
+        self._copy()
+        self.source.write_text("revised plan", encoding="utf-8")
+        os.utime(self.source, ns=(0, self.source.stat().st_mtime_ns + 1))
+
+        self.assertEqual(self._copy(), ["copied"])
+        self.assertEqual(self.dest.read_text(encoding="utf-8"), "revised plan")
+
+    def test_missing_source_raises(self) -> None:
+        with self.assertRaises(FileNotFoundError):
+            plan_copy.copy_plan_to_all(self.tmpdir / "missing.md", [self.dest])
+
+    def test_concurrent_exporters_copy_once(self) -> None:
+        copies = []
+        original_copy2 = shutil.copy2
+
+        def slow_copy2(src, dst):
+            copies.append(dst)
+            time.sleep(0.02)
+            return original_copy2(src, dst)
+
+        barrier = threading.Barrier(4)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.extend(self._copy())
+
+        with mock.patch("shutil.copy2", side_effect=slow_copy2):
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(len(copies), 1)
+        self.assertEqual(
+            sorted(results), ["copied", "up-to-date", "up-to-date", "up-to-date"]
+        )
+        self.assertEqual(self.dest.read_text(encoding="utf-8"), "plan")
+
+
+class CopyPlanToAllTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch("pathlib.Path.home", return_value=self.tmpdir / "home")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.source = self.tmpdir / "source.md"
+        self.source.write_text("plan", encoding="utf-8")
+        self.dests = []
+        for name in ("main", "feature", "fix"):
+            (self.tmpdir / name).mkdir()
+            self.dests.append(self.tmpdir / name / "plan-source.md")
+
+    def test_source_is_read_once(self) -> None:
+        with mock.patch("shutil.copy2", wraps=shutil.copy2) as copy2:
+            results = plan_copy.copy_plan_to_all(self.source, self.dests)
+
+        sources = [call.args[0] for call in copy2.call_args_list]
+        self.assertEqual(sources.count(self.source), 1)
+        self.assertEqual(results[0], "copied")
+        self.assertIn(results[1], ("reflinked", "copied"))
+        for dest in self.dests:
+            self.assertEqual(dest.read_text(encoding="utf-8"), "plan")
+            self.assertEqual(dest.stat().st_mtime_ns, self.source.stat().st_mtime_ns)
+
+    def test_hardlinks_share_the_first_copy(self) -> None:
+        results = plan_copy.copy_plan_to_all(self.source, self.dests, link="hardlink")
+
+        self.assertEqual(results, ["copied", "linked", "linked"])
+        self.assertEqual(
+            {dest.stat().st_ino for dest in self.dests}, {self.dests[0].stat().st_ino}
+        )
+        self.assertNotEqual(self.dests[0].stat().st_ino, self.source.stat().st_ino)
+
+    def test_unsupported_reflink_falls_back_to_copying(self) -> None:
+        with mock.patch(
+            "fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "not supported")
+        ):
+            results = plan_copy.copy_plan_to_all(self.source, self.dests[:2])
+
+        self.assertEqual(results, ["copied", "copied"])
+        self.assertEqual(self.dests[1].read_text(encoding="utf-8"), "plan")
+        self.assertEqual(sorted(os.listdir(self.dests[1].parent)), ["plan-source.md"])
+
+    def test_up_to_date_destinations_are_left_alone(self) -> None:
+        shutil.copy2(self.source, self.dests[1])
+
+        results = plan_copy.copy_plan_to_all(self.source, self.dests, link="copy")
+
+        self.assertEqual(results, ["copied", "up-to-date", "copied"])
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests for scripts/plan_destinations.py."""
+
+import os
+import subprocess
+from pathlib import Path
+from unittest import mock
+
+from scripts import plan_destinations
+
+from . import TempDirTestCase
+
+PORCELAIN = """worktree /repo/.bare
+bare
+
+worktree /repo/main
+HEAD 0123456789abcdef0123456789abcdef01234567
+branch refs/heads/main
+
+worktree /repo/feature
+HEAD 89abcdef0123456789abcdef0123456789abcdef
+detached
+"""
+
+
+class ProjectRootsTests(TempDirTestCase):
+    def _git(self, stdout: str, returncode: int = 0):
+        return mock.patch(
+            "subprocess.run",
+            return_value=subprocess.CompletedProcess([], returncode, stdout, ""),
+        )
+
+    def test_worktrees_are_parsed_without_bare_entries(self) -> None:
+        with self._git(PORCELAIN), mock.patch.object(Path, "is_dir", return_value=True):
+            worktrees = plan_destinations.git_worktrees(self.tmpdir)
+
+        self.assertEqual(worktrees, [Path("/repo/main"), Path("/repo/feature")])
+
+    def test_deleted_worktrees_are_skipped(self) -> None:
+        (self.tmpdir / "main").mkdir()
+        porcelain = (
+            f"worktree {self.tmpdir / 'main'}\n\n"
+            f"worktree {self.tmpdir / 'gone'}\nprunable gitdir file points to "
+            "non-existent location\n\n"
+            f"worktree {self.tmpdir / 'unregistered'}\ndetached\n"
+        )
+        with self._git(porcelain), mock.patch("sys.stderr"):
+            worktrees = plan_destinations.git_worktrees(self.tmpdir)
+
+        self.assertEqual(worktrees, [self.tmpdir / "main"])
+
+    def test_roots_start_with_cwd_and_are_unique(self) -> None:
+        (self.tmpdir / "other").mkdir()
+        (self.tmpdir / "feature").mkdir()
+        porcelain = f"worktree {self.tmpdir}\n\nworktree {self.tmpdir / 'feature'}\n"
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_WORKTREES": "1"}):
+            with self._git(porcelain):
+                roots = plan_destinations.project_roots(
+                    self.tmpdir, ["other", str(self.tmpdir / "other")]
+                )
+
+        self.assertEqual(
+            roots, [self.tmpdir, self.tmpdir / "other", self.tmpdir / "feature"]
+        )
+
+    def test_outside_a_repository_there_are_no_worktrees(self) -> None:
+        with self._git("", returncode=128):
+            roots = plan_destinations.project_roots(self.tmpdir, worktrees=True)
+
+        self.assertEqual(roots, [self.tmpdir])
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
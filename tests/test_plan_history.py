@@ -0,0 +1,187 @@
+"""Tests for scripts/plan_history.py."""
+
+import io
+import json
+import os
+import random
+from pathlib import Path
+from unittest import mock
+
+from scripts import export_plan, plan_history
+
+from . import TempDirTestCase
+
+
+def revision_text(n: int) -> str:
+    rng = random.Random(n)
+    lines = [f"step {i}\n" for i in range(20)]
+    for _ in range(n):
+        i = rng.randrange(len(lines))
+        if rng.random() < 0.5:
+            lines[i] = f"revised step {i} in {n}\n"
+        else:
+            lines.insert(i, f"new step in {n}\n")
+    return "# Plan\n" + "".join(lines)
+
+
+class PlanHistoryTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch.dict(
+            os.environ, {"PLAN_EXPORT_STATE_DIR": str(self.tmpdir / "state")}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_delta_turns_new_back_into_old(self) -> None:
+        for n in range(1, 10):
+            old = revision_text(n - 1).splitlines(keepends=True)
+            new = revision_text(n).splitlines(keepends=True)
+            delta = plan_history.make_delta(new, old)
+            self.assertEqual(plan_history.apply_delta(new, delta), old)
+
+    def test_every_revision_is_rebuilt_across_snapshots(self) -> None:
+        with mock.patch.object(plan_history, "SNAPSHOT_INTERVAL", 4):
+            history = plan_history.PlanHistory("slug")
+            for n in range(10):
+                self.assertEqual(history.add(revision_text(n), n), n + 1)
+            history.save()
+
+        history = plan_history.PlanHistory("slug")
+        self.assertEqual(history.numbers(), list(range(1, 11)))
+        self.assertIn("text", history.revisions[3])
+        self.assertNotIn("text", history.revisions[4])
+        for n in range(10):
+            self.assertEqual(history.text(n + 1), revision_text(n))
+        self.assertEqual(history.text(), revision_text(9))
+
+    def test_unchanged_text_is_not_a_new_revision(self) -> None:
+        history = plan_history.PlanHistory("slug")
+        history.add("plan\n", 1)
+        self.assertIsNone(history.add("plan\n", 2))
+        self.assertEqual(history.numbers(), [1])
+
+    def test_only_the_newest_revisions_are_kept(self) -> None:
+        with mock.patch.object(plan_history, "HISTORY_LIMIT", 3):
+            history = plan_history.PlanHistory("slug")
+            for n in range(5):
+                history.add(revision_text(n), n)
+
+        self.assertEqual(history.numbers(), [3, 4, 5])
+        self.assertEqual(history.text(3), revision_text(2))
+
+    def test_recording_is_on_unless_turned_off(self) -> None:
+        with mock.patch.dict(os.environ, {"PLAN_EXPORT_HISTORY": "0"}):
+            plan_history.record_revision("slug", b"plan\n", 1)
+        self.assertEqual(plan_history.PlanHistory("slug").revisions, [])
+
+        plan_history.record_revision("slug", b"plan\n", 1)
+        self.assertEqual(plan_history.PlanHistory("slug").numbers(), [1])
+
+    def test_recording_only_appends_to_the_journal(self) -> None:
+        for n in range(3):
+            with mock.patch.object(plan_history, "make_delta") as make_delta:
+                plan_history.record_revision("slug", revision_text(n).encode(), n)
+            make_delta.assert_not_called()
+        # A revision recorded again, as when a plan is touched, and a torn line.
+        plan_history.record_revision("slug", revision_text(2).encode(), 3)
+        with open(plan_history.journal_path("slug"), "a", encoding="utf-8") as f:
+            f.write('{"slug": "slug", "te')
+
+        self.assertFalse(plan_history.history_path("slug").exists())
+        history = plan_history.PlanHistory("slug")
+        self.assertEqual(history.numbers(), [1, 2, 3])
+        self.assertEqual(history.text(1), revision_text(0))
+
+    def test_compacting_folds_the_journal_into_the_history(self) -> None:
+        plan_history.record_revision("slug", revision_text(0).encode(), 0)
+        plan_history.compact("slug")
+        plan_history.record_revision("slug", revision_text(1).encode(), 1)
+        plan_history.compact("slug")
+
+        self.assertFalse(plan_history.journal_path("slug").exists())
+        history = plan_history.PlanHistory("slug")
+        self.assertEqual(history.journaled, [])
+        self.assertEqual(history.numbers(), [1, 2])
+        self.assertEqual(history.text(1), revision_text(0))
+
+    def test_journal_is_compacted_once_it_grows_past_its_limit(self) -> None:
+        with mock.patch.object(plan_history, "JOURNAL_LIMIT", 500):
+            for n in range(10):
+                plan_history.record_revision("slug", revision_text(n).encode(), n)
+
+        journal = plan_history.journal_path("slug")
+        self.assertLessEqual(journal.stat().st_size if journal.exists() else 0, 500)
+        history = plan_history.PlanHistory("slug")
+        self.assertEqual(history.numbers(), list(range(1, 11)))
+        self.assertEqual(history.text(4), revision_text(3))
+
+
+class HistoryCommandTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.home_dir = self.tmpdir / "home"
+        self.plans_dir = self.home_dir / ".claude" / "plans"
+        self.plans_dir.mkdir(parents=True)
+        self.project_dir = self.tmpdir / "project"
+        self.project_dir.mkdir()
+        self.transcript = self.tmpdir / "t.jsonl"
+        self.transcript.write_text(json.dumps({"slug": "abc"}) + "\n", "utf-8")
+        for patcher in (
+            mock.patch("pathlib.Path.home", return_value=self.home_dir),
+            mock.patch("pathlib.Path.cwd", return_value=self.project_dir),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _export(self, text: str, mtime: int) -> None:
+        plan = self.plans_dir / "abc.md"
+        plan.write_text(text, encoding="utf-8")
+        os.utime(plan, (mtime, mtime))
+        stdin = io.StringIO(json.dumps({"transcript_path": str(self.transcript)}))
+        with mock.patch("sys.stdin", stdin):
+            self.assertEqual(export_plan.main([]), 0)
+
+    def _history(self, argv: list[str]) -> tuple[int, str]:
+        stdout = io.StringIO()
+        with mock.patch("sys.stdout", stdout):
+            result = plan_history.main(argv)
+        return result, stdout.getvalue()
+
+    def test_exports_are_recorded_and_diffed(self) -> None:
+        self._export("# Plan\nfirst\n", 1_000_000)
+        self._export("# Plan\nfirst\n", 1_000_000)
+        self._export("# Plan\nsecond\n", 2_000_000)
+
+        self.assertEqual(plan_history.PlanHistory("abc").numbers(), [1, 2])
+        self.assertEqual(self._history([]), (0, "abc  2 revision(s)\n"))
+        self.assertEqual(self._history(["show", "abc", "1"]), (0, "# Plan\nfirst\n"))
+
+        result, diff = self._history(["diff", "abc"])
+        self.assertEqual(result, 0)
+        self.assertIn("-first\n+second\n", diff)
+        self.assertIn("plan-abc.md@1", diff)
+
+    def test_history_and_index_share_one_read_of_the_plan(self) -> None:
+        with mock.patch.object(
+            Path, "read_bytes", autospec=True, side_effect=Path.read_bytes
+        ) as read_bytes:
+            self._export("# Plan\nfirst\n", 1_000_000)
+
+        plan = self.plans_dir / "abc.md"
+        self.assertEqual([c.args[0] for c in read_bytes.call_args_list], [plan])
+        self.assertEqual(plan_history.PlanHistory("abc").numbers(), [1])
+
+    def test_unknown_revision_fails(self) -> None:
+        self._export("# Plan\n", 1_000_000)
+
+        with mock.patch("sys.stderr", io.StringIO()):
+            self.assertEqual(self._history(["show", "abc", "7"])[0], 1)
+            self.assertEqual(self._history(["diff", "abc"])[0], 1)
+            self.assertEqual(self._history(["log", "missing"])[0], 1)
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
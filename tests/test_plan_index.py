@@ -0,0 +1,174 @@
+"""Tests for scripts/plan_index.py."""
+
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+from scripts import export_project_plans, plan_index
+
+from . import TempDirTestCase
+
+PLANS = {
+    "auth-refactor": "# Refactor the auth module\nMove token checks into auth.\n",
+    "cache-layer": "# Add a cache layer\nThe auth module calls it too.\n",
+    "docs": "# Rewrite the docs\nNothing about security here.\n",
+}
+
+
+class IndexBackendTests(TempDirTestCase):
+    """Behaviour shared by both index backends."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        if type(self) is IndexBackendTests:
+            self.skipTest("run through the backend subclasses")
+        # JsonPlanIndex.close() locks under the state directory.
+        patcher = mock.patch.dict(
+            os.environ, {"PLAN_EXPORT_STATE_DIR": str(self.tmpdir / "state")}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _open(self) -> plan_index.PlanIndex:
+        raise NotImplementedError
+
+    def _filled(self) -> plan_index.PlanIndex:
+        index = self._open()
+        for n, (slug, text) in enumerate(PLANS.items()):
+            index.update(slug, text, n, [f"/projects/{slug}"])
+        return index
+
+    def test_hits_are_ranked_and_need_every_word(self) -> None:
+        index = self._filled()
+        hits = index.search("Auth module", 10)
+        index.close()
+
+        self.assertEqual(
+            [slug for slug, _, _ in hits], ["auth-refactor", "cache-layer"]
+        )
+        self.assertGreater(hits[0][1], hits[1][1])
+        self.assertGreater(hits[1][1], 0)
+        self.assertEqual(hits[0][2], ["/projects/auth-refactor"])
+
+    def test_unknown_words_match_nothing(self) -> None:
+        index = self._filled()
+        self.assertEqual(index.search("auth kubernetes", 10), [])
+        self.assertEqual(index.search("!!", 10), [])
+        index.close()
+
+    def test_changed_plan_is_reindexed(self) -> None:
+        index = self._filled()
+        index.close()
+
+        index = self._open()
+        self.assertFalse(index.update("docs", PLANS["docs"], 2, ["/projects/other"]))
+        self.assertTrue(index.update("docs", "# Docs\nNow about auth.\n", 3, []))
+        index.close()
+
+        index = self._open()
+        self.assertEqual(index.search("security", 10), [])
+        [docs] = [hit for hit in index.search("auth", 10) if hit[0] == "docs"]
+        self.assertEqual(docs[2], ["/projects/docs", "/projects/other"])
+        index.close()
+
+
+class SqlitePlanIndexTests(IndexBackendTests):
+    def setUp(self) -> None:
+        super().setUp()
+        if not plan_index.fts5_available():
+            self.skipTest("SQLite without FTS5")
+
+    def _open(self) -> plan_index.PlanIndex:
+        return plan_index.SqlitePlanIndex(self.tmpdir / "index.sqlite3")
+
+
+class JsonPlanIndexTests(IndexBackendTests):
+    def _open(self) -> plan_index.PlanIndex:
+        return plan_index.JsonPlanIndex(self.tmpdir / "index.json")
+
+    def test_concurrent_writers_keep_each_others_updates(self) -> None:
+        first = self._open()
+        second = self._open()
+        first.update("auth-refactor", PLANS["auth-refactor"], 1, [])
+        second.update("cache-layer", PLANS["cache-layer"], 1, [])
+        first.close()
+        second.close()
+
+        index = self._open()
+        self.assertEqual(len(index.search("auth", 10)), 2)
+
+    def test_index_file_missing_its_tables_is_treated_as_empty(self) -> None:
+        (self.tmpdir / "index.json").write_text('{"version": 1}', encoding="utf-8")
+
+        index = self._open()
+        self.assertEqual(index.search("auth", 10), [])
+        index.update("auth-refactor", PLANS["auth-refactor"], 1, [])
+        index.close()
+
+        self.assertEqual(len(self._open().search("auth", 10)), 1)
+
+
+class SearchCommandTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.home_dir = self.tmpdir / "home"
+        plans_dir = self.home_dir / ".claude" / "plans"
+        plans_dir.mkdir(parents=True)
+        for slug, text in PLANS.items():
+            (plans_dir / f"{slug}.md").write_text(text, encoding="utf-8")
+        self.transcript_dir = self.tmpdir / "transcripts"
+        self.transcript_dir.mkdir()
+        (self.transcript_dir / "a.jsonl").write_text(
+            "".join(json.dumps({"slug": slug}) + "\n" for slug in PLANS),
+            encoding="utf-8",
+        )
+        self.project_dir = self.tmpdir / "project"
+        self.project_dir.mkdir()
+        for patcher in (
+            mock.patch("pathlib.Path.home", return_value=self.home_dir),
+            mock.patch("pathlib.Path.cwd", return_value=self.project_dir),
+            mock.patch.dict(os.environ, {"TRANSCRIPT_DIR": str(self.transcript_dir)}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _main(self, argv: list[str]) -> list[dict]:
+        stdout = io.StringIO()
+        with mock.patch("sys.stdout", stdout):
+            self.assertEqual(plan_index.main(argv), 0)
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_exported_plans_are_searchable(self) -> None:
+        with mock.patch("sys.stdout", io.StringIO()):
+            self.assertEqual(export_project_plans.main([]), 0)
+
+        hits = self._main(["search", "--json", "auth", "module"])
+
+        self.assertEqual(
+            [hit["slug"] for hit in hits], ["auth-refactor", "cache-layer"]
+        )
+        self.assertEqual(hits[0]["dests"], [str(self.project_dir / "plans")])
+
+    def test_exports_that_copy_nothing_new_do_not_open_the_index(self) -> None:
+        with mock.patch("sys.stdout", io.StringIO()):
+            self.assertEqual(export_project_plans.main([]), 0)
+            with mock.patch.object(plan_index, "_open") as open_index:
+                self.assertEqual(export_project_plans.main([]), 0)
+
+        open_index.assert_not_called()
+
+    def test_rebuild_indexes_plans_that_were_never_exported(self) -> None:
+        with mock.patch.object(plan_index, "fts5_available", return_value=False):
+            with mock.patch("sys.stdout", io.StringIO()):
+                self.assertEqual(plan_index.main(["rebuild"]), 0)
+            hits = self._main(["search", "--json", "security"])
+
+        self.assertEqual(
+            hits, [{"slug": "docs", "score": hits[0]["score"], "dests": []}]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
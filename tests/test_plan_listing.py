@@ -0,0 +1,59 @@
+"""Tests for scripts/plan_listing.py."""
+
+import os
+from unittest import mock
+
+from scripts import plan_listing
+
+from . import TempDirTestCase
+
+
+class PlanListingTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.plans_dir = self.tmpdir / "plans"
+        self.plans_dir.mkdir()
+        (self.plans_dir / "a.md").write_text("a", encoding="utf-8")
+        patcher = mock.patch.dict(
+            os.environ, {"PLAN_EXPORT_STATE_DIR": str(self.tmpdir / "state")}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _age_directory(self) -> None:
+        old = 1_700_000_000
+        os.utime(self.plans_dir, (old, old))
+
+    def test_fresh_listing_is_served_from_cache(self) -> None:
+        self._age_directory()
+        self.assertEqual(
+            plan_listing.list_plan_names(self.plans_dir, save=True), {"a.md"}
+        )
+
+        with mock.patch("os.listdir") as listdir:
+            names = plan_listing.list_plan_names(self.plans_dir)
+
+        listdir.assert_not_called()
+        self.assertEqual(names, {"a.md"})
+
+    def test_changed_directory_is_listed_again(self) -> None:
+        self._age_directory()
+        plan_listing.list_plan_names(self.plans_dir, save=True)
+
+        (self.plans_dir / "b.md").write_text("b", encoding="utf-8")
+
+        self.assertEqual(plan_listing.list_plan_names(self.plans_dir), {"a.md", "b.md"})
+
+    def test_recently_changed_directory_is_not_cached(self) -> None:
+        plan_listing.list_plan_names(self.plans_dir, save=True)
+
+        self.assertFalse((self.tmpdir / "state" / "plan-listing").exists())
+
+    def test_missing_directory_has_no_names(self) -> None:
+        self.assertEqual(plan_listing.list_plan_names(self.tmpdir / "none"), set())
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
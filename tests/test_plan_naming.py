@@ -0,0 +1,106 @@
+"""Tests for scripts/plan_naming.py."""
+
+import os
+from datetime import datetime
+from unittest import mock
+
+from scripts import plan_naming
+
+from . import TempDirTestCase
+
+
+class TimestampFormatterTests(TempDirTestCase):
+    def _stat(self, name: str, mtime: float) -> os.stat_result:
+        path = self.tmpdir / name
+        path.write_text(name, encoding="utf-8")
+        os.utime(path, (mtime, mtime))
+        return path.stat()
+
+    def test_matches_datetime_formatting(self) -> None:
+        st = self._stat("a.md", 1735689600.75)
+
+        stamp = plan_naming.TimestampFormatter()(st)
+
+        expected = datetime.fromtimestamp(1735689600).strftime("%Y%m%d-%H%M%S")
+        self.assertEqual(stamp, expected)
+
+    def test_formats_each_second_once(self) -> None:
+        stats = [
+            self._stat("a.md", 1735689600.1),
+            self._stat("b.md", 1735689600.9),
+            self._stat("c.md", 1735689601.0),
+        ]
+        formatter = plan_naming.TimestampFormatter()
+
+        with mock.patch("time.strftime", wraps=plan_naming.time.strftime) as fmt:
+            stamps = [formatter(st) for st in stats]
+
+        self.assertEqual(fmt.call_count, 2)
+        self.assertEqual(stamps[0], stamps[1])
+        self.assertNotEqual(stamps[1], stamps[2])
+
+
+class NamingTests(TempDirTestCase):
+    def test_timestamped_names_keep_input_order(self) -> None:
+        path = self.tmpdir / "plan.md"
+        path.write_text("x", encoding="utf-8")
+        os.utime(path, (1735689600, 1735689600))
+        st = path.stat()
+        stamp = datetime.fromtimestamp(1735689600).strftime("%Y%m%d-%H%M%S")
+
+        names = plan_naming.timestamped_names([("b", st), ("a", st)])
+
+        self.assertEqual(names, [f"{stamp}-plan-b.md", f"{stamp}-plan-a.md"])
+
+    def test_names_differing_in_case_are_kept_where_case_matters(self) -> None:
+        st = self.tmpdir.stat()
+        plans = [("Auth", st), ("auth", st)]
+
+        self.assertEqual(
+            plan_naming.plain_names(plans), ["plan-Auth.md", "plan-auth.md"]
+        )
+        self.assertEqual(
+            plan_naming.plain_names(plans, case_insensitive=True),
+            ["plan-Auth.md", "plan-auth-2.md"],
+        )
+
+    def test_case_insensitive_probe_matches_the_file_system(self) -> None:
+        (self.tmpdir / "probe").write_text("x", encoding="utf-8")
+        expected = (self.tmpdir / "PROBE").exists()
+
+        self.assertEqual(plan_naming.case_insensitive(self.tmpdir), expected)
+        # A destination that does not exist yet is probed through its parent.
+        self.assertEqual(
+            plan_naming.case_insensitive(self.tmpdir / "plans" / "new"), expected
+        )
+        with mock.patch("os.path.samefile", return_value=True):
+            self.assertTrue(plan_naming.case_insensitive(self.tmpdir))
+
+    def test_case_insensitive_collisions_get_suffixes_in_slug_order(self) -> None:
+        named = [
+            ("plan", "plan-plan.md"),
+            ("Plan", "plan-Plan.md"),
+            ("PLAN", "plan-PLAN.md"),
+            ("other", "plan-other.md"),
+        ]
+
+        names = plan_naming.dedupe_names(named)
+
+        self.assertEqual(
+            names,
+            ["plan-plan-3.md", "plan-Plan-2.md", "plan-PLAN.md", "plan-other.md"],
+        )
+        self.assertEqual(plan_naming.dedupe_names(list(reversed(named))), names[::-1])
+
+    def test_suffix_skips_names_already_taken(self) -> None:
+        names = plan_naming.dedupe_names(
+            [("a", "x.md"), ("b", "X.md"), ("c", "x-2.md")]
+        )
+
+        self.assertEqual(names, ["x.md", "X-3.md", "x-2.md"])
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
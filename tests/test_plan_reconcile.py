@@ -0,0 +1,100 @@
+"""Tests for scripts/plan_reconcile.py."""
+
+import os
+from unittest import mock
+
+from scripts import plan_reconcile
+from scripts.plan_naming import PLAIN_NAME, TIMESTAMPED_NAME
+
+from . import TempDirTestCase
+
+
+class ScanDestinationsTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch.dict(
+            os.environ, {"PLAN_EXPORT_STATE_DIR": str(self.tmpdir / "state")}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _files(self, *names: str, exported: bool = True) -> None:
+        for name in names:
+            (self.tmpdir / name).write_text(name, encoding="utf-8")
+        if exported:
+            plan_reconcile.record_exports(self.tmpdir / name for name in names)
+
+    def test_sorts_exports_into_wanted_orphaned_and_foreign(self) -> None:
+        self._files(
+            "plan-one.md",
+            "plan-gone.md",
+            "plan-elsewhere.md",
+            "notes.md",
+            "20250101-000000-plan-gone.md",
+        )
+
+        stale, present = plan_reconcile.scan_destinations(
+            [self.tmpdir, self.tmpdir / "missing"],
+            PLAIN_NAME,
+            {"plan-one.md": "one", "plan-two.md": "two"},
+            {"one", "two", "elsewhere"},
+        )
+
+        self.assertEqual(stale, [("gone", self.tmpdir / "plan-gone.md", "orphaned")])
+        self.assertEqual(list(present), [self.tmpdir / "plan-one.md"])
+
+    def test_older_names_of_a_wanted_plan_are_superseded(self) -> None:
+        self._files(
+            "20250101-000000-plan-one.md",
+            "20250202-000000-plan-one.md",
+            "20250101-000000-plan-one-2.md",
+            "20250101-000000-plan-v-2.md",
+        )
+
+        stale, _ = plan_reconcile.scan_destinations(
+            [self.tmpdir],
+            TIMESTAMPED_NAME,
+            {"20250202-000000-plan-one.md": "one"},
+            {"one", "v-2"},
+        )
+
+        self.assertEqual(
+            stale,
+            [
+                ("one", self.tmpdir / "20250101-000000-plan-one-2.md", "superseded"),
+                ("one", self.tmpdir / "20250101-000000-plan-one.md", "superseded"),
+            ],
+        )
+
+    def test_files_no_exporter_wrote_are_left_alone(self) -> None:
+        self._files("plan-gone.md")
+        self._files("plan-notes.md", "plan-release.md", exported=False)
+
+        stale, _ = plan_reconcile.scan_destinations(
+            [self.tmpdir], PLAIN_NAME, {}, set()
+        )
+        self.assertEqual(stale, [("gone", self.tmpdir / "plan-gone.md", "orphaned")])
+
+        self.assertTrue(plan_reconcile.remove_export(stale[0][1]))
+        self.assertEqual(plan_reconcile.exported_names(self.tmpdir), set())
+
+    def test_symlinks_are_left_alone(self) -> None:
+        self._files("target.md")
+        os.symlink(self.tmpdir / "target.md", self.tmpdir / "plan-gone.md")
+        plan_reconcile.record_exports([self.tmpdir / "plan-gone.md"])
+
+        stale, _ = plan_reconcile.scan_destinations(
+            [self.tmpdir], PLAIN_NAME, {}, set()
+        )
+
+        self.assertEqual(stale, [])
+
+    def test_scanned_action_matches_copy2(self) -> None:
+        self._files("source.md", "other.md")
+        source = os.stat(self.tmpdir / "source.md")
+
+        self.assertEqual(plan_reconcile.scanned_action(source, None), "copy")
+        self.assertEqual(plan_reconcile.scanned_action(source, source), "up-to-date")
+        os.utime(self.tmpdir / "other.md", ns=(0, 0))
+        other = os.stat(self.tmpdir / "other.md")
+        self.assertEqual(plan_reconcile.scanned_action(source, other), "overwrite")
@@ -0,0 +1,81 @@
+"""Tests for scripts/prewarm.py."""
+
+import io
+import json
+import os
+from unittest import mock
+
+from scripts import export_plan, prewarm, slug_cache
+
+from . import TempDirTestCase
+
+
+class PrewarmTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.home_dir = self.tmpdir / "home"
+        self.plans_dir = self.home_dir / ".claude" / "plans"
+        self.plans_dir.mkdir(parents=True)
+        (self.plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+        self.transcript_dir = self.tmpdir / "transcripts"
+        self.transcript_dir.mkdir()
+        self.transcript = self.transcript_dir / "session.jsonl"
+        self.transcript.write_text(
+            json.dumps({"type": "user"}) + "\n", encoding="utf-8"
+        )
+        patcher = mock.patch("pathlib.Path.home", return_value=self.home_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_session_end_only_scans_bytes_appended_after_prewarm(self) -> None:
+        (self.transcript_dir / "older.jsonl").write_text(
+            json.dumps({"slug": "old"}) + "\n", encoding="utf-8"
+        )
+        with mock.patch("os.nice"):
+            self.assertEqual(prewarm.main([str(self.transcript)]), 0)
+        prewarmed_size = self.transcript.stat().st_size
+
+        cache = slug_cache.SlugCache.for_directory(self.transcript_dir)
+        self.assertEqual(cache.names(), {"session.jsonl", "older.jsonl"})
+
+        with open(self.transcript, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"slug": "one"}) + "\n")
+
+        offsets = []
+        original_scan = slug_cache.scan_adaptive
+
+        def record_scan(path, add, offset=0, stop=None, **kwargs):
+            offsets.append(offset)
+            return original_scan(path, add, offset, stop, **kwargs)
+
+        project_dir = self.tmpdir / "project"
+        project_dir.mkdir()
+        input_data = {"transcript_path": str(self.transcript)}
+        with mock.patch.object(slug_cache, "scan_adaptive", record_scan):
+            with mock.patch("pathlib.Path.cwd", return_value=project_dir):
+                with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+                    self.assertEqual(export_plan.main(), 0)
+
+        self.assertEqual(offsets, [prewarmed_size])
+        self.assertTrue((project_dir / "plan-one.md").exists())
+
+    def test_plans_listing_is_cached(self) -> None:
+        old = 1_700_000_000
+        os.utime(self.plans_dir, (old, old))
+        with mock.patch("os.nice"):
+            prewarm.main([str(self.transcript)])
+
+        listings = list(
+            (self.home_dir / ".claude" / "plan-export" / "plan-listing").iterdir()
+        )
+        self.assertEqual(len(listings), 1)
+        self.assertEqual(json.loads(listings[0].read_text())["names"], ["one.md"])
+
+    def test_missing_argument_is_a_usage_error(self) -> None:
+        self.assertEqual(prewarm.main([]), 2)
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
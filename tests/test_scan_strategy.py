@@ -0,0 +1,189 @@
+"""Tests for scripts/scan_strategy.py."""
+
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+from scripts import scan_strategy
+
+from . import TempDirTestCase
+
+
+class ScanStrategyTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch.dict(
+            os.environ, {"PLAN_EXPORT_STATE_DIR": str(self.tmpdir / "state")}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop(scan_strategy.SCAN_STRATEGY_ENV, None)
+        self.transcript = self.tmpdir / "t.jsonl"
+        self.transcript.write_text(
+            json.dumps({"slug": "a"}) + "\n" + json.dumps({"x": "y" * 200}) + "\n",
+            encoding="utf-8",
+        )
+
+    def _scan(self, **kwargs) -> list[str]:
+        found: dict[str, None] = {}
+        scan_strategy.scan_adaptive(self.transcript, found.setdefault, **kwargs)
+        return list(found)
+
+    def _counting_readers(self) -> dict[str, int]:
+        """Replace every reader with the line scanner, counting calls."""
+        calls = dict.fromkeys(scan_strategy.STRATEGIES, 0)
+        lines = scan_strategy.READERS["lines"]
+
+        def counted(name):
+            def reader(*args):
+                calls[name] += 1
+                return lines(*args)
+
+            return reader
+
+        patcher = mock.patch.dict(
+            scan_strategy.READERS,
+            {name: counted(name) for name in scan_strategy.STRATEGIES},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+
+class ChooseTests(ScanStrategyTestCase):
+    def test_every_strategy_is_tried_before_the_fastest_is_kept(self) -> None:
+        rates = {"lines": 1.0, "chunked": 3.0, "mmap": 2.0, "tail": 0.5}
+        picks = []
+        for _ in range(scan_strategy.MIN_SAMPLES * len(rates)):
+            name = scan_strategy.choose("ext4", "large")
+            picks.append(name)
+            scan_strategy.record("ext4", "large", name, int(rates[name] * 1e6), 1.0)
+
+        self.assertEqual(
+            sorted(set(picks)), sorted(scan_strategy.STRATEGIES), "all tried"
+        )
+        self.assertEqual(scan_strategy.choose("ext4", "large"), "chunked")
+        # Other classes keep their own measurements.
+        self.assertEqual(scan_strategy.choose("nfs", "large"), "chunked")
+        self.assertEqual(scan_strategy.choose("ext4", "huge"), "mmap")
+
+    def test_the_least_tried_strategy_is_measured_again_now_and_then(self) -> None:
+        for name, samples in (("lines", 2), ("chunked", 9), ("mmap", 3), ("tail", 5)):
+            for _ in range(samples):
+                scan_strategy.record("ext4", "large", name, 1 << 20, 0.1)
+
+        # 19 scans were recorded, so the 20th explores.
+        self.assertEqual(scan_strategy.choose("ext4", "large"), "lines")
+
+    def test_scans_that_can_be_cut_short_never_read_from_the_end(self) -> None:
+        for name in ("mmap", "chunked", "lines"):
+            for _ in range(scan_strategy.MIN_SAMPLES):
+                scan_strategy.record("ext4", "large", name, 1 << 20, 0.1)
+
+        self.assertEqual(scan_strategy.choose("ext4", "large"), "tail")
+        self.assertEqual(scan_strategy.choose("ext4", "large", forward=True), "mmap")
+
+    def test_trials_cut_short_count_but_are_not_measured(self) -> None:
+        for _ in range(scan_strategy.MIN_SAMPLES):
+            scan_strategy.record("ext4", "large", "mmap", 0, None)
+        scan_strategy.record("ext4", "large", "chunked", 1 << 20, 0.1)
+
+        self.assertEqual(scan_strategy.choose("ext4", "large"), "chunked")
+        for name in ("chunked", "lines", "tail"):
+            for _ in range(scan_strategy.MIN_SAMPLES):
+                scan_strategy.record("ext4", "large", name, 1 << 20, 0.1)
+        self.assertEqual(scan_strategy.choose("ext4", "large"), "chunked")
+
+    def test_corrupt_measurements_start_over(self) -> None:
+        path = scan_strategy.tuning_path()
+        path.parent.mkdir(parents=True)
+        path.write_text("{", encoding="utf-8")
+
+        self.assertEqual(scan_strategy.choose("ext4", "large"), "mmap")
+        scan_strategy.record("ext4", "large", "mmap", 1 << 20, 0.1)
+        self.assertEqual(json.loads(path.read_text())["version"], 1)
+
+
+class ScanAdaptiveTests(ScanStrategyTestCase):
+    def test_short_ranges_are_read_line_by_line_and_not_measured(self) -> None:
+        calls = self._counting_readers()
+
+        self.assertEqual(self._scan(), ["a"])
+
+        self.assertEqual(calls["lines"], 1)
+        self.assertFalse(scan_strategy.tuning_path().exists())
+
+    def test_long_scans_are_timed_and_persisted(self) -> None:
+        calls = self._counting_readers()
+        with mock.patch.object(scan_strategy, "MEASURE_MIN_BYTES", 10):
+            self.assertEqual(self._scan(), ["a"])
+            self.assertEqual(self._scan(), ["a"])
+
+        data = json.loads(scan_strategy.tuning_path().read_text())
+        [entry] = data["classes"].values()
+        self.assertEqual(entry["scans"], 2)
+        [name] = [name for name, count in calls.items() if count]
+        self.assertEqual(entry["strategies"][name]["samples"], 2)
+
+    def test_override_picks_the_reader(self) -> None:
+        calls = self._counting_readers()
+        with mock.patch.dict(os.environ, {scan_strategy.SCAN_STRATEGY_ENV: "tail"}):
+            self._scan()
+            self._scan(strategy="mmap")
+            self._scan(strategy="auto")
+        with mock.patch.dict(os.environ, {scan_strategy.SCAN_STRATEGY_ENV: "bogus"}):
+            self._scan()
+
+        self.assertEqual(calls, {"lines": 2, "chunked": 0, "mmap": 1, "tail": 1})
+
+    def test_scan_cut_short_counts_as_a_trial_but_is_not_measured(self) -> None:
+        with mock.patch.object(scan_strategy, "MEASURE_MIN_BYTES", 10):
+            with mock.patch.object(scan_strategy, "READERS", {"mmap": lambda *_: 30}):
+                found = self._scan(strategy="mmap", stop=lambda: True)
+
+        self.assertEqual(found, [])
+        data = json.loads(scan_strategy.tuning_path().read_text())
+        [entry] = data["classes"].values()
+        self.assertEqual(entry["strategies"], {"mmap": {"samples": 1}})
+
+    def test_deferred_scans_under_a_deadline_never_read_from_the_end(self) -> None:
+        calls = self._counting_readers()
+        fstype = scan_strategy.filesystem_type(self.transcript)
+        sized = scan_strategy.size_class(self.transcript.stat().st_size)
+        # The other readers are measured, so exploring would pick "tail".
+        for name in ("mmap", "chunked", "lines"):
+            for _ in range(scan_strategy.MIN_SAMPLES):
+                scan_strategy.record(fstype, sized, name, 1 << 20, 0.1)
+
+        with mock.patch.object(scan_strategy, "MEASURE_MIN_BYTES", 10):
+            for _ in range(3):
+                self._scan(stop=lambda: True)
+            self._scan(strategy="tail", stop=lambda: True)
+
+        self.assertEqual(calls["tail"], 0)
+        data = json.loads(scan_strategy.tuning_path().read_text())
+        [entry] = data["classes"].values()
+        self.assertEqual(entry["scans"], 3 * scan_strategy.MIN_SAMPLES + 4)
+
+
+class FilesystemTypeTests(TempDirTestCase):
+    def test_longest_mount_point_wins(self) -> None:
+        mounts = "\n".join(
+            [
+                "/dev/sda1 / ext4 rw 0 0",
+                "server:/home /mnt/my\\040home nfs4 rw 0 0",
+                "tmpfs /mnt/my\\040home/tmp tmpfs rw 0 0",
+            ]
+        )
+        scan_strategy._mounts.cache_clear()
+        self.addCleanup(scan_strategy._mounts.cache_clear)
+        with mock.patch("builtins.open", mock.mock_open(read_data=mounts)):
+            with mock.patch("os.path.realpath", side_effect=lambda p: str(p)):
+                self.assertEqual(
+                    scan_strategy.filesystem_type(Path("/mnt/my home/a.jsonl")), "nfs4"
+                )
+                self.assertEqual(
+                    scan_strategy.filesystem_type(Path("/mnt/my home/tmp/a")), "tmpfs"
+                )
+                self.assertEqual(scan_strategy.filesystem_type(Path("/srv/a")), "ext4")
@@ -123,6 +123,122 @@ class SessionStartTests(TempDirTestCase):
         self.assertFalse(env_file.exists())
 
 
+class AppendModeTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.env_file = self.tmpdir / "env.sh"
+        self.transcript = self.tmpdir / "transcript.jsonl"
+        self.expected = f"export TRANSCRIPT_DIR={shlex.quote(str(self.tmpdir))}\n"
+
+    def _run(self, transcript_path: str | None = None) -> int:
+        input_data = {"transcript_path": transcript_path or str(self.transcript)}
+        env = {
+            "CLAUDE_ENV_FILE": str(self.env_file),
+            session_start.ENV_WRITE_MODE_ENV: "append",
+        }
+        with mock.patch.dict(os.environ, env, clear=True):
+            with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+                return session_start.main()
+
+    def test_repeated_line_is_written_once(self) -> None:
+        self.assertEqual(self._run(), 0)
+        self.assertEqual(self._run(), 0)
+
+        self.assertEqual(self.env_file.read_text(encoding="utf-8"), self.expected)
+
+    def test_line_differing_from_last_is_appended(self) -> None:
+        other_dir = self.tmpdir / "other"
+        other_dir.mkdir()
+
+        self._run()
+        self._run(str(other_dir / "t.jsonl"))
+        self._run()
+
+        lines = self.env_file.read_text(encoding="utf-8").splitlines(keepends=True)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[-1], self.expected)
+
+    def test_longer_line_with_same_suffix_is_not_a_repeat(self) -> None:
+        self.env_file.write_text("x" + self.expected, encoding="utf-8")
+
+        self._run()
+
+        self.assertEqual(
+            self.env_file.read_text(encoding="utf-8"),
+            "x" + self.expected + self.expected,
+        )
+
+    def test_file_is_compacted_past_threshold(self) -> None:
+        other = "export TRANSCRIPT_DIR=/old\n"
+        self.env_file.write_text("export OTHER=1\n" + other * 50, encoding="utf-8")
+        os.chmod(self.env_file, 0o600)
+
+        with mock.patch.object(session_start, "COMPACT_THRESHOLD", 64):
+            self.assertEqual(self._run(), 0)
+
+        self.assertEqual(
+            self.env_file.read_text(encoding="utf-8"),
+            "export OTHER=1\n" + self.expected,
+        )
+        self.assertEqual(self.env_file.stat().st_mode & 0o777, 0o600)
+
+    def test_append_racing_a_compaction_is_kept(self) -> None:
+        self.env_file.write_text("export TRANSCRIPT_DIR=/old\n" * 50, encoding="utf-8")
+        late = "export TRANSCRIPT_DIR=/new/session\n"
+        original_replace = os.replace
+
+        def append_then_replace(src, dst):
+            # Another session appends between the read and the rename.
+            with open(self.env_file, "a", encoding="utf-8") as f:
+                f.write(late)
+            original_replace(src, dst)
+
+        with mock.patch.object(session_start.os, "replace", append_then_replace):
+            with mock.patch.object(session_start, "COMPACT_THRESHOLD", 64):
+                self.assertEqual(self._run(), 0)
+
+        self.assertEqual(
+            self.env_file.read_text(encoding="utf-8"), self.expected + late
+        )
+
+    def test_oversized_line_falls_back_to_locked_write(self) -> None:
+        with mock.patch.object(session_start.select, "PIPE_BUF", 8):
+            self.assertEqual(self._run(), 0)
+            self.assertEqual(self._run(), 0)
+
+        self.assertEqual(self.env_file.read_text(encoding="utf-8"), self.expected * 2)
+
+
+class PrewarmSpawnTests(TempDirTestCase):
+    def _run(self, env: dict[str, str]) -> int:
+        input_data = {"transcript_path": str(self.tmpdir / "t.jsonl")}
+        env = {"CLAUDE_ENV_FILE": str(self.tmpdir / "env.sh"), **env}
+        with mock.patch.dict(os.environ, env, clear=True):
+            with mock.patch("sys.stdin", io.StringIO(json.dumps(input_data))):
+                return session_start.main()
+
+    def test_detached_worker_is_started_when_enabled(self) -> None:
+        with mock.patch("subprocess.Popen") as popen:
+            self.assertEqual(self._run({session_start.PREWARM_ENV: "1"}), 0)
+
+        popen.assert_called_once()
+        args, kwargs = popen.call_args
+        self.assertEqual(
+            args[0][1:], [session_start.PREWARM_SCRIPT, str(self.tmpdir / "t.jsonl")]
+        )
+        self.assertTrue(kwargs["start_new_session"])
+        self.assertTrue((self.tmpdir / "env.sh").exists())
+
+    def test_no_worker_by_default_or_when_spawning_fails(self) -> None:
+        with mock.patch("subprocess.Popen") as popen:
+            self.assertEqual(self._run({}), 0)
+            self.assertEqual(self._run({session_start.PREWARM_ENV: "0"}), 0)
+        popen.assert_not_called()
+
+        with mock.patch("subprocess.Popen", side_effect=OSError("no fork")):
+            self.assertEqual(self._run({session_start.PREWARM_ENV: "1"}), 0)
+
+
 if __name__ == "__main__":
     import unittest
 
@@ -0,0 +1,124 @@
+"""Tests for scripts/sharded_scan.py."""
+
+import json
+import mmap
+import random
+from unittest import mock
+
+from scripts import sharded_scan, transcript_scan
+
+from . import TempDirTestCase
+
+
+class ShardedScanTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        rng = random.Random(3)
+        lines = []
+        for i in range(600):
+            if rng.random() < 0.3:
+                lines.append(json.dumps({"slug": f"plan-{rng.randint(0, 40)}"}))
+            elif rng.random() < 0.1:
+                lines.append(json.dumps({"nested": {"slug": "nope"}}))
+            else:
+                lines.append(json.dumps({"n": i, "text": "x" * rng.randint(0, 90)}))
+        self.transcript = self.tmpdir / "t.jsonl"
+        self.transcript.write_text("\n".join(lines), encoding="utf-8")
+
+    def _serial(self, offset: int = 0) -> tuple[list[str], int]:
+        found: dict[str, None] = {}
+        end = transcript_scan.scan_transcript(self.transcript, found.setdefault, offset)
+        return list(found), end
+
+    def _sharded(
+        self, offset: int = 0, jobs: int = 3, stop=None
+    ) -> tuple[list[str], int]:
+        found: dict[str, None] = {}
+        with mock.patch.object(sharded_scan, "SHARD_MIN_SIZE", 0):
+            end = sharded_scan.scan_sharded(
+                self.transcript, found.setdefault, offset, jobs, stop=stop
+            )
+        return list(found), end
+
+    def _serial_prefix(self, end: int) -> list[str]:
+        """The slugs a serial scan finds in the first ``end`` bytes."""
+        prefix = self.tmpdir / "prefix.jsonl"
+        prefix.write_bytes(self.transcript.read_bytes()[:end])
+        found: dict[str, None] = {}
+        transcript_scan.scan_transcript(prefix, found.setdefault)
+        return list(found)
+
+    def test_matches_serial_scan_order_and_offset(self) -> None:
+        self.assertEqual(self._sharded(), self._serial())
+
+    def test_matches_serial_scan_from_offset(self) -> None:
+        offset = self.transcript.read_bytes().index(b"\n", 5000) + 1
+        self.assertEqual(self._sharded(offset), self._serial(offset))
+
+    def test_first_slug_is_first_in_file(self) -> None:
+        slugs, _end = self._sharded(jobs=4)
+        data = self.transcript.read_bytes()
+        first = min(
+            slugs, key=lambda slug: data.index(json.dumps({"slug": slug}).encode())
+        )
+        self.assertEqual(slugs[0], first)
+
+    def test_ranges_start_at_line_boundaries(self) -> None:
+        data = self.transcript.read_bytes()
+        with open(self.transcript, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                ranges = sharded_scan.shard_ranges(mm, 0, len(data), 5)
+
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, stop), (start, _) in zip(ranges, ranges[1:], strict=False):
+            self.assertEqual(stop, start)
+            self.assertEqual(data[start - 1 : start], b"\n")
+
+    def test_stop_cuts_the_parallel_scan_short(self) -> None:
+        slugs, end = self._sharded(stop=lambda: True)
+
+        _, full_end = self._serial()
+        self.assertLess(end, full_end)
+        self.assertEqual(slugs, self._serial_prefix(end))
+
+    def test_cancelled_range_ends_at_a_line_start(self) -> None:
+        checks = iter([False, False, False])
+
+        class Cancel:
+            def is_set(self) -> bool:
+                return next(checks, True)
+
+        data = self.transcript.read_bytes()
+        with mock.patch.object(sharded_scan, "MMAP_WINDOW", 2000):
+            with mock.patch.object(sharded_scan, "_cancel", Cancel()):
+                slugs, reached = sharded_scan.scan_range(
+                    str(self.transcript), 0, len(data)
+                )
+
+        self.assertLess(reached, len(data))
+        self.assertEqual(data[reached - 1 : reached], b"\n")
+        self.assertEqual(slugs, self._serial_prefix(reached))
+
+    def test_small_file_uses_serial_scan(self) -> None:
+        with mock.patch.object(sharded_scan, "_scan_shards") as shards:
+            sharded_scan.scan_sharded(self.transcript, lambda _slug: None, 0, 4)
+        shards.assert_not_called()
+
+    def test_pool_failure_falls_back_to_serial_scan(self) -> None:
+        with mock.patch.object(
+            sharded_scan, "ProcessPoolExecutor", side_effect=OSError("no fork")
+        ):
+            self.assertEqual(self._sharded(), self._serial())
+
+    def test_missing_file_returns_offset(self) -> None:
+        end = sharded_scan.scan_sharded(
+            self.tmpdir / "missing.jsonl", lambda _slug: None, 7, 2
+        )
+        self.assertEqual(end, 7)
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
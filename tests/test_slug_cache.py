@@ -0,0 +1,232 @@
+"""Tests for scripts/slug_cache.py."""
+
+import io
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+from scripts import export_plan, export_project_plans, slug_cache, transcript_scan
+
+from . import TempDirTestCase
+
+
+class SlugCacheTests(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.home_dir = self.tmpdir / "home"
+        self.transcript_dir = self.tmpdir / "transcripts"
+        self.transcript_dir.mkdir()
+        self.transcript = self.transcript_dir / "t.jsonl"
+        self.transcript.write_text(
+            json.dumps({"slug": "b"}) + "\n" + json.dumps({"slug": "a"}) + "\n",
+            encoding="utf-8",
+        )
+        patcher = mock.patch("pathlib.Path.home", return_value=self.home_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _reload(self) -> slug_cache.SlugCache:
+        return slug_cache.SlugCache.for_directory(self.transcript_dir)
+
+    def test_slugs_are_returned_in_first_appearance_order(self) -> None:
+        cache = self._reload()
+        self.assertEqual(cache.scan(self.transcript), ["b", "a"])
+
+    def test_unchanged_transcript_is_not_reopened(self) -> None:
+        cache = self._reload()
+        cache.scan(self.transcript)
+        cache.save()
+
+        with mock.patch.object(slug_cache, "scan_adaptive") as scan:
+            slugs = self._reload().scan(self.transcript)
+
+        scan.assert_not_called()
+        self.assertEqual(slugs, ["b", "a"])
+
+    def test_appended_bytes_are_scanned_from_cached_offset(self) -> None:
+        cache = self._reload()
+        cache.scan(self.transcript)
+        cache.save()
+        size = self.transcript.stat().st_size
+        with open(self.transcript, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"slug": "c"}) + "\n")
+
+        offsets = []
+        original_scan = slug_cache.scan_adaptive
+
+        def record_scan(path, add, offset=0, stop=None, **kwargs):
+            offsets.append(offset)
+            return original_scan(path, add, offset, stop, **kwargs)
+
+        with mock.patch.object(slug_cache, "scan_adaptive", side_effect=record_scan):
+            slugs = self._reload().scan(self.transcript)
+
+        self.assertEqual(offsets, [size])
+        self.assertEqual(slugs, ["b", "a", "c"])
+
+    def test_scan_cut_short_resumes_from_its_offset(self) -> None:
+        first_line = len(json.dumps({"slug": "b"}) + "\n")
+        polls = iter([False, True, True])
+        with mock.patch.object(transcript_scan, "STOP_CHECK_LINES", 1):
+            cache = self._reload()
+            self.assertEqual(
+                cache.scan(self.transcript, stop=lambda: next(polls)), ["b"]
+            )
+            cache.save()
+
+        offsets = []
+        original_scan = slug_cache.scan_adaptive
+
+        def record_scan(path, add, offset=0, stop=None, **kwargs):
+            offsets.append(offset)
+            return original_scan(path, add, offset, stop, **kwargs)
+
+        with mock.patch.object(slug_cache, "scan_adaptive", side_effect=record_scan):
+            slugs = self._reload().scan(self.transcript)
+
+        self.assertEqual(offsets, [first_line])
+        self.assertEqual(slugs, ["b", "a"])
+
+    def test_partial_last_line_is_rescanned(self) -> None:
+        self.transcript.write_text('{"slug": "b"}\n{"slug": "a', encoding="utf-8")
+        cache = self._reload()
+        self.assertEqual(cache.scan(self.transcript), ["b"])
+
+        with open(self.transcript, "a", encoding="utf-8") as f:
+            f.write('"}\n')
+
+        self.assertEqual(cache.scan(self.transcript), ["b", "a"])
+
+    def test_replaced_transcript_is_rescanned_from_start(self) -> None:
+        cache = self._reload()
+        cache.scan(self.transcript)
+
+        replacement = self.transcript_dir / "new.jsonl"
+        replacement.write_text(json.dumps({"slug": "z"}) + "\n", encoding="utf-8")
+        os.replace(replacement, self.transcript)
+
+        self.assertEqual(cache.scan(self.transcript), ["z"])
+
+    def test_caches_of_other_processes_keep_each_others_entries(self) -> None:
+        other = self.transcript_dir / "other.jsonl"
+        other.write_text(json.dumps({"slug": "o"}) + "\n", encoding="utf-8")
+
+        first = self._reload()
+        second = self._reload()
+        first.scan(self.transcript)
+        second.scan(other)
+        first.save()
+        second.save()
+
+        self.assertEqual(self._reload().names(), {"t.jsonl", "other.jsonl"})
+
+    def test_save_removes_entries_of_deleted_transcripts(self) -> None:
+        other = self.transcript_dir / "other.jsonl"
+        other.write_text(json.dumps({"slug": "o"}) + "\n", encoding="utf-8")
+        cache = self._reload()
+        cache.scan(other)
+        cache.save()
+        other.unlink()
+
+        cache = self._reload()
+        legacy = cache.path.with_suffix(".json")
+        legacy.write_text("{}", encoding="utf-8")
+        cache.scan(self.transcript)
+        cache.save()
+
+        self.assertEqual(self._reload().names(), {"t.jsonl"})
+        self.assertFalse(legacy.exists())
+
+    def test_scan_writes_only_the_entry_it_scanned(self) -> None:
+        other = self.transcript_dir / "other.jsonl"
+        other.write_text(json.dumps({"slug": "o"}) + "\n", encoding="utf-8")
+        cache = self._reload()
+        cache.scan(other)
+        before = cache.entry_path(other.name).stat().st_mtime_ns
+
+        with open(self.transcript, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"slug": "c"}) + "\n")
+        cache = self._reload()
+        with mock.patch("os.replace", wraps=os.replace) as replace:
+            cache.scan(self.transcript)
+            cache.save()
+
+        self.assertEqual(
+            [Path(call.args[1]).name for call in replace.call_args_list],
+            ["t.jsonl.json"],
+        )
+        self.assertEqual(cache.entry_path(other.name).stat().st_mtime_ns, before)
+
+    def test_corrupt_cache_entry_is_ignored(self) -> None:
+        cache = self._reload()
+        entry = cache.entry_path(self.transcript.name)
+        entry.parent.mkdir(parents=True)
+        entry.write_text("{not json", encoding="utf-8")
+
+        self.assertEqual(self._reload().scan(self.transcript), ["b", "a"])
+
+    def test_slug_free_transcript_is_known_until_it_changes(self) -> None:
+        empty = self.transcript_dir / "empty.jsonl"
+        empty.write_text(json.dumps({"type": "user"}) + "\n", encoding="utf-8")
+        cache = self._reload()
+        self.assertFalse(cache.is_slug_free(empty.name, empty.stat()))
+
+        cache.scan(empty)
+        cache.scan(self.transcript)
+        self.assertTrue(cache.is_slug_free(empty.name, empty.stat()))
+        self.assertFalse(
+            cache.is_slug_free(self.transcript.name, self.transcript.stat())
+        )
+
+        with open(empty, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "assistant"}) + "\n")
+        self.assertFalse(cache.is_slug_free(empty.name, empty.stat()))
+
+
+class SessionEndHandOffTests(TempDirTestCase):
+    def test_project_export_reuses_session_end_scan(self) -> None:
+        project_dir = self.tmpdir / "project"
+        project_dir.mkdir()
+        home_dir = self.tmpdir / "home"
+        plans_dir = home_dir / ".claude" / "plans"
+        plans_dir.mkdir(parents=True)
+        (plans_dir / "one.md").write_text("plan one", encoding="utf-8")
+
+        transcript_dir = self.tmpdir / "transcripts"
+        transcript_dir.mkdir()
+        session = transcript_dir / "session.jsonl"
+        session.write_text(json.dumps({"slug": "one"}) + "\n", encoding="utf-8")
+        unseen = transcript_dir / "unseen.jsonl"
+        unseen.write_text(json.dumps({"slug": "two"}) + "\n", encoding="utf-8")
+
+        scanned = []
+        original_scan = slug_cache.scan_adaptive
+
+        def record_scan(path, add, offset=0, stop=None, **kwargs):
+            scanned.append(path.name)
+            return original_scan(path, add, offset, stop, **kwargs)
+
+        with mock.patch("pathlib.Path.home", return_value=home_dir):
+            with mock.patch("pathlib.Path.cwd", return_value=project_dir):
+                with mock.patch.object(
+                    slug_cache, "scan_adaptive", side_effect=record_scan
+                ):
+                    with mock.patch(
+                        "sys.stdin",
+                        io.StringIO(json.dumps({"transcript_path": str(session)})),
+                    ):
+                        self.assertEqual(export_plan.main(), 0)
+                    with mock.patch.dict(
+                        os.environ, {"TRANSCRIPT_DIR": str(transcript_dir)}
+                    ):
+                        self.assertEqual(export_project_plans.main(), 0)
+
+        self.assertEqual(scanned, ["session.jsonl", "unseen.jsonl"])
+        self.assertTrue((project_dir / "plan-one.md").exists())
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
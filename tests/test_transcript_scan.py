@@ -0,0 +1,215 @@
+"""Tests for scripts/transcript_scan.py."""
+
+import json
+import random
+from unittest import mock
+
+from scripts import export_project_plans, transcript_scan
+
+from . import TempDirTestCase
+
+
+class ScanTranscriptTests(TempDirTestCase):
+    def test_returns_offset_of_last_complete_line(self) -> None:
+        transcript = self.tmpdir / "t.jsonl"
+        first = json.dumps({"slug": "a"}) + "\n"
+        transcript.write_text(first + json.dumps({"slug": "b"}), encoding="utf-8")
+
+        found: list[str] = []
+        end = transcript_scan.scan_transcript(transcript, found.append)
+
+        self.assertEqual(found, ["a", "b"])
+        self.assertEqual(end, len(first))
+
+    def test_scans_from_offset(self) -> None:
+        transcript = self.tmpdir / "t.jsonl"
+        first = json.dumps({"slug": "a"}) + "\n"
+        transcript.write_text(first + json.dumps({"slug": "b"}) + "\n", "utf-8")
+
+        found: list[str] = []
+        transcript_scan.scan_transcript(transcript, found.append, len(first))
+
+        self.assertEqual(found, ["b"])
+
+
+class ByteReaderTests(TempDirTestCase):
+    READERS = (
+        transcript_scan.scan_chunked,
+        transcript_scan.scan_mmap,
+        transcript_scan.scan_tail,
+    )
+
+    def test_agree_with_the_line_scanner(self) -> None:
+        rng = random.Random(11)
+        lines = []
+        for _ in range(300):
+            kind = rng.random()
+            slug = f"plan-{rng.randint(0, 20)}"
+            if kind < 0.3:
+                lines.append(json.dumps({"type": "user", "slug": slug}))
+            elif kind < 0.4:
+                lines.append(json.dumps({"nested": {"slug": slug}}))
+            elif kind < 0.5:
+                lines.append('{"slug": "' + slug + '", broken')
+            else:
+                lines.append(json.dumps({"message": "x" * rng.randint(0, 80)}))
+        transcript = self.tmpdir / "t.jsonl"
+        # The last line has no newline: it is searched but not passed.
+        transcript.write_text("\n".join(lines), encoding="utf-8")
+        offset = len("\n".join(lines[:100])) + 1
+
+        for start in (0, offset):
+            expected: dict[str, None] = {}
+            end = transcript_scan.scan_transcript(
+                transcript, expected.setdefault, start
+            )
+            for size in (5, 64, 1 << 20):
+                for reader in self.READERS:
+                    found: dict[str, None] = {}
+                    with mock.patch.object(transcript_scan, "CHUNK_SIZE", size):
+                        with mock.patch.object(transcript_scan, "MMAP_WINDOW", size):
+                            self.assertEqual(
+                                reader(transcript, found.setdefault, start), end
+                            )
+                    self.assertEqual(list(found), list(expected), reader.__name__)
+
+    def test_stopped_readers_report_the_prefix_they_covered(self) -> None:
+        transcript = self.tmpdir / "t.jsonl"
+        first = json.dumps({"slug": "a"}) + "\n"
+        transcript.write_text(first + json.dumps({"slug": "b"}) + "\n", "utf-8")
+
+        for reader, covered, slugs in (
+            (transcript_scan.scan_chunked, len(first), ["a"]),
+            (transcript_scan.scan_tail, 0, []),
+        ):
+            stop = iter([False, True]).__next__
+            found: list[str] = []
+            with mock.patch.object(transcript_scan, "CHUNK_SIZE", len(first)):
+                end = reader(transcript, found.append, stop=stop)
+            self.assertEqual((end, found), (covered, slugs), reader.__name__)
+
+    def test_missing_file_is_reported(self) -> None:
+        for reader in self.READERS:
+            found: list[str] = []
+            with mock.patch("sys.stderr") as stderr:
+                end = reader(self.tmpdir / "missing.jsonl", found.append, 3)
+            self.assertEqual((end, found), (3, []))
+            stderr.write.assert_called()
+
+
+class CandidateSearchTests(TempDirTestCase):
+    def _search(self, text: str, candidates: set[str]) -> set[str]:
+        transcript = self.tmpdir / "t.jsonl"
+        transcript.write_text(text, encoding="utf-8")
+        return set(transcript_scan.CandidateSearch(candidates).search(transcript))
+
+    def test_stop_ends_the_scan_at_the_last_line_read(self) -> None:
+        transcript = self.tmpdir / "t.jsonl"
+        first = json.dumps({"slug": "a"}) + "\n"
+        transcript.write_text(first + json.dumps({"slug": "b"}) + "\n", "utf-8")
+
+        polls = iter([False, True])
+        found: list[str] = []
+        with mock.patch.object(transcript_scan, "STOP_CHECK_LINES", 1):
+            end = transcript_scan.scan_transcript(
+                transcript, found.append, stop=lambda: next(polls)
+            )
+
+        self.assertEqual(found, ["a"])
+        self.assertEqual(end, len(first))
+
+    def test_matches_compact_and_spaced_encodings(self) -> None:
+        text = '{"slug":"one"}\n{"type": "x", "slug" : "two"}\n'
+        self.assertEqual(self._search(text, {"one", "two", "three"}), {"one", "two"})
+
+    def test_nested_slug_keys_are_rejected(self) -> None:
+        text = json.dumps({"data": {"slug": "one"}, "slug": "other"}) + "\n"
+        self.assertEqual(self._search(text, {"one"}), set())
+
+    def test_nested_match_on_line_with_candidate_top_level_slug(self) -> None:
+        text = json.dumps({"data": {"slug": "one"}, "slug": "two"}) + "\n"
+        self.assertEqual(self._search(text, {"one", "two"}), {"two"})
+
+    def test_slug_quoted_inside_a_string_is_rejected(self) -> None:
+        text = json.dumps({"message": '{"slug":"one"}'}) + "\n"
+        self.assertEqual(self._search(text, {"one"}), set())
+
+    def test_prefix_candidates_do_not_match_longer_slugs(self) -> None:
+        text = json.dumps({"slug": "plan-one-extra"}) + "\n"
+        self.assertEqual(self._search(text, {"plan-one", "plan"}), set())
+
+    def test_non_ascii_slug_in_either_encoding(self) -> None:
+        text = (
+            json.dumps({"slug": "café"}, ensure_ascii=False)
+            + "\n"
+            + json.dumps({"slug": "über"})
+            + "\n"
+        )
+        self.assertEqual(self._search(text, {"café", "über"}), {"café", "über"})
+
+    def test_final_line_without_newline_is_searched(self) -> None:
+        text = "not json\n" + json.dumps({"slug": "one"})
+        self.assertEqual(self._search(text, {"one"}), {"one"})
+
+    def test_agrees_with_full_scan_across_chunk_boundaries(self) -> None:
+        rng = random.Random(7)
+        slugs = [f"plan-{i}" for i in range(30)] + ["plan-1-b", "a.b", 'q"x']
+        lines = []
+        for _ in range(400):
+            kind = rng.random()
+            slug = rng.choice(slugs)
+            if kind < 0.4:
+                lines.append(json.dumps({"type": "user", "slug": slug}))
+            elif kind < 0.55:
+                lines.append(json.dumps({"nested": {"slug": slug}}))
+            elif kind < 0.65:
+                lines.append(json.dumps({"message": json.dumps({"slug": slug})}))
+            elif kind < 0.75:
+                lines.append('{"slug": "' + slug + '", broken')
+            else:
+                lines.append(json.dumps({"message": "x" * rng.randint(0, 80)}))
+        transcript = self.tmpdir / "t.jsonl"
+        transcript.write_text("\n".join(lines), encoding="utf-8")
+
+        expected = export_project_plans.find_slugs_in_transcript(transcript)
+        for size in (7, 64, 1 << 20):
+            candidates = set(rng.sample(slugs, 12)) | {"never-seen"}
+            with mock.patch.object(transcript_scan, "CHUNK_SIZE", size):
+                found = transcript_scan.CandidateSearch(candidates).search(transcript)
+            self.assertEqual(len(found), len(set(found)))
+            self.assertEqual(set(found), expected & candidates)
+
+    def test_reading_stops_once_all_candidates_are_found(self) -> None:
+        transcript = self.tmpdir / "t.jsonl"
+        filler = json.dumps({"message": "x" * 100}) + "\n"
+        transcript.write_text(
+            json.dumps({"slug": "one"}) + "\n" + filler * 100, encoding="utf-8"
+        )
+
+        reads = []
+        original_open = open
+
+        def counting_open(*args, **kwargs):
+            f = original_open(*args, **kwargs)
+            original_read = f.read
+
+            def read(size=-1):
+                reads.append(size)
+                return original_read(size)
+
+            f.read = read
+            return f
+
+        search = transcript_scan.CandidateSearch({"one"})
+        with mock.patch.object(transcript_scan, "CHUNK_SIZE", 256):
+            with mock.patch("builtins.open", side_effect=counting_open):
+                self.assertEqual(search.search(transcript), ["one"])
+                self.assertEqual(search.search(transcript), [])
+
+        self.assertEqual(len(reads), 1)
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()